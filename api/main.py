@@ -1,7 +1,197 @@
-from fastapi import FastAPI
+"""
+Servizio di previsione ASGI per trading-ai.
 
-app = FastAPI()
+Espone /predict e /health con la stessa logica di scripts/api_service.py
+(parsing in matrice float32, cache, batching, ricaricamento a caldo del modello).
+L'inferenza gira in un pool di thread dedicato così l'event loop resta libero;
+le risposte sono serializzate con orjson. In produzione viene eseguito con più
+worker: gunicorn -w 4 -k uvicorn.workers.UvicornWorker api.main:app
+"""
+
+import os
+import sys
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Union
+
+import orjson
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scripts.api_service import (
+    FeatureError,
+    SymbolNotFoundError,
+    InsufficientHistoryError,
+    model_registry,
+    batcher,
+    prediction_cache,
+    symbol_features,
+    predict_symbol,
+    parse_features,
+    predict_with_cache,
+    build_prediction_response,
+)
+
+# Thread dedicati all'inferenza per ciascun worker
+INFERENCE_THREADS = int(os.environ.get('INFERENCE_THREADS', '4'))
+inference_executor = ThreadPoolExecutor(max_workers=INFERENCE_THREADS, thread_name_prefix="inference")
+
+class FeatureVector(BaseModel):
+    """Vettore di feature per un singolo record."""
+    SMA_50: float
+    SMA_200: float
+    RSI: float
+    ATR: float
+    VWAP: float
+
+class ColumnarFeatures(BaseModel):
+    """Feature in formato colonnare: una lista di valori per feature."""
+    SMA_50: List[float]
+    SMA_200: List[float]
+    RSI: List[float]
+    ATR: List[float]
+    VWAP: List[float]
+
+class PredictionResponse(BaseModel):
+    status: str = "success"
+    market_prediction: float
+    trading_decision: str
+
+class BatchPredictionResponse(BaseModel):
+    status: str = "success"
+    market_predictions: List[float]
+    trading_decisions: List[str]
+
+class SymbolPredictionResponse(PredictionResponse):
+    symbol: str
+    interval: str
+    as_of: str
+    features: Dict[str, Optional[float]]
+    bars: int
+    data_source: str
+    cached_features: bool
+
+class ErrorResponse(BaseModel):
+    status: str = "error"
+    message: str
+
+class InsufficientHistoryResponse(ErrorResponse):
+    bars: int
+    required_bars: int
+
+class HealthResponse(BaseModel):
+    status: str
+    message: str
+    model_version: Optional[str] = None
+    model_source: Optional[str] = None
+    loaded_at: Optional[str] = None
+    reloads: int = 0
+    watch_path: Optional[str] = None
+    last_reload_error: Optional[str] = None
+
+PREDICT_REQUEST_SCHEMA = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {
+                "schema": {
+                    "anyOf": [
+                        FeatureVector.model_json_schema(),
+                        {"type": "array", "items": FeatureVector.model_json_schema()},
+                        ColumnarFeatures.model_json_schema(),
+                    ]
+                }
+            }
+        },
+    }
+}
+
+app = FastAPI(title="Trading AI", default_response_class=ORJSONResponse)
+
+@app.on_event("shutdown")
+def shutdown():
+    inference_executor.shutdown(wait=False)
 
 @app.get("/")
 def read_root():
     return {"message": "Hello, Trading AI!"}
+
+@app.get("/health", response_model=HealthResponse, responses={503: {"model": HealthResponse}})
+def health_check():
+    """Stato del servizio e versione del modello attiva."""
+    model_status = model_registry.status()
+    if model_registry.get() is not None:
+        return {"status": "healthy", "message": "API pronta per l'uso", **model_status}
+    return ORJSONResponse(
+        {"status": "degraded", "message": "Modello non caricato", **model_status}, status_code=503
+    )
+
+@app.post(
+    "/predict",
+    response_model=Union[PredictionResponse, BatchPredictionResponse],
+    responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}, 503: {"model": ErrorResponse}},
+    openapi_extra=PREDICT_REQUEST_SCHEMA,
+)
+async def predict(request: Request):
+    """
+    Genera previsioni e decisioni di trading. Il corpo viene letto con orjson
+    e convertito direttamente in matrice float32, senza validazione per record.
+    """
+    active = model_registry.get()
+    if active is None:
+        return ORJSONResponse({"status": "error", "message": "Modello non disponibile"}, status_code=503)
+
+    try:
+        features, single = parse_features(orjson.loads(await request.body()))
+    except (FeatureError, orjson.JSONDecodeError, ValueError, TypeError) as e:
+        return ORJSONResponse({"status": "error", "message": str(e)}, status_code=400)
+
+    try:
+        loop = asyncio.get_running_loop()
+        predictions = await loop.run_in_executor(inference_executor, predict_with_cache, active, features)
+        return ORJSONResponse(build_prediction_response(predictions, single))
+    except Exception as e:
+        return ORJSONResponse({"status": "error", "message": str(e)}, status_code=500)
+
+@app.get(
+    "/predict/{symbol}",
+    response_model=SymbolPredictionResponse,
+    responses={
+        400: {"model": ErrorResponse},
+        404: {"model": ErrorResponse},
+        422: {"model": InsufficientHistoryResponse},
+        503: {"model": ErrorResponse},
+    },
+)
+async def predict_for_symbol(symbol: str, interval: str = "1d"):
+    """Previsione in un solo passaggio: feature calcolate lato server dalle ultime barre del simbolo."""
+    active = model_registry.get()
+    if active is None:
+        return ORJSONResponse({"status": "error", "message": "Modello non disponibile"}, status_code=503)
+
+    try:
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(inference_executor, predict_symbol, active, symbol, interval)
+        return ORJSONResponse(response)
+    except SymbolNotFoundError as e:
+        return ORJSONResponse({"status": "error", "message": str(e)}, status_code=404)
+    except InsufficientHistoryError as e:
+        return ORJSONResponse(
+            {"status": "error", "message": str(e), "bars": e.bars, "required_bars": e.required},
+            status_code=422,
+        )
+    except ValueError as e:
+        return ORJSONResponse({"status": "error", "message": str(e)}, status_code=400)
+    except Exception as e:
+        return ORJSONResponse({"status": "error", "message": str(e)}, status_code=500)
+
+@app.get("/metrics")
+def metrics():
+    """Metriche di batching e cache del worker corrente."""
+    return {
+        "batching": batcher.metrics() if batcher is not None else None,
+        "prediction_cache": prediction_cache.metrics() if prediction_cache is not None else None,
+        "symbol_features": symbol_features.metrics(),
+    }
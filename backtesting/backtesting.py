@@ -1,55 +1,79 @@
+import os
+import sys
 import pandas as pd
 import numpy as np
-import joblib
-from stable_baselines3 import PPO
-from google.cloud import storage
-from sklearn.metrics import mean_squared_error
 
-BUCKET_NAME = "trading-ai-bucket"
+# Radice del progetto in testa: eseguendo lo script, la sua directory (che contiene
+# backtesting.py) verrebbe altrimenti cercata prima del pacchetto backtesting
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from model.booster import load_preferred_model
+from model.artifact_cache import ARTIFACT_SOURCE, get_artifact_cache
+from backtesting.engine import BUY_THRESHOLD, SELL_THRESHOLD, backtest_predictions, to_panel, summarize
+from backtesting.walk_forward import walk_forward, evaluate_out_of_sample
+from backtesting.metrics import compute_metrics
 
-def download_from_gcs(bucket_name, source_blob_name, destination_file_name):
-    """Scarica un file da Google Cloud Storage."""
-    client = storage.Client()
-    bucket = client.bucket(bucket_name)
-    blob = bucket.blob(source_blob_name)
-    blob.download_to_filename(destination_file_name)
-    print(f"✔ Scaricato {source_blob_name} da {bucket_name} a {destination_file_name}")
+BUCKET_NAME = "trading-ai-bucket"
 
 class Backtesting:
-    def __init__(self, data_file="historical_data.csv"):
-        # Scarica i dati e i modelli da Google Cloud Storage
-        download_from_gcs(BUCKET_NAME, "historical_data.csv", "historical_data.csv")
-        download_from_gcs(BUCKET_NAME, "xgboost_model.pkl", "xgboost_model.pkl")
-        download_from_gcs(BUCKET_NAME, "rl_model.zip", "rl_model.zip")
+    def __init__(self, data_file="historical_data.csv", artifact_source=None):
+        # Dati e modelli dalla cache locale degli artefatti: vengono scaricati da GCS
+        # (o copiati dalla directory ARTIFACT_SOURCE) solo se sono cambiati
+        cache = get_artifact_cache(artifact_source or ARTIFACT_SOURCE or f"gs://{BUCKET_NAME}")
+        cache.fetch("historical_data.csv", "historical_data.csv")
+        cache.fetch("xgboost_model.pkl", "xgboost_model.pkl")
+        try:
+            cache.fetch("xgboost_model.ubj", "xgboost_model.ubj")
+        except Exception as e:
+            # load_preferred_model preferisce il .ubj: una copia locale di una versione
+            # precedente prevarrebbe sul pickle appena scaricato
+            if os.path.exists("xgboost_model.ubj"):
+                os.remove("xgboost_model.ubj")
+            print(f"⚠️ Booster nativo non disponibile, uso il pickle: {e}")
 
-        # Carica i dati e i modelli
+        # Carica i dati e il modello
         self.data = pd.read_csv(data_file)
-        self.xgb_model = joblib.load("xgboost_model.pkl")
-        self.rl_model = PPO.load("rl_model.zip")
-
-    def compute_metrics(self, returns):
-        sharpe_ratio = returns.mean() / returns.std()
-        max_drawdown = np.min(returns)
-        win_loss_ratio = (returns > 0).sum() / (returns < 0).sum()
-        return {
-            "Sharpe Ratio": sharpe_ratio,
-            "Max Drawdown": max_drawdown,
-            "Win/Loss Ratio": win_loss_ratio
-        }
-
-    def run(self):
-        features = self.data[["SMA_50", "SMA_200", "RSI", "ATR", "VWAP"]]
-        actual_returns = self.data["future_return"]
+        self.xgb_model = load_preferred_model("xgboost_model.pkl")
 
+    def compute_metrics(self, returns, turnover=None):
+        """
+        Metriche annualizzate della serie di rendimenti (vedi backtesting/metrics.py):
+        Sharpe, Sortino, massimo drawdown della curva di equity, Calmar, hit rate e
+        Win/Loss (NaN se non ci sono periodi in perdita) e, se indicato, turnover.
+        """
+        table = compute_metrics(np.asarray(returns, dtype=np.float64), turnover=turnover)
+        return {name: float(value) for name, value in table.iloc[0].items()}
+
+    def run(self, buy_threshold=BUY_THRESHOLD, sell_threshold=SELL_THRESHOLD, **engine_kwargs):
+        """
+        Backtest delle previsioni XGBoost con posizioni long/short dalle soglie di /predict,
+        commissioni, slippage e curva di equity (vedi backtesting/engine.py).
+        """
+        features = self.data[["SMA_50", "SMA_200", "RSI", "ATR", "VWAP"]]
         predicted_returns = self.xgb_model.predict(features)
-        action, _ = self.rl_model.predict(features.to_numpy())
 
-        returns = predicted_returns * action
-        metrics = self.compute_metrics(returns)
+        predictions, _, _ = to_panel(self.data, predicted_returns)
+        actual_returns, _, _ = to_panel(self.data, self.data["future_return"], column="future_return")
+
+        self.result = backtest_predictions(
+            predictions, actual_returns, buy_threshold=buy_threshold, sell_threshold=sell_threshold, **engine_kwargs
+        )
+        metrics = {**self.compute_metrics(self.result.portfolio_returns, self.result.turnover), **summarize(self.result)}
 
         print(f"✔ Backtesting Completed. Metrics: {metrics}")
         return metrics
 
+    def run_walk_forward(self, train_periods, test_periods, workers=None, **engine_kwargs):
+        """
+        Valutazione fuori campione: un modello per fold addestrato in parallelo
+        (vedi backtesting/walk_forward.py) invece del modello addestrato su tutti i dati.
+        """
+        data, predictions, folds = walk_forward(self.data, train_periods, test_periods, workers=workers)
+        self.result, metrics = evaluate_out_of_sample(data, predictions, **engine_kwargs)
+        metrics = {**metrics, "Folds": len(folds)}
+
+        print(f"✔ Walk-forward Completed. Metrics: {metrics}")
+        return metrics
+
 if __name__ == "__main__":
     backtester = Backtesting()
     backtester.run()
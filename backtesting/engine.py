@@ -0,0 +1,173 @@
+"""
+Motore di backtest vettorizzato su matrici (tempo × simbolo).
+
+Le previsioni di rendimento dell'XGBoost vengono convertite in segnali long/short
+con le stesse soglie di /predict (BUY sopra BUY_THRESHOLD, SELL sotto
+SELL_THRESHOLD). Le posizioni, i costi di commissione e slippage sul turnover e
+le curve di equity sono calcolati con operazioni NumPy su tutto il pannello, senza
+cicli sulle barre o sui simboli.
+
+Convenzione temporale: la posizione decisa alla barra t (feature note alla
+chiusura di t) matura il rendimento future_return[t], cioè da t a t+1.
+
+Buchi nei dati: dove il rendimento è NaN (simbolo non quotato) la posizione è
+chiusa e non viene ripresa alla fine del buco; serve un nuovo segnale BUY/SELL.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# Soglie di decisione di /predict (scripts/api_service.py)
+BUY_THRESHOLD = 0.02
+SELL_THRESHOLD = -0.01
+
+# Costi in punti base sul valore scambiato
+DEFAULT_FEE_BPS = 1.0
+DEFAULT_SLIPPAGE_BPS = 2.0
+
+TRADING_DAYS = 252
+
+BacktestResult = namedtuple("BacktestResult", [
+    "positions",          # (T, N) posizione per simbolo: -1, 0, 1
+    "gross_returns",      # (T, N) rendimento delle posizioni prima dei costi
+    "costs",              # (T, N) costi di commissione e slippage
+    "net_returns",        # (T, N) rendimento netto per simbolo
+    "portfolio_returns",  # (T,) rendimento netto del portafoglio
+    "portfolio_costs",    # (T,) costi del portafoglio (frazione del capitale)
+    "equity",             # (T,) curva di equity del portafoglio
+    "turnover",           # (T,) turnover del portafoglio (frazione del capitale)
+    "trades",             # numero di variazioni di posizione
+])
+
+def _as_panel(values):
+    values = np.asarray(values, dtype=np.float64)
+    return values[:, None] if values.ndim == 1 else values
+
+def threshold_signals(predictions, buy_threshold=BUY_THRESHOLD, sell_threshold=SELL_THRESHOLD):
+    """Segnali BUY (+1), SELL (-1) e HOLD (0) dalle previsioni di rendimento, come decide() di /predict."""
+    predictions = _as_panel(predictions)
+    return np.select([predictions > buy_threshold, predictions < sell_threshold], [1, -1], default=0).astype(np.int8)
+
+def signals_to_positions(signals, hold=True, allow_short=True, tradable=None):
+    """
+    Converte i segnali in posizioni.
+
+    Args:
+        signals (np.ndarray): Segnali (T, N) in {-1, 0, 1}
+        hold (bool): Se True un HOLD mantiene la posizione precedente, altrimenti la chiude
+        allow_short (bool): Se False un SELL chiude la posizione invece di andare short
+        tradable (np.ndarray, optional): Maschera (T, N) delle barre negoziabili; nelle
+            altre la posizione è chiusa e un HOLD successivo resta flat
+    """
+    signals = np.asarray(signals, dtype=np.int8)
+    # Posizione obiettivo di ogni segnale; in long-only un SELL chiude la posizione
+    targets = signals if allow_short else np.where(signals < 0, 0, signals)
+    events = signals != 0
+    if tradable is not None:
+        # Una barra non negoziabile equivale a un segnale di chiusura
+        tradable = np.asarray(tradable, dtype=bool).reshape(signals.shape)
+        targets = np.where(tradable, targets, 0)
+        events = events | ~tradable
+    if not hold:
+        return targets.astype(np.float64)
+
+    # Ultimo evento (segnale non neutro o buco) fino a t: forward fill vettorizzato sull'asse del tempo
+    rows = np.arange(len(signals))[:, None]
+    last = np.maximum.accumulate(np.where(events, rows, -1), axis=0)
+    filled = np.take_along_axis(targets, np.maximum(last, 0), axis=0)
+    return np.where(last >= 0, filled, 0).astype(np.float64)
+
+def run_backtest(positions, returns, fee_bps=DEFAULT_FEE_BPS, slippage_bps=DEFAULT_SLIPPAGE_BPS,
+                 weights=None, initial_capital=1.0):
+    """
+    Simula posizioni, costi e curva di equity.
+
+    Args:
+        positions (np.ndarray): Posizioni (T, N) o (T,) in unità di esposizione per simbolo
+        returns (np.ndarray): Rendimenti realizzati (T, N) da t a t+1; NaN dove il simbolo non è quotato
+        fee_bps, slippage_bps (float): Costi in punti base sul valore scambiato
+        weights (np.ndarray, optional): Peso del capitale per simbolo (N,); default 1/N
+        initial_capital (float): Capitale iniziale
+
+    Returns:
+        BacktestResult
+    """
+    positions = _as_panel(positions)
+    returns = _as_panel(returns)
+    if positions.shape != returns.shape:
+        raise ValueError(f"Forme diverse: posizioni {positions.shape}, rendimenti {returns.shape}")
+
+    n_symbols = returns.shape[1]
+    weights = np.full(n_symbols, 1.0 / n_symbols) if weights is None else np.asarray(weights, dtype=np.float64)
+
+    # Nessuna posizione dove il rendimento non è disponibile
+    tradable = ~np.isnan(returns)
+    positions = np.where(tradable, positions, 0.0)
+    returns = np.where(tradable, returns, 0.0)
+
+    changes = np.abs(np.diff(positions, axis=0, prepend=0.0))
+    costs = changes * (fee_bps + slippage_bps) / 1e4
+    gross_returns = positions * returns
+    net_returns = gross_returns - costs
+
+    portfolio_returns = net_returns @ weights
+    portfolio_costs = costs @ weights
+    equity = initial_capital * np.cumprod(1.0 + portfolio_returns)
+    turnover = changes @ weights
+
+    return BacktestResult(
+        positions=positions,
+        gross_returns=gross_returns,
+        costs=costs,
+        net_returns=net_returns,
+        portfolio_returns=portfolio_returns,
+        portfolio_costs=portfolio_costs,
+        equity=equity,
+        turnover=turnover,
+        trades=int(np.count_nonzero(changes)),
+    )
+
+def backtest_predictions(predictions, returns, buy_threshold=BUY_THRESHOLD, sell_threshold=SELL_THRESHOLD,
+                         hold=True, allow_short=True, **kwargs):
+    """
+    Segnali dalle soglie di /predict, posizioni e simulazione in un solo passaggio.
+    Le posizioni si azzerano dove il rendimento è NaN e restano flat fino al segnale successivo.
+    """
+    signals = threshold_signals(predictions, buy_threshold, sell_threshold)
+    tradable = ~np.isnan(_as_panel(returns))
+    positions = signals_to_positions(signals, hold=hold, allow_short=allow_short, tradable=tradable)
+    return run_backtest(positions, returns, **kwargs)
+
+def to_panel(data, values, column="prediction"):
+    """
+    Porta una colonna di valori allineata a `data` in forma (T, N).
+
+    Se data contiene le colonne date e symbol (come il dataset costruito da
+    build_training_data) i valori vengono ruotati per data × simbolo; altrimenti
+    data è trattato come la serie di un singolo simbolo (es. historical_data.csv).
+
+    Returns:
+        tuple: (np.ndarray (T, N), indice delle date o None, simboli o None)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if {"date", "symbol"}.issubset(data.columns):
+        frame = pd.DataFrame({"date": data["date"].to_numpy(), "symbol": data["symbol"].to_numpy(), column: values})
+        wide = frame.pivot(index="date", columns="symbol", values=column).sort_index()
+        return wide.to_numpy(), wide.index, wide.columns
+    return values[:, None], None, None
+
+def summarize(result, periods_per_year=TRADING_DAYS):
+    """Riepilogo essenziale di un backtest (rendimento totale, CAGR, costi, operazioni)."""
+    n_periods = len(result.portfolio_returns)
+    growth = float(np.prod(1.0 + result.portfolio_returns))
+    years = n_periods / periods_per_year
+    return {
+        "Total Return": growth - 1.0,
+        "CAGR": growth ** (1 / years) - 1.0 if n_periods and growth > 0 else float("nan"),
+        "Final Equity": float(result.equity[-1]) if n_periods else float("nan"),
+        "Total Costs": float(result.portfolio_costs.sum()),
+        "Trades": result.trades,
+        "Avg Turnover": float(result.turnover.mean()) if n_periods else 0.0,
+    }
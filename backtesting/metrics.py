@@ -0,0 +1,124 @@
+"""
+Metriche di rischio e rendimento vettorizzate.
+
+Tutte le funzioni accettano una serie (T,) o una matrice (T, S) di rendimenti
+periodali, una colonna per strategia, e calcolano le metriche di tutte le
+strategie in un solo passaggio NumPy. Le metriche non definite (es. Sharpe con
+volatilità nulla, Calmar senza drawdown) valgono NaN invece di generare divisioni
+per zero.
+"""
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+
+def _as_matrix(values):
+    values = np.asarray(values, dtype=np.float64)
+    return values[:, None] if values.ndim == 1 else values
+
+def _safe_divide(numerator, denominator):
+    numerator, denominator = np.broadcast_arrays(np.asarray(numerator, dtype=np.float64),
+                                                 np.asarray(denominator, dtype=np.float64))
+    result = np.full(numerator.shape, np.nan)
+    np.divide(numerator, denominator, out=result, where=denominator != 0)
+    return result
+
+def sharpe_ratio(returns, periods_per_year=TRADING_DAYS, risk_free=0.0):
+    """Sharpe annualizzato per colonna (rendimento in eccesso medio / deviazione standard)."""
+    excess = _as_matrix(returns) - risk_free / periods_per_year
+    return _safe_divide(excess.mean(axis=0), excess.std(axis=0, ddof=1)) * np.sqrt(periods_per_year)
+
+def rolling_sharpe(returns, window, periods_per_year=TRADING_DAYS):
+    """
+    Sharpe annualizzato su finestra mobile, calcolato con somme cumulative di r e r²
+    (O(T·S) indipendentemente dalla finestra). NaN finché la finestra non è completa.
+    """
+    returns = _as_matrix(returns)
+    zero = np.zeros((1, returns.shape[1]))
+    cum = np.concatenate([zero, np.cumsum(returns, axis=0)])
+    cum_sq = np.concatenate([zero, np.cumsum(returns ** 2, axis=0)])
+    total = cum[window:] - cum[:-window]
+    total_sq = cum_sq[window:] - cum_sq[:-window]
+    mean = total / window
+    variance = np.maximum(total_sq - window * mean ** 2, 0.0) / (window - 1)
+    result = np.full(returns.shape, np.nan)
+    result[window - 1:] = _safe_divide(mean, np.sqrt(variance)) * np.sqrt(periods_per_year)
+    return result
+
+def sortino_ratio(returns, periods_per_year=TRADING_DAYS, target=0.0):
+    """Sortino annualizzato: rendimento medio in eccesso / deviazione al ribasso sotto target."""
+    excess = _as_matrix(returns) - target
+    downside = np.sqrt(np.mean(np.minimum(excess, 0.0) ** 2, axis=0))
+    return _safe_divide(excess.mean(axis=0), downside) * np.sqrt(periods_per_year)
+
+def equity_curve(returns):
+    """Curva di equity (capitale iniziale 1) per colonna."""
+    return np.cumprod(1.0 + _as_matrix(returns), axis=0)
+
+def drawdowns(returns):
+    """Drawdown di ogni periodo rispetto al massimo precedente della curva di equity (valori ≤ 0)."""
+    equity = equity_curve(returns)
+    peaks = np.maximum(np.maximum.accumulate(equity, axis=0), 1.0)
+    return equity / peaks - 1.0
+
+def max_drawdown(returns):
+    """Massimo drawdown per colonna (valore negativo, 0 se la curva non scende mai sotto il massimo)."""
+    returns = _as_matrix(returns)
+    if len(returns) == 0:
+        return np.zeros(returns.shape[1])
+    return drawdowns(returns).min(axis=0)
+
+def cagr(returns, periods_per_year=TRADING_DAYS):
+    """Tasso di crescita annuo composto per colonna."""
+    returns = _as_matrix(returns)
+    if len(returns) == 0:
+        return np.full(returns.shape[1], np.nan)
+    growth = np.prod(1.0 + returns, axis=0)
+    years = len(returns) / periods_per_year
+    with np.errstate(invalid="ignore"):
+        return np.where(growth > 0, growth ** (1.0 / years) - 1.0, -1.0)
+
+def calmar_ratio(returns, periods_per_year=TRADING_DAYS):
+    """CAGR diviso il valore assoluto del massimo drawdown."""
+    return _safe_divide(cagr(returns, periods_per_year), np.abs(max_drawdown(returns)))
+
+def hit_rate(returns):
+    """Quota di periodi positivi sui periodi con rendimento non nullo."""
+    returns = _as_matrix(returns)
+    return _safe_divide((returns > 0).sum(axis=0), (returns != 0).sum(axis=0))
+
+def win_loss_ratio(returns):
+    """Numero di periodi positivi diviso numero di periodi negativi (NaN senza perdite)."""
+    returns = _as_matrix(returns)
+    return _safe_divide((returns > 0).sum(axis=0), (returns < 0).sum(axis=0))
+
+def annualized_turnover(turnover, periods_per_year=TRADING_DAYS):
+    """Turnover medio per periodo, annualizzato (es. 12 = capitale ruotato 12 volte l'anno)."""
+    return _as_matrix(turnover).mean(axis=0) * periods_per_year
+
+def compute_metrics(returns, turnover=None, periods_per_year=TRADING_DAYS, names=None):
+    """
+    Calcola tutte le metriche per ciascuna strategia (colonna) in un solo passaggio.
+
+    Args:
+        returns (array-like): Rendimenti (T,) o (T, S)
+        turnover (array-like, optional): Turnover per periodo della stessa forma
+        names (list, optional): Nomi delle strategie per l'indice del risultato
+
+    Returns:
+        pd.DataFrame: Una riga per strategia
+    """
+    returns = _as_matrix(returns)
+    metrics = {
+        "Sharpe Ratio": sharpe_ratio(returns, periods_per_year),
+        "Sortino Ratio": sortino_ratio(returns, periods_per_year),
+        "Max Drawdown": max_drawdown(returns),
+        "CAGR": cagr(returns, periods_per_year),
+        "Calmar Ratio": calmar_ratio(returns, periods_per_year),
+        "Hit Rate": hit_rate(returns),
+        "Win/Loss Ratio": win_loss_ratio(returns),
+    }
+    if turnover is not None:
+        metrics["Annual Turnover"] = annualized_turnover(turnover, periods_per_year)
+    return pd.DataFrame(metrics, index=names)
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+sweep.py - Ricerca a griglia di soglie BUY/SELL e iperparametri XGBoost.
+
+Per ogni combinazione di iperparametri il modello viene addestrato una sola volta
+sulla parte iniziale del dataset e le sue previsioni fuori campione vengono
+copiate in un blocco di memoria condivisa, insieme ai rendimenti realizzati. I
+backtest delle combinazioni di soglie girano poi in un pool di processi: ogni
+worker legge le matrici dalla memoria condivisa senza che vengano serializzate
+per ogni task. I risultati sono ordinati per Sharpe e drawdown in un'unica tabella.
+
+Uso:
+    python backtesting/sweep.py --data backtesting/historical_data.csv \\
+        --buy 0.01,0.02,0.03 --sell=-0.005,-0.01,-0.02 --max-depth 3,5 --workers 8
+
+Le liste che iniziano con un segno meno vanno passate con "=" (--sell=-0.01),
+altrimenti argparse le scambia per un'opzione.
+"""
+
+import os
+import sys
+import time
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+# Radice del progetto in testa: eseguendo lo script, la sua directory (che contiene
+# backtesting.py) verrebbe altrimenti cercata prima del pacchetto backtesting
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backtesting.engine import BUY_THRESHOLD, SELL_THRESHOLD, backtest_predictions, to_panel
+from backtesting.metrics import compute_metrics
+from model.panel_indicators import FEATURES
+from model.train_model import DEFAULT_MODEL_PARAMS
+
+# Quota iniziale del dataset (in ordine temporale) usata per l'addestramento
+DEFAULT_TRAIN_FRACTION = 0.7
+# Periodi esclusi tra addestramento e test: l'etichetta future_return dell'ultima
+# barra di addestramento (rendimento t -> t+1) coprirebbe la prima barra di test
+DEFAULT_GAP_PERIODS = 1
+
+class SharedArray:
+    """Array NumPy in un blocco di memoria condivisa, ricostruibile in altri processi dal nome."""
+
+    def __init__(self, array):
+        array = np.ascontiguousarray(array)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self.spec = (self.shm.name, array.shape, array.dtype.str)
+        np.ndarray(array.shape, dtype=array.dtype, buffer=self.shm.buf)[...] = array
+
+    @staticmethod
+    def attach(spec):
+        """Restituisce (vista ndarray, handle da mantenere in vita) per uno spec creato altrove."""
+        name, shape, dtype = spec
+        shm = shared_memory.SharedMemory(name=name)
+        return np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf), shm
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+# Matrici condivise agganciate da ciascun worker
+_worker_arrays = {}
+
+def _init_worker(predictions_spec, returns_spec):
+    predictions, predictions_shm = SharedArray.attach(predictions_spec)
+    returns, returns_shm = SharedArray.attach(returns_spec)
+    _worker_arrays.update(
+        predictions=predictions, returns=returns, handles=(predictions_shm, returns_shm)
+    )
+
+def _run_task(task):
+    """
+    Backtest di una combinazione (indice modello, soglie, costi) sulle matrici condivise.
+    Le metriche vengono calcolate dal processo principale su tutte le strategie insieme.
+    """
+    model_index, buy_threshold, sell_threshold, engine_kwargs = task
+    result = backtest_predictions(
+        _worker_arrays["predictions"][model_index], _worker_arrays["returns"],
+        buy_threshold=buy_threshold, sell_threshold=sell_threshold, **engine_kwargs
+    )
+    row = {
+        "model_index": model_index,
+        "buy_threshold": buy_threshold,
+        "sell_threshold": sell_threshold,
+        "trades": result.trades,
+    }
+    return row, result.portfolio_returns, result.turnover
+
+def time_split(data, train_fraction=DEFAULT_TRAIN_FRACTION, gap=DEFAULT_GAP_PERIODS):
+    """
+    Divide il dataset in addestramento e valutazione rispettando l'ordine temporale,
+    escludendo dall'addestramento gli ultimi `gap` periodi prima del test.
+    """
+    if "date" in data.columns:
+        dates = np.sort(data["date"].unique())
+        split = int(len(dates) * train_fraction)
+        train_end = dates[max(split - gap, 0)]
+        return data[data["date"] < train_end], data[data["date"] >= dates[split]]
+    split = int(len(data) * train_fraction)
+    return data.iloc[:max(split - gap, 0)], data.iloc[split:]
+
+def train_predictions(train, test, model_grid):
+    """
+    Addestra un modello per ogni combinazione di iperparametri e restituisce le
+    previsioni sul periodo di valutazione come matrice (n_modelli, T, N).
+    """
+    panels = []
+    for params in model_grid:
+        model = xgb.XGBRegressor(**params)
+        model.fit(train[FEATURES].to_numpy(np.float32), train["future_return"].to_numpy())
+        predictions = model.get_booster().inplace_predict(test[FEATURES].to_numpy(np.float32))
+        panel, _, _ = to_panel(test, predictions)
+        panels.append(panel)
+    return np.stack(panels)
+
+def run_sweep(data, buy_thresholds, sell_thresholds, model_grid=None, workers=None,
+              train_fraction=DEFAULT_TRAIN_FRACTION, gap=DEFAULT_GAP_PERIODS, **engine_kwargs):
+    """
+    Esegue la ricerca a griglia e restituisce i risultati ordinati.
+
+    Args:
+        data (pd.DataFrame): Feature e future_return (con date/symbol per più simboli)
+        buy_thresholds, sell_thresholds (list): Soglie da combinare (solo coppie con buy > sell)
+        model_grid (list): Dizionari di iperparametri XGBRegressor
+        workers (int): Processi del pool (default: numero di CPU)
+        gap (int): Periodi esclusi tra addestramento e valutazione
+        engine_kwargs: Parametri del motore di backtest (fee_bps, slippage_bps, hold, allow_short)
+
+    Returns:
+        pd.DataFrame: Una riga per combinazione con Sharpe, max drawdown e ranking
+    """
+    model_grid = model_grid or [DEFAULT_MODEL_PARAMS]
+    train, test = time_split(data, train_fraction, gap)
+
+    start = time.perf_counter()
+    predictions = train_predictions(train, test, model_grid)
+    returns, _, _ = to_panel(test, test["future_return"], column="future_return")
+    print(f"✔ {len(model_grid)} modelli addestrati in {time.perf_counter() - start:.1f}s "
+          f"(valutazione su {returns.shape[0]} barre × {returns.shape[1]} simboli)")
+
+    tasks = [
+        (model_index, buy, sell, engine_kwargs)
+        for model_index in range(len(model_grid))
+        for buy, sell in itertools.product(buy_thresholds, sell_thresholds)
+        if buy > sell
+    ]
+
+    workers = workers or os.cpu_count() or 1
+    shared_predictions = SharedArray(predictions)
+    shared_returns = SharedArray(returns)
+    try:
+        start = time.perf_counter()
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(shared_predictions.spec, shared_returns.spec),
+        ) as executor:
+            outputs = list(executor.map(_run_task, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
+        print(f"✔ {len(tasks)} backtest completati in {time.perf_counter() - start:.1f}s")
+    finally:
+        shared_predictions.close()
+        shared_returns.close()
+
+    # Metriche di tutte le strategie in un solo passaggio sulla matrice (T, strategie)
+    rows, strategy_returns, strategy_turnover = zip(*outputs)
+    metrics = compute_metrics(np.column_stack(strategy_returns), turnover=np.column_stack(strategy_turnover))
+    metrics.columns = [name.lower().replace(" ", "_").replace("/", "_") for name in metrics.columns]
+    results = pd.concat([pd.DataFrame(rows), metrics.reset_index(drop=True)], axis=1)
+    params = pd.DataFrame(model_grid)
+    results = results.join(params, on="model_index")
+    results["sharpe_rank"] = results["sharpe_ratio"].rank(ascending=False, method="min")
+    results["drawdown_rank"] = results["max_drawdown"].rank(ascending=False, method="min")
+    results["rank"] = (results["sharpe_rank"] + results["drawdown_rank"]).rank(method="min")
+    return results.sort_values(["rank", "sharpe_ratio"], ascending=[True, False]).reset_index(drop=True)
+
+def _parse_list(value, cast=float):
+    return [cast(item) for item in value.split(",") if item.strip()]
+
+def main():
+    parser = argparse.ArgumentParser(description="Ricerca a griglia di soglie e iperparametri con backtest paralleli")
+    parser.add_argument("--data", default="backtesting/historical_data.csv", help="CSV con feature e future_return")
+    parser.add_argument("--buy", default=str(BUY_THRESHOLD), help="Soglie BUY separate da virgola")
+    parser.add_argument("--sell", default=str(SELL_THRESHOLD), help="Soglie SELL separate da virgola (es. --sell=-0.005,-0.01)")
+    parser.add_argument("--n-estimators", default=str(DEFAULT_MODEL_PARAMS["n_estimators"]))
+    parser.add_argument("--learning-rate", default=str(DEFAULT_MODEL_PARAMS["learning_rate"]))
+    parser.add_argument("--max-depth", default=str(DEFAULT_MODEL_PARAMS["max_depth"]))
+    parser.add_argument("--fee-bps", type=float, default=1.0)
+    parser.add_argument("--slippage-bps", type=float, default=2.0)
+    parser.add_argument("--train-fraction", type=float, default=DEFAULT_TRAIN_FRACTION)
+    parser.add_argument("--gap", type=int, default=DEFAULT_GAP_PERIODS, help="Periodi tra addestramento e test")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default=None, help="CSV in cui salvare la tabella dei risultati")
+    args = parser.parse_args()
+
+    data = pd.read_csv(args.data)
+    if "date" in data.columns:
+        data["date"] = pd.to_datetime(data["date"])
+    model_grid = [
+        {"n_estimators": n_estimators, "learning_rate": learning_rate, "max_depth": max_depth}
+        for n_estimators, learning_rate, max_depth in itertools.product(
+            _parse_list(args.n_estimators, int), _parse_list(args.learning_rate), _parse_list(args.max_depth, int)
+        )
+    ]
+
+    results = run_sweep(
+        data, _parse_list(args.buy), _parse_list(args.sell), model_grid,
+        workers=args.workers, train_fraction=args.train_fraction, gap=args.gap,
+        fee_bps=args.fee_bps, slippage_bps=args.slippage_bps,
+    )
+    print(results.head(20).to_string(index=False))
+    if args.output:
+        results.to_csv(args.output, index=False)
+        print(f"✔ Risultati salvati in {args.output}")
+
+if __name__ == "__main__":
+    main()
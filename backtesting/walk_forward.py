@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+walk_forward.py - Addestramento e valutazione walk-forward.
+
+Il dataset viene letto una volta sola, ordinato per data e convertito in una
+matrice di feature float32 contigua, copiata in memoria condivisa. Ogni fold
+(finestra di addestramento seguita da una finestra di test) corrisponde a un
+intervallo di righe: i worker del pool di processi addestrano il proprio modello
+su viste X[inizio:fine] della matrice condivisa, senza copie né riletture del CSV.
+Le previsioni fuori campione dei fold vengono ricomposte in un'unica serie e
+passate al motore di backtest.
+
+Uso:
+    python backtesting/walk_forward.py --data training_data.csv \\
+        --train-periods 756 --test-periods 126 --workers 4
+"""
+
+import os
+import sys
+import time
+import argparse
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+# Radice del progetto in testa: eseguendo lo script, la sua directory (che contiene
+# backtesting.py) verrebbe altrimenti cercata prima del pacchetto backtesting
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backtesting.engine import backtest_predictions, to_panel, summarize
+from backtesting.sweep import SharedArray, DEFAULT_GAP_PERIODS
+from backtesting.metrics import compute_metrics
+from model.panel_indicators import FEATURES
+from model.train_model import DEFAULT_MODEL_PARAMS
+
+# Intervalli di righe di un fold: addestramento [train_start, train_end), test [test_start, test_end)
+Fold = namedtuple("Fold", ["index", "train_start", "train_end", "test_start", "test_end"])
+
+class InsufficientDataError(ValueError):
+    """Il dataset non contiene abbastanza periodi per almeno un fold."""
+
+def prepare_matrices(data):
+    """
+    Ordina il dataset per data e restituisce (dati ordinati, X float32 contigua, y float32,
+    codice del periodo di ogni riga). Senza colonna date ogni riga è un periodo.
+    """
+    if "date" in data.columns:
+        data = data.sort_values("date", kind="stable").reset_index(drop=True)
+        periods = pd.factorize(data["date"], sort=True)[0]
+    else:
+        data = data.reset_index(drop=True)
+        periods = np.arange(len(data))
+    X = np.ascontiguousarray(data[FEATURES].to_numpy(dtype=np.float32))
+    y = np.ascontiguousarray(data["future_return"].to_numpy(dtype=np.float32))
+    return data, X, y, periods
+
+def make_folds(periods, train_periods, test_periods, step=None, expanding=False, gap=DEFAULT_GAP_PERIODS):
+    """
+    Costruisce i fold walk-forward sugli intervalli di righe (periods ordinati).
+
+    Args:
+        periods (np.ndarray): Codice del periodo di ogni riga, non decrescente
+        train_periods, test_periods (int): Lunghezza delle finestre in periodi
+        step (int): Avanzamento tra fold consecutivi (default: test_periods)
+        expanding (bool): Se True la finestra di addestramento parte sempre dall'inizio
+        gap (int): Periodi esclusi tra la fine dell'addestramento e l'inizio del test,
+            perché l'etichetta future_return dell'ultima barra di addestramento
+            (rendimento t -> t+1) non copra la prima barra di test
+    """
+    step = step or test_periods
+    n_periods = int(periods[-1]) + 1 if len(periods) else 0
+    # Prima riga di ciascun periodo (più una sentinella finale)
+    boundaries = np.searchsorted(periods, np.arange(n_periods + 1))
+
+    folds = []
+    test_start = train_periods + gap
+    while test_start < n_periods:
+        train_end = test_start - gap
+        train_start = 0 if expanding else train_end - train_periods
+        test_end = min(test_start + test_periods, n_periods)
+        folds.append(Fold(
+            len(folds),
+            int(boundaries[train_start]), int(boundaries[train_end]),
+            int(boundaries[test_start]), int(boundaries[test_end]),
+        ))
+        test_start += step
+    return folds
+
+# Matrici condivise agganciate da ciascun worker
+_worker_arrays = {}
+
+def _init_worker(X_spec, y_spec, model_params):
+    X, X_shm = SharedArray.attach(X_spec)
+    y, y_shm = SharedArray.attach(y_spec)
+    _worker_arrays.update(X=X, y=y, model_params=model_params, handles=(X_shm, y_shm))
+
+def _train_fold(fold):
+    """Addestra sul fold e restituisce (fold, previsioni fuori campione)."""
+    X, y = _worker_arrays["X"], _worker_arrays["y"]
+    # Viste sulla memoria condivisa: nessuna copia dei dati
+    model = xgb.XGBRegressor(**_worker_arrays["model_params"])
+    model.fit(X[fold.train_start:fold.train_end], y[fold.train_start:fold.train_end])
+    return fold, model.get_booster().inplace_predict(X[fold.test_start:fold.test_end])
+
+def walk_forward(data, train_periods, test_periods, step=None, expanding=False,
+                 model_params=None, workers=None, gap=DEFAULT_GAP_PERIODS):
+    """
+    Esegue l'addestramento walk-forward in parallelo.
+
+    Returns:
+        tuple: (dati ordinati, previsioni fuori campione allineate alle righe con NaN
+                fuori dai periodi di test, lista dei fold)
+    """
+    data, X, y, periods = prepare_matrices(data)
+    folds = make_folds(periods, train_periods, test_periods, step, expanding, gap)
+    if not folds:
+        n_periods = int(periods[-1]) + 1 if len(periods) else 0
+        raise InsufficientDataError(
+            f"Dataset troppo corto: {n_periods} periodi (date distinte, o righe per un solo simbolo), "
+            f"ne servono almeno {train_periods + gap + 1} (train_periods + gap + 1) per un fold"
+        )
+
+    workers = workers or min(len(folds), os.cpu_count() or 1)
+    # Thread XGBoost per worker, per non sovraccaricare le CPU
+    model_params = {**DEFAULT_MODEL_PARAMS, "n_jobs": max(1, (os.cpu_count() or 1) // workers), **(model_params or {})}
+
+    predictions = np.full(len(data), np.nan, dtype=np.float32)
+    shared_X, shared_y = SharedArray(X), SharedArray(y)
+    try:
+        start = time.perf_counter()
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(shared_X.spec, shared_y.spec, model_params),
+        ) as executor:
+            for fold, fold_predictions in executor.map(_train_fold, folds):
+                predictions[fold.test_start:fold.test_end] = fold_predictions
+        print(f"✔ {len(folds)} fold addestrati in {time.perf_counter() - start:.1f}s con {workers} processi")
+    finally:
+        shared_X.close()
+        shared_y.close()
+    return data, predictions, folds
+
+def evaluate_out_of_sample(data, predictions, **engine_kwargs):
+    """Backtest delle sole righe con previsione fuori campione."""
+    out_of_sample = ~np.isnan(predictions)
+    test_data = data[out_of_sample]
+    predicted, _, _ = to_panel(test_data, predictions[out_of_sample])
+    realized, _, _ = to_panel(test_data, test_data["future_return"], column="future_return")
+    result = backtest_predictions(predicted, realized, **engine_kwargs)
+    table = compute_metrics(result.portfolio_returns, turnover=result.turnover)
+    metrics = {**{name: float(value) for name, value in table.iloc[0].items()}, **summarize(result)}
+    return result, metrics
+
+def main():
+    parser = argparse.ArgumentParser(description="Addestramento e valutazione walk-forward")
+    parser.add_argument("--data", default="backtesting/historical_data.csv", help="CSV con feature e future_return")
+    parser.add_argument("--train-periods", type=int, default=756, help="Periodi (date) di addestramento per fold")
+    parser.add_argument("--test-periods", type=int, default=126, help="Periodi di test per fold")
+    parser.add_argument("--step", type=int, default=None, help="Avanzamento tra fold (default: test-periods)")
+    parser.add_argument("--expanding", action="store_true", help="Finestra di addestramento espandibile")
+    parser.add_argument("--gap", type=int, default=DEFAULT_GAP_PERIODS, help="Periodi tra addestramento e test")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--fee-bps", type=float, default=1.0)
+    parser.add_argument("--slippage-bps", type=float, default=2.0)
+    parser.add_argument("--output", default=None, help="CSV in cui salvare le previsioni fuori campione")
+    args = parser.parse_args()
+
+    data = pd.read_csv(args.data)
+    if "date" in data.columns:
+        data["date"] = pd.to_datetime(data["date"])
+
+    try:
+        data, predictions, folds = walk_forward(
+            data, args.train_periods, args.test_periods, step=args.step,
+            expanding=args.expanding, workers=args.workers, gap=args.gap,
+        )
+    except InsufficientDataError as e:
+        parser.error(f"{e}; ridurre --train-periods o usare un dataset più lungo ({args.data})")
+    _, metrics = evaluate_out_of_sample(data, predictions, fee_bps=args.fee_bps, slippage_bps=args.slippage_bps)
+    print(f"✔ Walk-forward completato ({len(folds)} fold). Metriche fuori campione: {metrics}")
+
+    if args.output:
+        output = data.assign(prediction=predictions)[~np.isnan(predictions)]
+        output.to_csv(args.output, index=False)
+        print(f"✔ Previsioni fuori campione salvate in {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Avvii ripetuti di Backtesting: copia incondizionata degli artefatti (come il
+vecchio download_from_gcs a ogni istanza) contro model/artifact_cache.py con
+backend su directory locale, dove dopo il primo avvio si leggono solo i metadati.
+
+Uso:
+    python benchmarks/benchmark_artifact_cache.py --size-mb 200 --runs 10
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from model.artifact_cache import ArtifactCache, LocalBackend
+
+ARTIFACTS = ("historical_data.csv", "xgboost_model.pkl", "xgboost_model.ubj")
+
+def main():
+    parser = argparse.ArgumentParser(description="Cache degli artefatti contro copia a ogni avvio")
+    parser.add_argument("--size-mb", type=int, default=200, help="Dimensione totale degli artefatti")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    try:
+        source = os.path.join(workdir, "bucket")
+        target = os.path.join(workdir, "run")
+        os.makedirs(source)
+        os.makedirs(target)
+        for name in ARTIFACTS:
+            with open(os.path.join(source, name), "wb") as f:
+                f.write(os.urandom(args.size_mb * 1024 * 1024 // len(ARTIFACTS)))
+
+        start = time.perf_counter()
+        for _ in range(args.runs):
+            for name in ARTIFACTS:
+                shutil.copyfile(os.path.join(source, name), os.path.join(target, name))
+        copy_time = time.perf_counter() - start
+
+        cache = ArtifactCache(LocalBackend(source), os.path.join(workdir, "cache"))
+        timings = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            for name in ARTIFACTS:
+                cache.fetch(name, os.path.join(target, name))
+            timings.append(time.perf_counter() - start)
+        cache_time = sum(timings)
+
+        metrics = cache.metrics()
+        assert metrics["downloads"] == len(ARTIFACTS), "Ogni artefatto deve essere scaricato una sola volta"
+        print(f"{args.runs} avvii × {len(ARTIFACTS)} artefatti ({args.size_mb} MB)")
+        print(f"  copia incondizionata: {copy_time:8.3f} s")
+        print(f"  cache artefatti:      {cache_time:8.3f} s  ({metrics['downloads']} download, {metrics['hits']} hit)")
+        print(f"    primo avvio:        {timings[0]:8.3f} s (copia e hash)")
+        print(f"    avvii successivi:   {sum(timings[1:]) / max(len(timings) - 1, 1):8.4f} s per avvio")
+        print(f"  speedup complessivo:  {copy_time / cache_time:8.1f}x")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Confronto di throughput su /predict: Flask (scripts/api_service.py, server
+threaded di sviluppo) contro FastAPI (api/main.py) servito da gunicorn con
+worker uvicorn, come nel Dockerfile.
+
+Entrambi i server vengono avviati in locale come sottoprocessi; un generatore di
+carico aiohttp mantiene N richieste concorrenti per una durata fissa e misura
+richieste al secondo e latenza p50/p99. La cache delle previsioni viene
+disattivata per misurare l'inferenza e non le hit.
+
+Uso:
+    python benchmarks/benchmark_asgi_throughput.py --concurrency 64 --duration 15 --workers 4
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import subprocess
+
+import numpy as np
+import aiohttp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FLASK_COMMAND = [
+    sys.executable, "-c",
+    "import sys; sys.path.insert(0, '.'); from scripts.api_service import app; "
+    "app.run(host='127.0.0.1', port=int(sys.argv[1]), threaded=True, debug=False)",
+]
+
+def asgi_command(port, workers):
+    return [
+        sys.executable, "-m", "gunicorn", "-w", str(workers), "-k", "uvicorn.workers.UvicornWorker",
+        "api.main:app", "--bind", f"127.0.0.1:{port}", "--log-level", "warning",
+    ]
+
+def build_payload(rows, rng):
+    records = [
+        {
+            "SMA_50": float(rng.normal(1, 0.05)),
+            "SMA_200": float(rng.normal(1, 0.1)),
+            "RSI": float(rng.uniform(0, 100)),
+            "ATR": float(rng.uniform(0.005, 0.05)),
+            "VWAP": float(rng.normal(100, 10)),
+        }
+        for _ in range(rows)
+    ]
+    return records[0] if rows == 1 else records
+
+async def wait_until_ready(url, timeout=60):
+    deadline = time.perf_counter() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.perf_counter() < deadline:
+            try:
+                async with session.get(f"{url}/health") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.25)
+    raise RuntimeError(f"Il server {url} non risponde su /health")
+
+async def run_load(url, payloads, concurrency, duration):
+    """Mantiene `concurrency` client attivi per `duration` secondi."""
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    connector = aiohttp.TCPConnector(limit=concurrency)
+
+    async with aiohttp.ClientSession(connector=connector) as session:
+        async def client(index):
+            nonlocal errors
+            i = index
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    async with session.post(f"{url}/predict", json=payloads[i % len(payloads)]) as response:
+                        await response.read()
+                        if response.status != 200:
+                            errors += 1
+                            continue
+                except aiohttp.ClientError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - start)
+                i += concurrency
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies = np.asarray(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50)) if len(latencies) else float("nan"),
+        "p99_ms": float(np.percentile(latencies, 99)) if len(latencies) else float("nan"),
+    }
+
+def benchmark_server(name, command, port, payloads, args):
+    env = dict(os.environ, PREDICTION_CACHE_ENABLED="false", HOT_RELOAD_ENABLED="false")
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    try:
+        asyncio.run(wait_until_ready(url))
+        # Riscaldamento
+        asyncio.run(run_load(url, payloads, args.concurrency, min(2.0, args.duration)))
+        result = asyncio.run(run_load(url, payloads, args.concurrency, args.duration))
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+    print(f"{name:<28} {result['rps']:>10.1f} req/s   p50 {result['p50_ms']:>7.2f} ms   "
+          f"p99 {result['p99_ms']:>7.2f} ms   errori {result['errors']}")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput di /predict: Flask contro FastAPI multi-worker")
+    parser.add_argument("--concurrency", type=int, default=64, help="Richieste concorrenti")
+    parser.add_argument("--duration", type=float, default=15.0, help="Durata di ogni misura in secondi")
+    parser.add_argument("--workers", type=int, default=4, help="Worker gunicorn per il server ASGI")
+    parser.add_argument("--rows", type=int, default=1, help="Righe per richiesta")
+    parser.add_argument("--flask-port", type=int, default=5055)
+    parser.add_argument("--asgi-port", type=int, default=8085)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    payloads = [build_payload(args.rows, rng) for _ in range(256)]
+
+    print(f"Concorrenza {args.concurrency}, {args.rows} righe per richiesta, {args.duration:.0f} s per server\n")
+    flask_result = benchmark_server("Flask (threaded)", FLASK_COMMAND + [str(args.flask_port)],
+                                    args.flask_port, payloads, args)
+    asgi_result = benchmark_server(f"FastAPI ({args.workers} worker)", asgi_command(args.asgi_port, args.workers),
+                                   args.asgi_port, payloads, args)
+
+    if flask_result["rps"]:
+        print(f"\nSpeedup throughput: {asgi_result['rps'] / flask_result['rps']:.2f}x")
+
+if __name__ == "__main__":
+    main()
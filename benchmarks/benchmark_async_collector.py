@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark del motore di raccolta asincrono contro un server HTTP locale di prova.
+
+Il server simula Alpha Vantage (intraday) e Binance (klines) con una latenza
+fissa per richiesta. Il benchmark confronta la raccolta sequenziale (un simbolo
+alla volta) con quella concorrente di AsyncCollector e verifica che il numero
+di richieste al minuto per fornitore non superi il limite configurato e che le
+richieste ad Alpha Vantage non superino la quota giornaliera.
+
+Con i valori predefiniti il limite al minuto non è il collo di bottiglia: lo
+speedup misura la sovrapposizione della latenza tra richieste simultanee. Per
+esercitare il limiter servono limiti stretti, con cui entrambe le modalità sono
+vincolate dal rate limit e non c'è speedup (la run dura più di due minuti):
+
+    python benchmarks/benchmark_async_collector.py --symbols 100 --rpm 75 --rpd 90
+
+Uso:
+    python benchmarks/benchmark_async_collector.py --symbols 100 --latency 0.05
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+from collections import defaultdict
+
+from aiohttp import web
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.api_utils import RateLimiter
+from scripts.async_collector import AsyncCollector
+
+def build_stub_app(latency, request_log):
+    """Crea l'app aiohttp che imita le risposte dei fornitori."""
+
+    async def alpha_vantage(request):
+        request_log["alpha_vantage"].append(time.monotonic())
+        await asyncio.sleep(latency)
+        interval = request.query.get("interval", "60min")
+        series = {
+            f"2024-10-{day:02d} 15:00:00": {
+                "1. open": "100.0", "2. high": "101.0", "3. low": "99.0",
+                "4. close": "100.5", "5. volume": "1000"
+            }
+            for day in range(1, 29)
+        }
+        return web.json_response({f"Time Series ({interval})": series})
+
+    async def binance(request):
+        request_log["binance"].append(time.monotonic())
+        await asyncio.sleep(latency)
+        start = 1_700_000_000_000
+        klines = [
+            [start + i * 3_600_000, "100", "101", "99", "100.5", "10", start + (i + 1) * 3_600_000 - 1,
+             "1000", 50, "5", "500", "0"]
+            for i in range(100)
+        ]
+        return web.json_response(klines)
+
+    app = web.Application()
+    app.router.add_get("/query", alpha_vantage)
+    app.router.add_get("/api/v3/klines", binance)
+    return app
+
+def max_requests_in_window(timestamps, window=60.0):
+    """Massimo numero di richieste in una qualsiasi finestra mobile [t, t + window)."""
+    timestamps = sorted(timestamps)
+    best, start = 0, 0
+    for end, ts in enumerate(timestamps):
+        while ts - timestamps[start] >= window:
+            start += 1
+        best = max(best, end - start + 1)
+    return best
+
+async def run(args):
+    request_log = defaultdict(list)
+    runner = web.AppRunner(build_stub_app(args.latency, request_log))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    base_url = f"http://127.0.0.1:{port}"
+
+    providers = {
+        "alpha_vantage": {"base_url": base_url, "requests_per_minute": args.rpm, "max_concurrency": args.concurrency},
+        "binance": {"base_url": base_url, "requests_per_minute": args.rpm, "max_concurrency": args.concurrency},
+    }
+    symbols = [f"SYM{i:04d}" for i in range(args.symbols)]
+
+    def daily_limiter():
+        # Quota giornaliera in memoria, per non consumare i contatori reali di api_config.json
+        config = {"alpha_vantage": {"rate_limit": {"requests_per_day": args.rpd, "daily_count": 0, "daily_reset": None}}}
+        return RateLimiter(config=config, persist_interval=float("inf"))
+
+    try:
+        async with AsyncCollector(providers=providers, rate_limiter=daily_limiter()) as collector:
+            start = time.perf_counter()
+            for symbol in symbols:
+                await collector.get_stock_data(symbol)
+                await collector.get_crypto_data(symbol)
+            sequential = time.perf_counter() - start
+
+        request_log.clear()
+        async with AsyncCollector(providers=providers, rate_limiter=daily_limiter()) as collector:
+            start = time.perf_counter()
+            results = await asyncio.gather(
+                *[collector.get_stock_data(symbol) for symbol in symbols],
+                *[collector.get_crypto_data(symbol) for symbol in symbols],
+            )
+            concurrent = time.perf_counter() - start
+    finally:
+        await runner.cleanup()
+
+    ok = sum(1 for result in results if result is not None)
+    print(f"Simboli: {args.symbols}, latenza stub: {args.latency * 1000:.0f} ms, "
+          f"limite: {args.rpm} req/min, {args.rpd} req/giorno Alpha Vantage, "
+          f"{args.concurrency} simultanee per fornitore")
+    print(f"sequenziale: {sequential:8.2f}s")
+    print(f"concorrente: {concurrent:8.2f}s  ({ok}/{len(results)} risposte valide)")
+    print(f"Speedup: {sequential / concurrent:.1f}x")
+    for provider, timestamps in request_log.items():
+        peak = max_requests_in_window(timestamps)
+        status = "OK" if peak <= args.rpm else "SUPERATO"
+        print(f"{provider:<14} richieste={len(timestamps)} picco/minuto={peak} [{status}]")
+    daily = len(request_log["alpha_vantage"])
+    print(f"quota giornaliera alpha_vantage: {daily}/{args.rpd} [{'OK' if daily <= args.rpd else 'SUPERATO'}]")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--rpm", type=int, default=6000)
+    parser.add_argument("--rpd", type=int, default=500, help="Quota giornaliera Alpha Vantage")
+    parser.add_argument("--concurrency", type=int, default=10)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark dell'appiattimento di fundamental_info: iterazione con iterrows
+(implementazione precedente) contro flatten_fundamental_info (una sola
+conversione del frame a liste Python, nessuna Series per riga).
+
+Il payload riproduce la forma di yfinance Ticker.info: qualche centinaio di
+chiavi con numeri, stringhe, valori nulli, liste (es. companyOfficers) e
+dizionari annidati. Non richiede il database.
+
+Uso:
+    python benchmarks/benchmark_fundamental_info.py --symbols 500 --keys 180
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.db_utils import flatten_fundamental_info
+
+def build_info_payload(symbol, n_keys, rng):
+    """Genera un dizionario simile a Ticker.info per un simbolo."""
+    info = {"symbol": symbol, "longName": f"{symbol} Corporation", "sector": "Technology"}
+    for i in range(n_keys):
+        kind = i % 6
+        if kind in (0, 1, 2):
+            info[f"metric{i}"] = float(rng.normal(100, 30))
+        elif kind == 3:
+            info[f"count{i}"] = int(rng.integers(0, 1e9))
+        elif kind == 4:
+            info[f"text{i}"] = f"value {i} for {symbol}"
+        else:
+            info[f"missing{i}"] = None
+    info["companyOfficers"] = [
+        {"name": f"Officer {j}", "title": "VP", "totalPay": int(rng.integers(1e5, 1e7))}
+        for j in range(5)
+    ]
+    info["governance"] = {"auditRisk": 3, "boardRisk": 5, "compensationRisk": None}
+    return info
+
+def flatten_iterrows(df_copy):
+    """Implementazione precedente di handle_table_specific_data, usata come riferimento."""
+    rows = []
+    symbol = df_copy["symbol"].iloc[0] if "symbol" in df_copy.columns else "UNKNOWN"
+    for _, row in df_copy.iterrows():
+        for col in row.index:
+            val = row[col]
+            if col in ["symbol", "created_at"]:
+                continue
+            if isinstance(val, dict):
+                for k, v in val.items():
+                    if v is not None and not pd.isna(v):
+                        rows.append({"symbol": symbol, "key": f"{col}.{k}", "value": str(v),
+                                     "created_at": datetime.now()})
+            elif isinstance(val, list):
+                rows.append({"symbol": symbol, "key": col, "value": str(val),
+                             "created_at": datetime.now()})
+            else:
+                if val is not None and not pd.isna(val):
+                    rows.append({"symbol": symbol, "key": col, "value": str(val),
+                                 "created_at": datetime.now()})
+    return pd.DataFrame(rows)
+
+def time_per_symbol(fn, frames, repeat):
+    """Tempo migliore su `repeat` esecuzioni, un frame per simbolo come nel collector."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for frame in frames:
+            fn(frame)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--keys", type=int, default=180)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(0)
+    frames = [pd.DataFrame([build_info_payload(f"SYM{i:04d}", args.keys, rng)]) for i in range(args.symbols)]
+    
+    # Verifica che le due implementazioni producano le stesse righe
+    for frame in frames[:10]:
+        expected = flatten_iterrows(frame)[["symbol", "key", "value"]]
+        actual = flatten_fundamental_info(frame)[["symbol", "key", "value"]]
+        pd.testing.assert_frame_equal(expected.reset_index(drop=True), actual.reset_index(drop=True))
+    
+    old = time_per_symbol(flatten_iterrows, frames, args.repeat)
+    new = time_per_symbol(flatten_fundamental_info, frames, args.repeat)
+    
+    start = time.perf_counter()
+    batch = flatten_fundamental_info(pd.concat(frames, ignore_index=True))
+    batch_time = time.perf_counter() - start
+    
+    print(f"Payload: {args.symbols} simboli x ~{args.keys} chiavi")
+    print(f"iterrows:        {old:8.3f}s  ({old / args.symbols * 1000:.2f} ms/simbolo)")
+    print(f"nuova versione:  {new:8.3f}s  ({new / args.symbols * 1000:.2f} ms/simbolo)")
+    print(f"nuova versione (tutti i simboli in un frame): {batch_time:.3f}s, {len(batch)} righe")
+    print(f"Speedup: {old / new:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Kernel di Wilder a blocchi (model/indicator_kernels.py) contro la ricorrenza
+con ciclo Python barra per barra e contro pandas ewm, in float64 e float32.
+
+Verifica che RSI e ATR coincidano con pandas ewm(alpha=1/14, adjust=False)
+colonna per colonna, poi misura tempi e memoria dei risultati.
+
+Uso:
+    python benchmarks/benchmark_indicator_kernels.py --symbols 500 --bars 2520
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.indicator_kernels import rsi, atr, wilder
+
+def loop_wilder(values, period):
+    """Ricorrenza di riferimento con ciclo Python sul tempo."""
+    alpha = 1.0 / period
+    result = np.full(values.shape, np.nan)
+    average = values[0].copy()
+    for t in range(len(values)):
+        if t:
+            average = average + alpha * (values[t] - average)
+        result[t] = average
+    result[:period - 1] = np.nan
+    return result
+
+def pandas_rsi(close, period=14):
+    delta = close.diff()
+    gain = delta.clip(lower=0).ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+    loss = (-delta.clip(upper=0)).ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+    return 100 - 100 / (1 + gain / loss)
+
+def pandas_atr(high, low, close, period=14):
+    previous_close = close.shift()
+    true_range = pd.concat(
+        [high - low, (high - previous_close).abs(), (low - previous_close).abs()], axis=1
+    ).max(axis=1)
+    return true_range.ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+
+def timed(fn, *args, repeat=3, **kwargs):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+def main():
+    parser = argparse.ArgumentParser(description="Kernel di Wilder vettorizzati")
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--bars", type=int, default=2520)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (args.bars, args.symbols)), axis=0))
+    spread = close * rng.uniform(0.002, 0.03, close.shape)
+    high, low = close + spread, close - spread
+
+    # Correttezza su alcune colonne rispetto a pandas
+    rsi64, atr64 = rsi(close), atr(high, low, close)
+    rsi32, atr32 = rsi(close, dtype=np.float32), atr(high, low, close, dtype=np.float32)
+    for j in range(0, args.symbols, max(1, args.symbols // 10)):
+        c, h, l = pd.Series(close[:, j]), pd.Series(high[:, j]), pd.Series(low[:, j])
+        np.testing.assert_allclose(rsi64[:, j], pandas_rsi(c), rtol=1e-9)
+        np.testing.assert_allclose(atr64[:, j], pandas_atr(h, l, c), rtol=1e-9)
+        np.testing.assert_allclose(rsi32[:, j], pandas_rsi(c), rtol=1e-4)
+        np.testing.assert_allclose(atr32[:, j], pandas_atr(h, l, c), rtol=1e-4)
+    print("✅ RSI e ATR coincidenti con pandas ewm (float64 e float32)\n")
+
+    _, loop_time = timed(loop_wilder, close, 14, repeat=1)
+    _, pandas_time = timed(lambda: pd.DataFrame(close).ewm(alpha=1 / 14, adjust=False, min_periods=14).mean())
+    _, kernel64_time = timed(wilder, close, 14)
+    _, kernel32_time = timed(wilder, close, 14, dtype=np.float32)
+    _, rsi_time = timed(rsi, close)
+    _, atr_time = timed(atr, high, low, close)
+
+    print(f"Media di Wilder su {args.bars} barre × {args.symbols} simboli")
+    print(f"  ciclo Python per barra:  {loop_time * 1000:9.1f} ms")
+    print(f"  pandas ewm:              {pandas_time * 1000:9.1f} ms")
+    print(f"  kernel a blocchi f64:    {kernel64_time * 1000:9.1f} ms")
+    print(f"  kernel a blocchi f32:    {kernel32_time * 1000:9.1f} ms")
+    print(f"RSI completo: {rsi_time * 1000:.1f} ms, ATR completo: {atr_time * 1000:.1f} ms")
+    print(f"Memoria del risultato: {rsi64.nbytes / 1e6:.1f} MB (f64) contro {rsi32.nbytes / 1e6:.1f} MB (f32)")
+
+if __name__ == "__main__":
+    main()
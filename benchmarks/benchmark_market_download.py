@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Download dei dati di mercato con yfinance simulato: una chiamata per simbolo
+(get_market_data_batch con chunk_size=1) contro il download multi-ticker.
+
+Ogni chiamata a yf.download simulata attende --latency secondi e registra i
+parametri ricevuti, per verificare che a yf.download arrivino period="2y" nel
+download completo e la data di start del watermark in quello incrementale.
+
+Uso:
+    python benchmarks/benchmark_market_download.py --symbols 200 --latency 0.2
+"""
+
+import os
+import sys
+import time
+import types
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+# yfinance simulato: registra i parametri di ogni chiamata
+calls = []
+LATENCY = 0.0
+
+def fake_download(tickers, interval="1d", group_by=None, threads=True, progress=False, **kwargs):
+    time.sleep(LATENCY)
+    calls.append(kwargs)
+    tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+    index = pd.date_range("2026-01-01", periods=30, freq="B")
+    fields = ["Open", "High", "Low", "Close", "Volume"]
+    values = np.random.default_rng(0).random((len(index), len(fields) * len(tickers)))
+    if len(tickers) == 1 and group_by is None:
+        return pd.DataFrame(values, index=index, columns=fields)
+    columns = pd.MultiIndex.from_product([tickers, fields])
+    return pd.DataFrame(values, index=index, columns=columns)
+
+sys.modules["yfinance"] = types.SimpleNamespace(download=fake_download)
+
+def main():
+    global LATENCY
+    parser = argparse.ArgumentParser(description="Download multi-ticker contro una chiamata per simbolo")
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.2, help="Latenza simulata per chiamata (s)")
+    args = parser.parse_args()
+
+    # Il collector scrive log e dati in percorsi relativi: lavora in una directory temporanea
+    os.chdir(tempfile.mkdtemp())
+    os.makedirs("logs", exist_ok=True)
+    from scripts.comprehensive_data_collector import (
+        get_market_data_batch, YAHOO_BATCH_SIZE
+    )
+
+    symbols = [f"SYM{i}" for i in range(args.symbols)]
+
+    # Parametri che arrivano a yf.download
+    get_market_data_batch(symbols[:YAHOO_BATCH_SIZE + 1])
+    assert calls and all(call == {"period": "2y"} for call in calls), f"Download completo senza period: {calls}"
+    calls.clear()
+    get_market_data_batch(symbols[:YAHOO_BATCH_SIZE + 1], start="2026-10-10")
+    assert calls and all(call == {"start": "2026-10-10"} for call in calls), f"Start del watermark ignorato: {calls}"
+    calls.clear()
+    print("✅ period e start inoltrati correttamente a yf.download\n")
+
+    LATENCY = args.latency
+    start = time.perf_counter()
+    get_market_data_batch(symbols, chunk_size=1)
+    single_time = time.perf_counter() - start
+    single_calls = len(calls)
+    calls.clear()
+
+    start = time.perf_counter()
+    results = get_market_data_batch(symbols)
+    batch_time = time.perf_counter() - start
+    assert len(results) == len(symbols), "Simboli mancanti nel download multi-ticker"
+
+    print(f"{args.symbols} simboli, latenza simulata {args.latency}s per chiamata")
+    print(f"  una chiamata per simbolo: {single_time:8.2f} s ({single_calls} chiamate)")
+    print(f"  multi-ticker:             {batch_time:8.2f} s ({len(calls)} chiamate)")
+    print(f"  speedup:                  {single_time / batch_time:8.1f}x")
+
+if __name__ == "__main__":
+    main()
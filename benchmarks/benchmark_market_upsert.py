@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark dell'inserimento dei dati di mercato in stock_daily_prices:
+inserimento record per record contro INSERT multi-VALUES in batch.
+
+Richiede un database PostgreSQL configurato tramite le variabili DB_*.
+Il benchmark lavora su una tabella temporanea con lo stesso vincolo
+UNIQUE (date, symbol) di stock_daily_prices.
+
+Uso:
+    python benchmarks/benchmark_market_upsert.py --symbols 50 --days 504
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.db_utils import (
+    get_db_engine,
+    dispose_db_engines,
+    prepare_market_data_for_db,
+    insert_market_data_per_record,
+    insert_market_data_bulk,
+)
+
+BENCH_TABLE = "bench_stock_daily_prices"
+
+def build_market_frame(n_symbols, n_days, seed=42):
+    """Genera dati OHLCV sintetici già preparati per il database."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=n_days)
+    frames = []
+    for i in range(n_symbols):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_days)))
+        raw = pd.DataFrame({
+            "Open": close * (1 + rng.normal(0, 0.002, n_days)),
+            "High": close * 1.01,
+            "Low": close * 0.99,
+            "Close": close,
+            "Volume": rng.integers(1e5, 1e7, n_days).astype(float),
+        }, index=dates)
+        raw.index.name = "Date"
+        frames.append(prepare_market_data_for_db(raw, f"SYM{i:04d}"))
+    return pd.concat(frames, ignore_index=True)
+
+def reset_table(connection):
+    connection.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+    connection.execute(text(f"""
+        CREATE TABLE {BENCH_TABLE} (
+            id SERIAL PRIMARY KEY,
+            date TIMESTAMP,
+            symbol VARCHAR(20),
+            open FLOAT,
+            high FLOAT,
+            low FLOAT,
+            close FLOAT,
+            volume FLOAT,
+            source VARCHAR(50),
+            created_at TIMESTAMP DEFAULT NOW(),
+            CONSTRAINT {BENCH_TABLE}_date_symbol UNIQUE (date, symbol)
+        )
+    """))
+
+def run_case(engine, name, insert_fn, prepared_df):
+    """Esegue un inserimento a freddo e uno con tutti i duplicati."""
+    with engine.begin() as connection:
+        reset_table(connection)
+    
+    timings = {}
+    for label in ("fresh", "duplicates"):
+        with engine.begin() as connection:
+            start = time.perf_counter()
+            inserted, skipped = insert_fn(connection, BENCH_TABLE, prepared_df)
+            elapsed = time.perf_counter() - start
+        timings[label] = elapsed
+        rate = len(prepared_df) / elapsed if elapsed > 0 else float("inf")
+        print(f"{name:<12} {label:<11} {elapsed:8.2f}s  {rate:10.0f} righe/s  "
+              f"inserite={inserted} ignorate={skipped}")
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--days", type=int, default=504)
+    parser.add_argument("--skip-per-record", action="store_true",
+                        help="Salta il caso record per record (lento su volumi grandi)")
+    args = parser.parse_args()
+    
+    engine = get_db_engine()
+    if engine is None:
+        print("❌ Database non configurato: impostare DB_USER, DB_PASSWORD, DB_HOST, DB_NAME")
+        sys.exit(1)
+    
+    prepared_df = build_market_frame(args.symbols, args.days)
+    print(f"Righe: {len(prepared_df)} ({args.symbols} simboli x {args.days} giorni)")
+    
+    try:
+        results = {"bulk": run_case(engine, "bulk", insert_market_data_bulk, prepared_df)}
+        if not args.skip_per_record:
+            results["per_record"] = run_case(engine, "per_record", insert_market_data_per_record, prepared_df)
+            speedup = results["per_record"]["fresh"] / results["bulk"]["fresh"]
+            print(f"Speedup bulk vs record per record: {speedup:.1f}x")
+    finally:
+        with engine.begin() as connection:
+            connection.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+        dispose_db_engines()
+
+if __name__ == "__main__":
+    main()
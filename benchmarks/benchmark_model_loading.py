@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark del caricamento e della previsione del modello XGBoost:
+pickle joblib dell'XGBRegressor contro booster nativo UBJSON con inplace_predict.
+
+Misura il tempo di caricamento a freddo (in un processo nuovo, import inclusi)
+e la latenza per chiamata con 1 riga e con 10.000 righe.
+
+Uso:
+    python benchmarks/benchmark_model_loading.py --model models/xgboost_model.pkl
+"""
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+import tempfile
+import numpy as np
+import joblib
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.booster import load_booster_model, save_native_model
+
+COLD_START_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+{load}
+print(time.perf_counter() - start)
+"""
+
+LOADERS = {
+    "pickle": "import joblib; model = joblib.load({path!r})",
+    "native": "from model.booster import load_booster_model; model = load_booster_model({path!r})",
+}
+
+def cold_start(kind, path, runs):
+    """Tempo di caricamento in processi Python nuovi (mediana su `runs`)."""
+    code = COLD_START_SNIPPET.format(load=LOADERS[kind].format(path=path))
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    timings = [
+        float(subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True,
+                             text=True, check=True).stdout.strip())
+        for _ in range(runs)
+    ]
+    return float(np.median(timings))
+
+def latency(predict, X, runs):
+    timings = np.empty(runs)
+    for i in range(runs):
+        start = time.perf_counter()
+        predict(X)
+        timings[i] = time.perf_counter() - start
+    return np.percentile(timings, 50) * 1000, np.percentile(timings, 99) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="models/xgboost_model.pkl")
+    parser.add_argument("--cold-runs", type=int, default=5)
+    parser.add_argument("--runs", type=int, default=1000)
+    args = parser.parse_args()
+    
+    pickle_path = os.path.abspath(args.model)
+    with tempfile.TemporaryDirectory() as tmp:
+        native_path = os.path.join(tmp, "xgboost_model.ubj")
+        sklearn_model = joblib.load(pickle_path)
+        save_native_model(sklearn_model, native_path)
+        native_model = load_booster_model(native_path)
+        
+        n_features = sklearn_model.n_features_in_
+        rng = np.random.default_rng(0)
+        
+        print(f"{'caricamento a freddo':<26}{'mediana ms':>12}")
+        for kind, path in (("pickle", pickle_path), ("native", native_path)):
+            print(f"{kind:<26}{cold_start(kind, path, args.cold_runs) * 1000:>12.1f}")
+        
+        print(f"\n{'previsione':<26}{'p50 ms':>12}{'p99 ms':>12}")
+        for rows in (1, 10_000):
+            X = rng.normal(size=(rows, n_features)).astype(np.float32)
+            np.testing.assert_allclose(sklearn_model.predict(X), native_model.predict(X), rtol=1e-5, atol=1e-6)
+            runs = args.runs if rows == 1 else max(10, args.runs // 20)
+            for kind, predict in (("pickle XGBRegressor", sklearn_model.predict),
+                                  ("native inplace_predict", native_model.predict)):
+                p50, p99 = latency(predict, X, runs)
+                print(f"{kind + f' {rows}r':<26}{p50:>12.3f}{p99:>12.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Load test di /predict: latenza p50/p99 per payload da 1 e 10.000 righe.
+
+Confronta il percorso precedente (DataFrame + ciclo Python sulle previsioni)
+con il percorso colonnare attuale (matrice float32 + np.select), sia chiamando
+direttamente la logica di previsione sia end-to-end con il client di test Flask.
+Usa il modello caricato da scripts/api_service.py (MODEL_PATH o models/).
+
+Uso:
+    python benchmarks/benchmark_predict_latency.py --requests 500
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts import api_service
+from scripts.api_service import parse_features, build_prediction_response
+
+def legacy_predict(model, data):
+    """Percorso precedente di /predict, usato come riferimento."""
+    input_data = pd.DataFrame([data]) if isinstance(data, dict) else pd.DataFrame(data)
+    predictions = model.predict(input_data)
+    decisions = []
+    for pred in predictions:
+        if pred > 0.02:
+            decision = "BUY"
+        elif pred < -0.01:
+            decision = "SELL"
+        else:
+            decision = "HOLD"
+        decisions.append(decision)
+    return predictions, decisions
+
+def fast_predict(model, data):
+    features, single = parse_features(data)
+    return build_prediction_response(model.predict(features), single)
+
+def build_payload(rows, rng):
+    records = [
+        {
+            "SMA_50": float(rng.normal(1, 0.05)),
+            "SMA_200": float(rng.normal(1, 0.1)),
+            "RSI": float(rng.uniform(0, 100)),
+            "ATR": float(rng.uniform(0.005, 0.05)),
+            "VWAP": float(rng.normal(100, 10)),
+        }
+        for _ in range(rows)
+    ]
+    return records[0] if rows == 1 else records
+
+def measure(fn, n_requests):
+    latencies = np.empty(n_requests)
+    for i in range(n_requests):
+        start = time.perf_counter()
+        fn()
+        latencies[i] = time.perf_counter() - start
+    return np.percentile(latencies, 50) * 1000, np.percentile(latencies, 99) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500, help="Richieste per scenario da 1 riga")
+    parser.add_argument("--large-requests", type=int, default=50, help="Richieste per scenario da 10k righe")
+    args = parser.parse_args()
+    
+    active = api_service.model_registry.get()
+    if active is None:
+        print("❌ Modello non disponibile: impostare MODEL_PATH")
+        sys.exit(1)
+    model = active.model
+    
+    rng = np.random.default_rng(0)
+    client = api_service.app.test_client()
+    
+    print(f"{'scenario':<28}{'p50 ms':>10}{'p99 ms':>10}")
+    for rows, n_requests in ((1, args.requests), (10_000, args.large_requests)):
+        payload = build_payload(rows, rng)
+        
+        # Verifica che i due percorsi producano le stesse decisioni
+        _, legacy_decisions = legacy_predict(model, payload)
+        fast = fast_predict(model, payload)
+        fast_decisions = [fast["trading_decision"]] if rows == 1 else fast["trading_decisions"]
+        assert list(legacy_decisions) == fast_decisions
+        
+        scenarios = {
+            f"legacy DataFrame {rows}r": lambda: legacy_predict(model, payload),
+            f"colonnare {rows}r": lambda: fast_predict(model, payload),
+            f"HTTP /predict {rows}r": lambda: client.post("/predict", json=payload),
+        }
+        for name, fn in scenarios.items():
+            p50, p99 = measure(fn, n_requests)
+            print(f"{name:<28}{p50:>10.3f}{p99:>10.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Metriche di rischio per migliaia di strategie: un solo passaggio vettorizzato di
+backtesting/metrics.compute_metrics sulla matrice (T, strategie) contro il calcolo
+strategia per strategia con pandas.
+
+Verifica i valori su alcune colonne, incluse strategie senza periodi in perdita
+(caso che in precedenza causava una divisione per zero).
+
+Uso:
+    python benchmarks/benchmark_risk_metrics.py --strategies 5000 --bars 2520
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from backtesting.metrics import compute_metrics, TRADING_DAYS
+
+def reference_metrics(returns):
+    """Metriche di una singola strategia con pandas."""
+    series = pd.Series(returns)
+    equity = (1 + series).cumprod()
+    peaks = equity.cummax().clip(lower=1.0)
+    downside = np.sqrt((series.clip(upper=0) ** 2).mean())
+    std = series.std()
+    return {
+        "Sharpe Ratio": series.mean() / std * np.sqrt(TRADING_DAYS) if std > 0 else np.nan,
+        "Sortino Ratio": series.mean() / downside * np.sqrt(TRADING_DAYS) if downside > 0 else np.nan,
+        "Max Drawdown": (equity / peaks - 1).min(),
+        "Hit Rate": (series > 0).sum() / (series != 0).sum() if (series != 0).any() else np.nan,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Metriche vettorizzate su molte strategie")
+    parser.add_argument("--strategies", type=int, default=5000)
+    parser.add_argument("--bars", type=int, default=2520)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    returns = rng.normal(0.0004, 0.01, (args.bars, args.strategies))
+    returns[:, 0] = np.abs(returns[:, 0])  # nessun periodo in perdita
+    returns[:, 1] = 0.0                    # strategia mai investita
+
+    start = time.perf_counter()
+    table = compute_metrics(returns)
+    vectorized_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    reference = pd.DataFrame([reference_metrics(returns[:, j]) for j in range(args.strategies)])
+    loop_time = time.perf_counter() - start
+
+    for column in reference.columns:
+        np.testing.assert_allclose(table[column], reference[column], rtol=1e-9, err_msg=column)
+    assert np.isnan(table["Win/Loss Ratio"].iloc[0]), "Win/Loss senza perdite deve essere NaN"
+    print("✅ Metriche coincidenti con il calcolo per strategia\n")
+
+    print(f"{args.strategies} strategie × {args.bars} barre")
+    print(f"  per strategia (pandas): {loop_time:8.3f} s")
+    print(f"  vettorizzato:           {vectorized_time:8.3f} s")
+    print(f"  speedup:                {loop_time / vectorized_time:8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Costo per nuova barra degli indicatori: ricalcolo completo con pandas a ogni
+barra (come calculate_rsi/calculate_atr/calculate_vwap e compute_indicators)
+contro l'aggiornamento incrementale di StreamingIndicators.
+
+Prima della misura verifica che gli indicatori incrementali coincidano con il
+calcolo batch, anche dopo un ripristino da snapshot, sui CSV di esempio e su
+una serie sintetica lunga.
+
+Uso:
+    python benchmarks/benchmark_streaming_indicators.py --history 5000 --new-bars 200
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from scripts.streaming_indicators import StreamingIndicatorEngine, batch_indicators, compare_with_batch
+
+def synthetic_bars(n_bars, rng):
+    """Barre giornaliere con random walk geometrico."""
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, n_bars)))
+    spread = close * rng.uniform(0.002, 0.03, n_bars)
+    return pd.DataFrame({
+        "open": close + rng.normal(0, 0.3, n_bars),
+        "high": close + spread,
+        "low": close - spread,
+        "close": close,
+        "volume": rng.uniform(1e6, 5e7, n_bars),
+    }, index=pd.bdate_range("2000-01-03", periods=n_bars))
+
+def main():
+    parser = argparse.ArgumentParser(description="Indicatori incrementali contro ricalcolo batch")
+    parser.add_argument("--history", type=int, default=5000, help="Barre già presenti")
+    parser.add_argument("--new-bars", type=int, default=200, help="Barre nuove da elaborare")
+    parser.add_argument("--csv", nargs="*", default=[os.path.join(ROOT, "AAPL_daily.csv")])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    bars = synthetic_bars(args.history + args.new_bars, rng)
+
+    for path in args.csv:
+        sample = pd.read_csv(path, index_col=0, parse_dates=True)
+        sample.columns = [str(column).lower() for column in sample.columns]
+        compare_with_batch(sample)
+        print(f"✅ {os.path.basename(path)}: indicatori incrementali coincidenti con il batch")
+    compare_with_batch(bars)
+    print(f"✅ serie sintetica: {len(bars)} barre coincidenti con il batch\n")
+
+    history, new_bars = bars.iloc[:args.history], bars.iloc[args.history:]
+
+    # Ricalcolo completo a ogni nuova barra
+    start = time.perf_counter()
+    for i in range(1, len(new_bars) + 1):
+        batch_indicators(bars.iloc[:args.history + i]).iloc[-1]
+    batch_time = (time.perf_counter() - start) / len(new_bars)
+
+    # Aggiornamento incrementale a partire dallo stato sulla storia
+    engine = StreamingIndicatorEngine()
+    engine.update_frame("SYM", history)
+    rows = list(zip(new_bars['high'], new_bars['low'], new_bars['close'], new_bars['volume']))
+    start = time.perf_counter()
+    for high, low, close, volume in rows:
+        engine.update("SYM", high, low, close, volume)
+    streaming_time = (time.perf_counter() - start) / len(rows)
+
+    print(f"Storia di {args.history} barre, {args.new_bars} barre nuove")
+    print(f"Ricalcolo batch:        {batch_time * 1e6:10.1f} µs/barra")
+    print(f"Aggiornamento O(1):     {streaming_time * 1e6:10.1f} µs/barra")
+    print(f"Speedup:                {batch_time / streaming_time:10.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,17 @@
 # transformations.py
+import os
+import sys
 import pandas as pd
-import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from model.indicator_kernels import rsi
 
 def compute_indicators(df: pd.DataFrame):
     df['SMA_50'] = df['Close'].rolling(50).mean()
     df['SMA_200'] = df['Close'].rolling(200).mean()
 
-    # RSI e ATR potresti calcolarli con TA-Lib o librerie come pandas-ta
-    # Esempio di RSI (dummy)
-    df['RSI'] = 100 - (100 / (1 + df['Close'].pct_change().add(1).cumprod()))
+    # RSI a 14 periodi con lo smoothing di Wilder
+    df['RSI'] = rsi(df['Close'].to_numpy(dtype=float), 14)
 
     return df
 
@@ -1,7 +1,13 @@
-import requests
+import os
+import sys
 import pandas as pd
 import datetime as dt
 
+# Aggiunge il percorso principale del progetto
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.api_utils import get_http_session, HTTP_TIMEOUT
+
 # Esempio Binance API per criptovalute (es. Bitcoin)
 def get_crypto_data(symbol='BTCUSDT', interval='1h', limit=100):
     url = 'https://api.binance.com/api/v3/klines'
@@ -10,9 +16,11 @@ def get_crypto_data(symbol='BTCUSDT', interval='1h', limit=100):
         'interval': interval,
         'limit': limit
     }
-    response = requests.get(url, params=params)
-    data = response.json()
+    response = get_http_session('binance').get(url, params=params, timeout=HTTP_TIMEOUT)
+    return parse_crypto_data(response.json())
 
+def parse_crypto_data(data):
+    """Converte la risposta klines di Binance in DataFrame OHLCV."""
     df = pd.DataFrame(data, columns=[
         'open_time', 'open', 'high', 'low', 'close', 'volume',
         'close_time', 'quote_asset_volume', 'n_trades',
@@ -39,9 +47,11 @@ def get_stock_data(symbol='AAPL', interval='60min'):
         'apikey': ALPHA_VANTAGE_API_KEY,
         'outputsize': 'compact'
     }
-    response = requests.get(url, params=params)
-    data = response.json()
+    response = get_http_session('alpha_vantage').get(url, params=params, timeout=HTTP_TIMEOUT)
+    return parse_stock_data(response.json(), interval)
 
+def parse_stock_data(data, interval='60min'):
+    """Converte la risposta TIME_SERIES_INTRADAY di Alpha Vantage in DataFrame OHLCV."""
     time_series_key = f'Time Series ({interval})'
     df = pd.DataFrame.from_dict(data[time_series_key], orient='index')
     df.reset_index(inplace=True)
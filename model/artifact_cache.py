@@ -0,0 +1,290 @@
+"""
+Cache locale degli artefatti (dati, modelli) indirizzata per contenuto.
+
+Gli artefatti remoti vengono scaricati una sola volta in
+ARTIFACT_CACHE_DIR/objects/<sha256><estensione>; un indice JSON associa ogni nome remoto
+ai metadati dell'ultima versione scaricata (dimensione, generation, md5). A ogni
+richiesta viene letto solo il metadato remoto: se coincide con l'indice il file
+in cache viene riutilizzato senza scaricarlo di nuovo.
+
+Backend disponibili:
+    - "gs://bucket[/prefisso]": Google Cloud Storage (metadati size/md5/generation del blob)
+    - percorso di una directory locale: funziona offline (metadati size/mtime del file)
+
+Se il backend non è raggiungibile viene restituita l'ultima versione in cache.
+"""
+
+import os
+import json
+import base64
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+from datetime import datetime
+
+logger = logging.getLogger('artifact_cache')
+
+# Directory della cache e sorgente predefinita degli artefatti
+ARTIFACT_CACHE_DIR = os.environ.get(
+    'ARTIFACT_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'trading-ai', 'artifacts')
+)
+ARTIFACT_SOURCE = os.environ.get('ARTIFACT_SOURCE')
+
+def _file_digests(path):
+    """SHA-256 (esadecimale) e MD5 (base64, come su GCS) di un file."""
+    sha256, md5 = hashlib.sha256(), hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha256.update(chunk)
+            md5.update(chunk)
+    return sha256.hexdigest(), base64.b64encode(md5.digest()).decode()
+
+class GCSBackend:
+    """Artefatti in un bucket Google Cloud Storage, con prefisso opzionale."""
+
+    def __init__(self, bucket_name, prefix="", client=None):
+        from google.cloud import storage
+        self.client = client or storage.Client()
+        self.bucket = self.client.bucket(bucket_name)
+        self.prefix = prefix.strip("/")
+        self.uri = f"gs://{bucket_name}/{self.prefix}".rstrip("/")
+
+    def _blob_name(self, name):
+        return f"{self.prefix}/{name}" if self.prefix else name
+
+    def stat(self, name):
+        """Metadati remoti dell'artefatto, o None se non esiste (una sola richiesta di metadati)."""
+        blob = self.bucket.get_blob(self._blob_name(name))
+        if blob is None:
+            return None
+        return {"size": blob.size, "generation": str(blob.generation), "md5": blob.md5_hash}
+
+    def download(self, name, destination):
+        self.bucket.blob(self._blob_name(name)).download_to_filename(destination)
+
+    def upload(self, path, name):
+        self.bucket.blob(self._blob_name(name)).upload_from_filename(path)
+        return self.stat(name)
+
+class LocalBackend:
+    """Artefatti in una directory locale (es. copia del bucket per lavorare offline)."""
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self.uri = self.root
+
+    def stat(self, name):
+        path = os.path.join(self.root, name)
+        if not os.path.isfile(path):
+            return None
+        stat = os.stat(path)
+        return {"size": stat.st_size, "generation": str(stat.st_mtime_ns), "md5": None}
+
+    def download(self, name, destination):
+        shutil.copyfile(os.path.join(self.root, name), destination)
+
+    def upload(self, path, name):
+        destination = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        shutil.copyfile(path, destination)
+        return self.stat(name)
+
+def make_backend(source):
+    """Crea il backend da una sorgente "gs://bucket[/prefisso]" o da un percorso locale."""
+    if source.startswith("gs://"):
+        bucket_name, _, prefix = source[len("gs://"):].partition("/")
+        return GCSBackend(bucket_name, prefix)
+    return LocalBackend(source)
+
+class ArtifactCache:
+    """
+    Cache degli artefatti di un backend.
+
+    Args:
+        backend: GCSBackend, LocalBackend o un oggetto con stat/download/upload
+        cache_dir (str): Directory locale della cache
+    """
+
+    def __init__(self, backend, cache_dir=ARTIFACT_CACHE_DIR):
+        self.backend = backend
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        self.index_path = os.path.join(cache_dir, "index.json")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.downloads = 0
+
+    def _key(self, name):
+        return f"{self.backend.uri}/{name}"
+
+    def _load_index(self):
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_index(self, index):
+        # Scrittura atomica: file temporaneo nella stessa directory e os.replace
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".json")
+        with os.fdopen(fd, "w") as f:
+            json.dump(index, f, indent=2)
+        os.replace(temp_path, self.index_path)
+
+    def _object_path(self, entry):
+        # L'estensione viene mantenuta: i loader dei modelli scelgono il formato in base ad essa
+        return os.path.join(self.objects_dir, entry["sha256"][:2], entry["sha256"] + entry["suffix"])
+
+    def _store(self, path, name, sha256):
+        """Sposta un file già verificato nell'area indirizzata per contenuto e restituisce i campi dell'indice."""
+        stored = {"sha256": sha256, "suffix": os.path.splitext(name)[1]}
+        object_path = self._object_path(stored)
+        os.makedirs(os.path.dirname(object_path), exist_ok=True)
+        os.replace(path, object_path)
+        os.chmod(object_path, 0o444)
+        return stored
+
+    @staticmethod
+    def _is_current(entry, remote):
+        if entry is None or remote is None:
+            return False
+        if entry["size"] != remote["size"] or entry["generation"] != remote["generation"]:
+            return False
+        return not (entry.get("md5") and remote.get("md5") and entry["md5"] != remote["md5"])
+
+    @staticmethod
+    def _file_signature(path):
+        stat = os.stat(path)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def _materialize(self, entry, destination):
+        """
+        Copia l'oggetto in destination e ne registra dimensione e mtime nella voce
+        dell'indice: la copia viene saltata solo se la destinazione non è stata
+        modificata da allora. Le destinazioni sono sempre copie indipendenti, così
+        una sovrascrittura locale non può alterare l'oggetto in cache.
+        """
+        object_path = self._object_path(entry)
+        if destination is None:
+            return object_path
+        destination = os.path.abspath(destination)
+        destinations = entry.setdefault("destinations", {})
+        if os.path.exists(destination) and destinations.get(destination) == self._file_signature(destination):
+            return destination
+        os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+        temp_path = f"{destination}.tmp"
+        shutil.copyfile(object_path, temp_path)
+        os.replace(temp_path, destination)
+        destinations[destination] = self._file_signature(destination)
+        return destination
+
+    def _serve(self, key, entry, destination):
+        """Rende disponibile l'oggetto di una voce e salva l'indice se la destinazione è cambiata."""
+        before = dict(entry.get("destinations", {}))
+        path = self._materialize(entry, destination)
+        if entry.get("destinations", {}) != before:
+            index = self._load_index()
+            index[key] = entry
+            self._save_index(index)
+        return path
+
+    def fetch(self, name, destination=None):
+        """
+        Restituisce il percorso locale dell'artefatto, scaricandolo solo se è cambiato.
+
+        Args:
+            name (str): Nome dell'artefatto nel backend (es. "xgboost_model.pkl")
+            destination (str, optional): Percorso in cui copiarlo; se None viene
+                restituito il file (in sola lettura) nella cache
+
+        Raises:
+            FileNotFoundError: se l'artefatto non esiste nel backend né in cache
+            IOError: se il contenuto scaricato non corrisponde all'MD5 del backend
+        """
+        key = self._key(name)
+        with self._lock:
+            entry = self._load_index().get(key)
+            try:
+                remote = self.backend.stat(name)
+            except Exception as e:
+                if entry and os.path.exists(self._object_path(entry)):
+                    logger.warning(f"⚠️ Backend non raggiungibile per {name}, uso la copia in cache: {str(e)}")
+                    self.hits += 1
+                    return self._serve(key, entry, destination)
+                raise
+
+            if remote is None:
+                raise FileNotFoundError(f"Artefatto non trovato: {key}")
+
+            if self._is_current(entry, remote) and os.path.exists(self._object_path(entry)):
+                self.hits += 1
+                logger.info(f"Artefatto invariato, uso la cache: {name}")
+                return self._serve(key, entry, destination)
+
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir)
+            os.close(fd)
+            try:
+                self.backend.download(name, temp_path)
+                # Verifica prima di salvare: un download corrotto non entra nell'area degli oggetti
+                sha256, md5 = _file_digests(temp_path)
+                if remote.get("md5") and remote["md5"] != md5:
+                    raise IOError(f"Checksum MD5 non corrispondente per {key}")
+                stored = self._store(temp_path, name, sha256)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+            entry = {**remote, **stored, "fetched_at": datetime.now().isoformat()}
+            self.downloads += 1
+            logger.info(f"✔ Scaricato {name} da {self.backend.uri} ({remote['size']} byte)")
+            path = self._materialize(entry, destination)
+            index = self._load_index()
+            index[key] = entry
+            self._save_index(index)
+            return path
+
+    def put(self, path, name):
+        """
+        Carica un artefatto nel backend e lo registra in cache, così un successivo
+        fetch dallo stesso backend non lo scarica di nuovo.
+        """
+        with self._lock:
+            remote = self.backend.upload(path, name)
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir)
+            os.close(fd)
+            try:
+                shutil.copyfile(path, temp_path)
+                sha256, _ = _file_digests(temp_path)
+                stored = self._store(temp_path, name, sha256)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+            index = self._load_index()
+            index[self._key(name)] = {**remote, **stored, "fetched_at": datetime.now().isoformat()}
+            self._save_index(index)
+            logger.info(f"✔ Caricato {name} su {self.backend.uri}")
+            return remote
+
+    def metrics(self):
+        return {"hits": self.hits, "downloads": self.downloads, "cache_dir": self.cache_dir}
+
+# Cache condivise nel processo, una per sorgente
+_caches = {}
+_caches_lock = threading.Lock()
+
+def get_artifact_cache(source=None, cache_dir=ARTIFACT_CACHE_DIR):
+    """
+    Restituisce la cache per una sorgente ("gs://bucket[/prefisso]" o directory locale).
+    Se source è None viene usata ARTIFACT_SOURCE.
+    """
+    source = source or ARTIFACT_SOURCE
+    if not source:
+        raise ValueError("Nessuna sorgente di artefatti configurata (ARTIFACT_SOURCE)")
+    with _caches_lock:
+        cache = _caches.get((source, cache_dir))
+        if cache is None:
+            cache = _caches[(source, cache_dir)] = ArtifactCache(make_backend(source), cache_dir)
+        return cache
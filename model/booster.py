@@ -0,0 +1,65 @@
+"""
+Caricamento e salvataggio del modello XGBoost nel formato nativo del booster.
+
+Il formato UBJSON (.ubj) è indipendente dalla versione di Python, si carica molto
+più velocemente del pickle dell'XGBRegressor e permette di chiamare direttamente
+Booster.inplace_predict senza passare dal wrapper scikit-learn.
+"""
+
+import os
+import joblib
+import numpy as np
+import xgboost as xgb
+
+NATIVE_MODEL_EXTENSIONS = (".ubj", ".json")
+
+def native_model_path(path):
+    """Restituisce il percorso del modello nativo (.ubj) corrispondente a un pickle."""
+    root, ext = os.path.splitext(path)
+    if ext in NATIVE_MODEL_EXTENSIONS:
+        return path
+    return f"{root}.ubj"
+
+def save_native_model(model, path):
+    """Salva il booster di un XGBRegressor (o un Booster) in formato nativo."""
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
+    booster.save_model(path)
+    return path
+
+class BoosterModel:
+    """
+    Modello di previsione basato su xgboost.Booster con predict in-place.
+    Espone predict(X) come l'XGBRegressor, così può sostituirlo nel codice esistente.
+    """
+
+    def __init__(self, booster, source=None):
+        self.booster = booster
+        self.source = source
+
+    @property
+    def feature_names(self):
+        return self.booster.feature_names
+
+    def predict(self, X):
+        if not hasattr(X, "columns"):
+            X = np.asarray(X, dtype=np.float32)
+        return self.booster.inplace_predict(X)
+
+def load_booster_model(path):
+    """
+    Carica un modello da file: formato nativo (.ubj/.json) oppure pickle joblib
+    di un XGBRegressor, da cui viene estratto il booster.
+    """
+    if path.endswith(NATIVE_MODEL_EXTENSIONS):
+        booster = xgb.Booster()
+        booster.load_model(path)
+    else:
+        booster = joblib.load(path).get_booster()
+    return BoosterModel(booster, source=path)
+
+def load_preferred_model(path):
+    """Carica il modello nativo affiancato al pickle se presente, altrimenti il pickle."""
+    native_path = native_model_path(path)
+    if os.path.exists(native_path):
+        return load_booster_model(native_path)
+    return load_booster_model(path)
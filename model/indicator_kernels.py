@@ -0,0 +1,124 @@
+"""
+Kernel NumPy per medie esponenziali e di Wilder (RSI, ATR).
+
+La ricorrenza y[t] = d * y[t-1] + a * x[t] viene risolta a blocchi in forma
+chiusa: dentro un blocco y[k] = D[k] * (y[-1] + cumsum(a * x / D)[k]), con
+D[k] = prodotto dei fattori di decadimento. Così il ciclo Python gira una volta
+per blocco (qualche centinaio di barre) invece che una volta per barra, e ogni
+blocco è vettorizzato su tutte le colonne. La dimensione del blocco è scelta in
+modo che 1/D resti sotto BLOCK_GROWTH_LIMIT e non si perda precisione.
+
+I NaN non aggiornano lo stato (la media resta quella precedente); la media parte
+dal primo valore valido di ogni colonna, come pandas ewm(adjust=False).
+Con dtype=np.float32 input e risultati occupano metà memoria; i calcoli interni
+di ogni blocco restano in float64.
+"""
+
+import math
+import numpy as np
+
+# Massimo rapporto 1/D all'interno di un blocco
+BLOCK_GROWTH_LIMIT = 1e6
+
+def _block_size(decay):
+    if decay <= 0.0:
+        return 1 << 16
+    return max(1, int(math.log(BLOCK_GROWTH_LIMIT) / -math.log(decay)))
+
+def ema(values, alpha, min_periods=0, dtype=np.float64):
+    """
+    Media esponenziale lungo l'asse 0 (tempo) di un array 1-D o 2-D (tempo × simbolo).
+
+    Args:
+        values (array-like): Serie o matrice di valori, NaN dove mancanti
+        alpha (float): Peso della nuova osservazione (1/periodo per Wilder, 2/(span+1) per EMA)
+        min_periods (int): Osservazioni valide necessarie prima di restituire un valore
+        dtype: Tipo dei risultati (np.float64 o np.float32)
+
+    Returns:
+        np.ndarray: Media della stessa forma di values, NaN prima di min_periods osservazioni
+    """
+    values = np.asarray(values, dtype=dtype)
+    squeeze = values.ndim == 1
+    if squeeze:
+        values = values[:, None]
+
+    n_rows = len(values)
+    if n_rows == 0:
+        # Nessuna barra: argmax non è definito su un asse vuoto
+        return values[:, 0] if squeeze else values.copy()
+
+    valid = ~np.isnan(values)
+    result = np.empty(values.shape, dtype=dtype)
+
+    # Stato iniziale: primo valore valido di ogni colonna
+    first = np.argmax(valid, axis=0)
+    state = values[first, np.arange(values.shape[1])].astype(np.float64)
+    state[~valid.any(axis=0)] = np.nan
+
+    decay = 1.0 - alpha
+    block = _block_size(decay)
+    for start in range(0, n_rows, block):
+        stop = min(start + block, n_rows)
+        x = values[start:stop].astype(np.float64)
+        v = valid[start:stop]
+        # D[k] = prodotto dei decadimenti fino a k (1 dove il valore manca)
+        cumulative_decay = np.cumprod(np.where(v, decay, 1.0), axis=0)
+        if decay > 0.0:
+            weighted = np.cumsum(np.where(v, alpha * x, 0.0) / cumulative_decay, axis=0)
+            y = cumulative_decay * (state + weighted)
+        else:
+            y = np.where(v, x, np.nan)
+            y = _forward_fill(y, state)
+        result[start:stop] = y
+        state = y[-1]
+
+    if min_periods > 1:
+        result[np.cumsum(valid, axis=0) < min_periods] = np.nan
+    else:
+        result[np.cumsum(valid, axis=0) == 0] = np.nan
+    return result[:, 0] if squeeze else result
+
+def _forward_fill(y, state):
+    """Propaga l'ultimo valore valido (caso alpha = 1)."""
+    index = np.where(~np.isnan(y), np.arange(len(y))[:, None], -1)
+    index = np.maximum.accumulate(index, axis=0)
+    filled = y[np.maximum(index, 0), np.arange(y.shape[1])]
+    return np.where(index >= 0, filled, state)
+
+def wilder(values, period, dtype=np.float64):
+    """Media di Wilder (alpha = 1/periodo), NaN prima di `period` osservazioni."""
+    return ema(values, 1.0 / period, min_periods=period, dtype=dtype)
+
+def ema_span(values, span, dtype=np.float64):
+    """Media esponenziale classica con alpha = 2 / (span + 1)."""
+    return ema(values, 2.0 / (span + 1), min_periods=span, dtype=dtype)
+
+def _previous(values):
+    previous = np.empty_like(values)
+    previous[:1] = np.nan
+    previous[1:] = values[:-1]
+    return previous
+
+def rsi(close, period=14, dtype=np.float64):
+    """
+    RSI di Wilder su una serie (T,) o una matrice (T, N) di chiusure.
+    Vale 100 se non ci sono perdite nel periodo, NaN se il prezzo non si è mosso.
+    """
+    close = np.asarray(close, dtype=dtype)
+    delta = close - _previous(close)
+    avg_gain = wilder(np.where(np.isnan(delta), np.nan, np.maximum(delta, 0)), period, dtype)
+    avg_loss = wilder(np.where(np.isnan(delta), np.nan, np.maximum(-delta, 0)), period, dtype)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (100 - 100 / (1 + avg_gain / avg_loss)).astype(dtype, copy=False)
+
+def true_range(high, low, close, dtype=np.float64):
+    """True range; sulla prima barra vale high - low."""
+    high, low, close = (np.asarray(a, dtype=dtype) for a in (high, low, close))
+    previous_close = _previous(close)
+    # fmax ignora i NaN come max(axis=1) di pandas
+    return np.fmax(np.fmax(high - low, np.abs(high - previous_close)), np.abs(low - previous_close))
+
+def atr(high, low, close, period=14, dtype=np.float64):
+    """Average True Range di Wilder (non normalizzato)."""
+    return wilder(true_range(high, low, close, dtype), period, dtype)
@@ -0,0 +1,126 @@
+"""
+Indicatori tecnici su pannello (tempo × simbolo) per l'intero universo.
+
+Le serie OHLCV di tutti i simboli sono matrici NumPy di forma (T, N): SMA e VWAP
+si ottengono con somme cumulative lungo l'asse del tempo, RSI e ATR di Wilder con
+i kernel a blocchi di model/indicator_kernels.py su tutti i simboli. Le definizioni
+coincidono con scripts/streaming_indicators.batch_indicators, ma senza cicli per
+simbolo. I valori mancanti (NaN), ad es. prima della quotazione di un titolo,
+sono ignorati.
+"""
+
+import numpy as np
+import pandas as pd
+
+from model.indicator_kernels import rsi, atr
+
+FEATURES = ["SMA_50", "SMA_200", "RSI", "ATR", "VWAP"]
+PRICE_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+SMA_WINDOWS = (50, 200)
+RSI_PERIOD = 14
+ATR_PERIOD = 14
+
+def panel_from_frame(prices):
+    """
+    Converte un DataFrame in formato lungo (date, symbol, open, high, low, close,
+    volume), come stock_daily_prices, in matrici (T, N).
+
+    Returns:
+        tuple: (dict colonna -> np.ndarray (T, N), DatetimeIndex delle date, Index dei simboli)
+    """
+    wide = prices.pivot_table(index="date", columns="symbol", values=PRICE_COLUMNS, aggfunc="last").sort_index()
+    symbols = wide["close"].columns
+    panel = {
+        column: wide[column].reindex(columns=symbols).to_numpy(dtype=np.float64)
+        for column in PRICE_COLUMNS if column in wide.columns.get_level_values(0)
+    }
+    return panel, wide.index, symbols
+
+def rolling_mean(values, window):
+    """
+    Media mobile su `window` righe per ogni colonna; NaN finché la finestra non è completa.
+    Le somme cumulative sono sempre in float64 per non perdere precisione.
+    """
+    valid = ~np.isnan(values)
+    total = np.cumsum(np.where(valid, values, 0.0), axis=0, dtype=np.float64)
+    count = np.cumsum(valid, axis=0)
+    total[window:] = total[window:] - total[:-window]
+    count[window:] = count[window:] - count[:-window]
+    result = (total / window).astype(values.dtype, copy=False)
+    result[count < window] = np.nan
+    return result
+
+def compute_panel_indicators(high, low, close, volume, sma_windows=SMA_WINDOWS,
+                             rsi_period=RSI_PERIOD, atr_period=ATR_PERIOD, dtype=np.float64):
+    """
+    Calcola SMA, RSI e ATR di Wilder e VWAP cumulativo per tutti i simboli.
+
+    Args:
+        high, low, close, volume (np.ndarray): Matrici (T, N)
+        dtype: np.float32 per dimezzare la memoria su storie lunghe
+
+    Returns:
+        dict: nome indicatore -> np.ndarray (T, N), valori non normalizzati
+    """
+    high, low, close, volume = (np.asarray(a, dtype=dtype) for a in (high, low, close, volume))
+    indicators = {f"SMA_{window}": rolling_mean(close, window) for window in sma_windows}
+    indicators["RSI"] = rsi(close, rsi_period, dtype=dtype)
+    indicators["ATR"] = atr(high, low, close, atr_period, dtype=dtype)
+
+    typical_price = (high + low + close) / 3
+    valid = ~(np.isnan(typical_price) | np.isnan(volume))
+    cum_price_volume = np.cumsum(np.where(valid, typical_price * volume, 0.0), axis=0, dtype=np.float64)
+    cum_volume = np.cumsum(np.where(valid, volume, 0.0), axis=0, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vwap = (cum_price_volume / cum_volume).astype(dtype, copy=False)
+    vwap[cum_volume == 0] = np.nan
+    indicators["VWAP"] = vwap
+    return indicators
+
+def compute_panel_features(panel, dtype=np.float64):
+    """
+    Feature del modello e target per ogni (data, simbolo): SMA e ATR normalizzati
+    sulla chiusura come in scripts/collector_service.py, future_return a 1 barra.
+
+    Returns:
+        dict: nome -> np.ndarray (T, N) per FEATURES e future_return
+    """
+    close = np.asarray(panel["close"], dtype=dtype)
+    indicators = compute_panel_indicators(panel["high"], panel["low"], close, panel["volume"], dtype=dtype)
+    features = {
+        "SMA_50": indicators["SMA_50"] / close,
+        "SMA_200": indicators["SMA_200"] / close,
+        "RSI": indicators["RSI"],
+        "ATR": indicators["ATR"] / close,
+        "VWAP": indicators["VWAP"],
+    }
+    future_return = np.full_like(close, np.nan)
+    future_return[:-1] = close[1:] / close[:-1] - 1
+    features["future_return"] = future_return
+    return features
+
+def build_training_data(prices, dtype=np.float64):
+    """
+    Costruisce il dataset di addestramento per model/train_model.py dall'intero
+    universo in un'unica passata, al posto di process_data_for_training simbolo per simbolo.
+
+    Args:
+        prices (pd.DataFrame): Barre in formato lungo (date, symbol, open, high, low, close, volume)
+        dtype: Tipo delle matrici di calcolo (np.float32 per universi molto grandi)
+
+    Returns:
+        pd.DataFrame: date, symbol, FEATURES e future_return, solo righe complete
+    """
+    panel, dates, symbols = panel_from_frame(prices)
+    features = compute_panel_features(panel, dtype=dtype)
+
+    columns = FEATURES + ["future_return"]
+    stacked = np.column_stack([features[name].ravel() for name in columns])
+    complete = ~np.isnan(stacked).any(axis=1)
+
+    n_dates, n_symbols = panel["close"].shape
+    data = pd.DataFrame(stacked[complete], columns=columns)
+    data.insert(0, "symbol", np.tile(symbols.to_numpy(), n_dates)[complete])
+    data.insert(0, "date", np.repeat(dates.to_numpy(), n_symbols)[complete])
+    return data
@@ -1,8 +1,12 @@
-import joblib
+import os
+import sys
 import pandas as pd
 
-# Carica il modello
-model = joblib.load("models/xgboost_model.pkl")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from model.booster import load_preferred_model
+
+# Carica il modello (formato nativo .ubj se presente, altrimenti il pickle)
+model = load_preferred_model("models/xgboost_model.pkl")
 
 # Simula nuovi dati di input
 new_data = pd.DataFrame([[1.2, 0.8, 50, 1.5, 100]], columns=["SMA_50", "SMA_200", "RSI", "ATR", "VWAP"])
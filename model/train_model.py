@@ -2,9 +2,25 @@ import xgboost as xgb
 import pandas as pd
 import joblib
 import os
+import sys
+import argparse
 
-def train_and_save_model():
-    """Carica i dati, addestra un modello XGBoost e lo salva in models/"""
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from model.booster import save_native_model
+from model.panel_indicators import build_training_data
+
+# Iperparametri predefiniti dell'XGBRegressor (confrontabili con backtesting/sweep.py)
+DEFAULT_MODEL_PARAMS = {"n_estimators": 100, "learning_rate": 0.1, "max_depth": 5}
+
+def train_and_save_model(prices_path=None, model_params=None):
+    """
+    Carica i dati, addestra un modello XGBoost e lo salva in models/
+
+    Se prices_path è indicato (CSV in formato lungo date, symbol, open, high, low,
+    close, volume), le feature vengono calcolate per l'intero universo con il
+    motore a pannello invece di leggere backtesting/historical_data.csv.
+    model_params sostituisce i valori di DEFAULT_MODEL_PARAMS.
+    """
 
     # Assicuriamoci che la cartella models/ esista
     os.makedirs("models", exist_ok=True)
@@ -12,12 +28,20 @@ def train_and_save_model():
     # Percorso del file CSV
     data_path = "backtesting/historical_data.csv"
 
+    if prices_path is not None:
+        data_path = prices_path
+
     # Controlla se il file esiste prima di procedere
     if not os.path.exists(data_path):
         raise FileNotFoundError(f"Errore: Il file {data_path} non esiste.")
 
     # Carica i dati
-    data = pd.read_csv(data_path)
+    if prices_path is not None:
+        print(f"Calcolo delle feature a pannello da {prices_path}...")
+        data = build_training_data(pd.read_csv(prices_path, parse_dates=["date"]))
+        print(f"Dataset: {len(data)} righe, {data['symbol'].nunique()} simboli")
+    else:
+        data = pd.read_csv(data_path)
 
     # Controlliamo che le colonne necessarie siano presenti
     required_columns = ["SMA_50", "SMA_200", "RSI", "ATR", "VWAP", "future_return"]
@@ -30,7 +54,7 @@ def train_and_save_model():
     y = data["future_return"]
 
     # Definizione del modello XGBoost
-    model = xgb.XGBRegressor(n_estimators=100, learning_rate=0.1, max_depth=5)
+    model = xgb.XGBRegressor(**{**DEFAULT_MODEL_PARAMS, **(model_params or {})})
 
     print("Inizio addestramento del modello...")
     model.fit(X, y)
@@ -41,7 +65,16 @@ def train_and_save_model():
     joblib.dump(model, model_path)
     print(f"Modello addestrato e salvato in {model_path}")
 
+    # Salva anche il booster nativo (UBJSON) usato dal servizio di previsione
+    native_path = save_native_model(model, "models/xgboost_model.ubj")
+    print(f"Booster nativo salvato in {native_path}")
+
 # Esegui il codice solo se lo script è eseguito direttamente
 if __name__ == "__main__":
-    train_and_save_model()
+    parser = argparse.ArgumentParser(description="Addestramento del modello XGBoost")
+    parser.add_argument("--prices", default=None,
+                        help="CSV OHLCV in formato lungo (date, symbol, open, high, low, close, volume); "
+                             "se omesso viene usato backtesting/historical_data.csv")
+    args = parser.parse_args()
 
+    train_and_save_model(args.prices)
@@ -6,14 +6,21 @@ Questo script espone un endpoint per fare previsioni utilizzando il modello adde
 
 import os
 import sys
-import json
 import time
-import pandas as pd
 import numpy as np
-import joblib
 from flask import Flask, request, jsonify
 import logging
-from google.cloud import storage
+import threading
+from collections import OrderedDict
+
+# Importa i moduli dalla stessa directory e dalla radice del progetto
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from prediction_batcher import PredictionBatcher
+from model_registry import ModelRegistry
+from symbol_features import SymbolFeatureCache, SymbolNotFoundError, InsufficientHistoryError
+from model.booster import load_booster_model, load_preferred_model
+from model.artifact_cache import ARTIFACT_SOURCE, get_artifact_cache
 
 # Configurazione logging
 logging.basicConfig(
@@ -30,8 +37,35 @@ MODEL_PATH = os.environ.get('MODEL_PATH', 'models/xgboost_model.pkl')
 BUCKET_NAME = os.environ.get('BUCKET_NAME', 'trading-ai-bucket')
 RUN_LOCAL = os.environ.get('RUN_LOCAL', 'true').lower() == 'true'
 
+# Feature del modello, nell'ordine usato in addestramento
+FEATURES = ["SMA_50", "SMA_200", "RSI", "ATR", "VWAP"]
+
+# Soglie sul rendimento previsto per le decisioni di trading
+BUY_THRESHOLD = float(os.environ.get('BUY_THRESHOLD', '0.02'))
+SELL_THRESHOLD = float(os.environ.get('SELL_THRESHOLD', '-0.01'))
+
+# Micro-batching: unisce le richieste concorrenti in un'unica chiamata al modello
+BATCHING_ENABLED = os.environ.get('BATCHING_ENABLED', 'false').lower() == 'true'
+BATCH_MAX_WAIT_MS = float(os.environ.get('BATCH_MAX_WAIT_MS', '2'))
+BATCH_MAX_ROWS = int(os.environ.get('BATCH_MAX_ROWS', '256'))
+
+# Ricaricamento a caldo: osserva MODEL_PATH (o MODEL_WATCH_DIR, directory locale al posto del bucket)
+HOT_RELOAD_ENABLED = os.environ.get('HOT_RELOAD_ENABLED', 'true').lower() == 'true'
+MODEL_WATCH_DIR = os.environ.get('MODEL_WATCH_DIR')
+MODEL_POLL_SECONDS = float(os.environ.get('MODEL_POLL_SECONDS', '30'))
+
+# Cache delle previsioni per vettori di feature ripetuti
+PREDICTION_CACHE_ENABLED = os.environ.get('PREDICTION_CACHE_ENABLED', 'true').lower() == 'true'
+PREDICTION_CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', '10000'))
+PREDICTION_CACHE_TTL = float(os.environ.get('PREDICTION_CACHE_TTL', '300'))
+PREDICTION_CACHE_DECIMALS = int(os.environ.get('PREDICTION_CACHE_DECIMALS', '6'))
+PREDICTION_CACHE_MAX_ROWS = int(os.environ.get('PREDICTION_CACHE_MAX_ROWS', '64'))
+
 def load_model():
-    """Carica il modello XGBoost."""
+    """
+    Carica il modello XGBoost come booster nativo con predict in-place.
+    Per ogni percorso viene preferito il file .ubj affiancato al pickle.
+    """
     model = None
     
     # Prova prima localmente
@@ -43,26 +77,30 @@ def load_model():
     
     for path in local_paths:
         if os.path.exists(path):
-            logger.info(f"Caricamento modello da {path}")
-            model = joblib.load(path)
+            model = load_preferred_model(path)
+            logger.info(f"Caricamento modello da {model.source}")
             break
     
-    # Se non trovato localmente e non siamo in modalità locale, prova da GCS
-    if model is None and not RUN_LOCAL:
+    # Se non trovato localmente prova dalla cache degli artefatti (GCS, o la directory
+    # ARTIFACT_SOURCE anche in modalità locale): il download avviene solo se il modello è cambiato
+    if model is None and (ARTIFACT_SOURCE or not RUN_LOCAL):
+        source = ARTIFACT_SOURCE or f"gs://{BUCKET_NAME}"
         try:
-            logger.info(f"Tentativo di caricamento modello da GCS bucket: {BUCKET_NAME}")
-            storage_client = storage.Client()
-            bucket = storage_client.bucket(BUCKET_NAME)
-            blob = bucket.blob("xgboost_model.pkl")
-            
-            # Scarica in un file temporaneo
-            temp_path = "/tmp/temp_model.pkl"
-            blob.download_to_filename(temp_path)
+            logger.info(f"Tentativo di caricamento modello da {source}")
+            cache = get_artifact_cache(source)
             
-            model = joblib.load(temp_path)
-            logger.info("Modello caricato con successo da GCS")
+            # Preferisci il formato nativo, altrimenti il pickle
+            for blob_name in ("xgboost_model.ubj", "xgboost_model.pkl"):
+                try:
+                    path = cache.fetch(blob_name)
+                except FileNotFoundError:
+                    continue
+                
+                model = load_booster_model(path)
+                logger.info(f"Modello caricato con successo da {source} ({blob_name})")
+                break
         except Exception as e:
-            logger.error(f"Errore durante il caricamento del modello da GCS: {str(e)}")
+            logger.error(f"Errore durante il caricamento del modello da {source}: {str(e)}")
     
     if model is None:
         logger.error("Impossibile caricare il modello da nessuna fonte")
@@ -71,81 +109,256 @@ def load_model():
     return model
 
 # Carica il modello all'avvio
+model_registry = ModelRegistry(poll_interval=MODEL_POLL_SECONDS)
 try:
-    model = load_model()
+    model_registry.publish(load_model())
 except Exception as e:
     logger.error(f"Errore durante il caricamento del modello: {str(e)}")
-    model = None
+
+if HOT_RELOAD_ENABLED:
+    model_registry.watch(MODEL_WATCH_DIR or MODEL_PATH)
+
+class PredictionCache:
+    """
+    Cache LRU con scadenza delle previsioni, indicizzata sulla versione del modello
+    e sul vettore di feature arrotondato. Il numero di voci è limitato a max_entries.
+    """
+    
+    def __init__(self, max_entries=10000, ttl=300.0, decimals=6):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.decimals = decimals
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def keys_for(self, version, features):
+        """Chiavi di cache per ogni riga: versione del modello + byte del vettore arrotondato."""
+        rounded = np.round(features, self.decimals).astype(np.float32) + np.float32(0.0)  # -0.0 -> 0.0
+        return [(version, row.tobytes()) for row in rounded]
+    
+    def get_many(self, keys):
+        """Restituisce le previsioni in cache (None dove mancanti o scadute)."""
+        now = time.monotonic()
+        results = []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and now - entry[1] > self.ttl:
+                    del self._entries[key]
+                    self.expirations += 1
+                    entry = None
+                if entry is None:
+                    self.misses += 1
+                    results.append(None)
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    results.append(entry[0])
+        return results
+    
+    def put_many(self, keys, values):
+        now = time.monotonic()
+        with self._lock:
+            for key, value in zip(keys, values):
+                self._entries[key] = (float(value), now)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def metrics(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+prediction_cache = None
+if PREDICTION_CACHE_ENABLED:
+    prediction_cache = PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL, PREDICTION_CACHE_DECIMALS)
+
+def predict_with_cache(active, features):
+    """
+    Previsione con cache per i payload piccoli: solo le righe non in cache
+    vengono passate al modello, in un'unica chiamata.
+    """
+    if prediction_cache is None or len(features) > PREDICTION_CACHE_MAX_ROWS:
+        return run_model(active.model, features)
+    
+    keys = prediction_cache.keys_for(active.version, features)
+    cached = prediction_cache.get_many(keys)
+    missing = [i for i, value in enumerate(cached) if value is None]
+    if not missing:
+        return np.asarray(cached, dtype=np.float32)
+    
+    fresh = np.asarray(run_model(active.model, features[missing]), dtype=np.float32)
+    prediction_cache.put_many([keys[i] for i in missing], fresh)
+    
+    predictions = np.asarray([0.0 if value is None else value for value in cached], dtype=np.float32)
+    predictions[missing] = fresh
+    return predictions
+
+def run_model(model, features):
+    """
+    Esegue il modello sulla matrice di feature, tramite la coda di batching se abilitata.
+    La previsione usa sempre il modello passato (quello con cui è stata costruita la
+    chiave di cache), anche se nel frattempo il registry ne ha pubblicato uno nuovo.
+    """
+    if batcher is not None and len(features) < BATCH_MAX_ROWS:
+        return batcher.predict(features, model)
+    return model.predict(features)
+
+# Il batcher esegue ogni batch con il modello catturato dalle sue richieste
+batcher = None
+if BATCHING_ENABLED:
+    batcher = PredictionBatcher(
+        lambda features, model: model.predict(features),
+        max_batch_rows=BATCH_MAX_ROWS,
+        max_wait_ms=BATCH_MAX_WAIT_MS
+    )
+    logger.info(f"Micro-batching attivo (max_wait={BATCH_MAX_WAIT_MS} ms, max_rows={BATCH_MAX_ROWS})")
 
 @app.route('/health', methods=['GET'])
 def health_check():
-    """Endpoint per verificare lo stato dell'API."""
-    if model is not None:
-        return jsonify({"status": "healthy", "message": "API pronta per l'uso"})
+    """Endpoint per verificare lo stato dell'API e la versione del modello attiva."""
+    model_status = model_registry.status()
+    if model_registry.get() is not None:
+        return jsonify({"status": "healthy", "message": "API pronta per l'uso", **model_status})
     else:
-        return jsonify({"status": "degraded", "message": "Modello non caricato"}), 503
+        return jsonify({"status": "degraded", "message": "Modello non caricato", **model_status}), 503
+
+class FeatureError(ValueError):
+    """Payload di /predict non valido (feature mancanti o non numeriche)."""
+
+def parse_features(data):
+    """
+    Converte il corpo JSON di /predict in una matrice float32 contigua con le
+    colonne nell'ordine di FEATURES, senza passare da un DataFrame.
+    
+    Formati accettati:
+        - singolo record: {"SMA_50": 1.2, "SMA_200": 0.8, ...}
+        - lista di record: [{"SMA_50": 1.2, ...}, ...]
+        - colonnare: {"SMA_50": [1.2, ...], "SMA_200": [0.8, ...], ...}
+    
+    Returns:
+        tuple: (matrice numpy float32 di forma (n, len(FEATURES)), True se singolo record)
+    """
+    if isinstance(data, dict):
+        for feature in FEATURES:
+            if feature not in data:
+                raise FeatureError(f"Feature richiesta mancante: {feature}")
+        
+        first = data[FEATURES[0]]
+        if isinstance(first, list):
+            # Formato colonnare: una lista per feature
+            columns = [np.asarray(data[feature], dtype=np.float32) for feature in FEATURES]
+            if len({len(column) for column in columns}) != 1:
+                raise FeatureError("Le colonne delle feature hanno lunghezze diverse")
+            return np.ascontiguousarray(np.column_stack(columns)), False
+        
+        return np.array([[data[feature] for feature in FEATURES]], dtype=np.float32), True
+    
+    if isinstance(data, list):
+        try:
+            matrix = np.array([[record[feature] for feature in FEATURES] for record in data], dtype=np.float32)
+        except KeyError as e:
+            raise FeatureError(f"Feature richiesta mancante: {e.args[0]}")
+        except TypeError as e:
+            raise FeatureError(f"Record non valido: {str(e)}")
+        return matrix.reshape(-1, len(FEATURES)), False
+    
+    raise FeatureError("Formato della richiesta non valido")
+
+def decide(predictions):
+    """Mappa le previsioni di rendimento in decisioni BUY/SELL/HOLD."""
+    return np.select(
+        [predictions > BUY_THRESHOLD, predictions < SELL_THRESHOLD],
+        ["BUY", "SELL"],
+        default="HOLD"
+    )
+
+def build_prediction_response(predictions, single):
+    """Prepara il corpo della risposta di /predict."""
+    decisions = decide(predictions)
+    if single or len(predictions) == 1:
+        # Singolo record
+        return {
+            "status": "success",
+            "market_prediction": float(predictions[0]),
+            "trading_decision": str(decisions[0])
+        }
+    # Più record
+    return {
+        "status": "success",
+        "market_predictions": predictions.astype(float).tolist(),
+        "trading_decisions": decisions.tolist()
+    }
+
+# Finestra mobile di barre e feature per simbolo, usata da /predict/<symbol>
+symbol_features = SymbolFeatureCache()
+
+def predict_symbol(active, symbol, interval="1d"):
+    """
+    Calcola le feature dell'ultima barra del simbolo e restituisce previsione e decisione.
+    
+    Raises:
+        SymbolNotFoundError: se non ci sono barre per il simbolo
+        InsufficientHistoryError: se le barre non bastano per SMA_200
+        ValueError: se simbolo o intervallo non sono validi
+    """
+    snapshot = symbol_features.get(symbol, interval)
+    if not snapshot["ready"]:
+        raise InsufficientHistoryError(symbol.upper(), interval, snapshot["bars"])
+    features = snapshot["features"].reshape(1, -1)
+    response = build_prediction_response(predict_with_cache(active, features), True)
+    response.update({
+        "symbol": symbol.upper(),
+        "interval": interval,
+        "as_of": snapshot["as_of"].isoformat(),
+        "features": {
+            name: None if np.isnan(value) else float(value)
+            for name, value in zip(FEATURES, snapshot["features"])
+        },
+        "bars": snapshot["bars"],
+        "data_source": snapshot["source"],
+        "cached_features": snapshot["cached"]
+    })
+    return response
 
 @app.route('/predict', methods=['POST'])
 def predict():
     """Endpoint per generare previsioni."""
-    if model is None:
+    # Riferimento locale: un ricaricamento concorrente non influisce su questa richiesta
+    active = model_registry.get()
+    if active is None:
         return jsonify({
             "status": "error",
             "message": "Modello non disponibile"
         }), 503
     
     try:
-        # Ottieni i dati dalla richiesta
-        data = request.json
-        
-        # Controllo formato: singolo record o più record
-        if isinstance(data, dict):
-            # Singolo record
-            required_features = ["SMA_50", "SMA_200", "RSI", "ATR", "VWAP"]
-            for feature in required_features:
-                if feature not in data:
-                    return jsonify({
-                        "status": "error",
-                        "message": f"Feature richiesta mancante: {feature}"
-                    }), 400
-            
-            # Crea DataFrame da un singolo record
-            input_data = pd.DataFrame([data])
-        else:
-            # Lista di record
-            input_data = pd.DataFrame(data)
-        
+        # Ottieni i dati dalla richiesta direttamente come matrice di feature
+        features, single = parse_features(request.get_json())
+    except (FeatureError, ValueError, TypeError) as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
+    
+    try:
         # Effettua la previsione
-        predictions = model.predict(input_data)
-        
-        # Genera decisioni di trading basate sulle previsioni
-        decisions = []
-        for pred in predictions:
-            if pred > 0.02:
-                decision = "BUY"
-            elif pred < -0.01:
-                decision = "SELL"
-            else:
-                decision = "HOLD"
-            decisions.append(decision)
-        
-        # Prepara la risposta
-        if len(predictions) == 1:
-            # Singolo record
-            response = {
-                "status": "success",
-                "market_prediction": float(predictions[0]),
-                "trading_decision": decisions[0]
-            }
-        else:
-            # Più record
-            response = {
-                "status": "success",
-                "market_predictions": predictions.tolist(),
-                "trading_decisions": decisions
-            }
-        
-        return jsonify(response)
+        predictions = predict_with_cache(active, features)
+        return jsonify(build_prediction_response(predictions, single))
     
     except Exception as e:
         logger.error(f"Errore durante la generazione della previsione: {str(e)}")
@@ -154,6 +367,51 @@ def predict():
             "message": str(e)
         }), 500
 
+@app.route('/predict/<symbol>', methods=['GET'])
+def predict_for_symbol(symbol):
+    """Endpoint che calcola le feature lato server dalle ultime barre del simbolo."""
+    active = model_registry.get()
+    if active is None:
+        return jsonify({
+            "status": "error",
+            "message": "Modello non disponibile"
+        }), 503
+    
+    try:
+        return jsonify(predict_symbol(active, symbol, request.args.get('interval', '1d')))
+    except SymbolNotFoundError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 404
+    except InsufficientHistoryError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e),
+            "bars": e.bars,
+            "required_bars": e.required
+        }), 422
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"Errore durante la previsione per {symbol}: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Endpoint con le metriche del servizio di previsione."""
+    return jsonify({
+        "batching": batcher.metrics() if batcher is not None else None,
+        "prediction_cache": prediction_cache.metrics() if prediction_cache is not None else None,
+        "symbol_features": symbol_features.metrics()
+    })
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 8000))
     app.run(host='0.0.0.0', port=port, debug=True)
@@ -6,9 +6,12 @@ api_utils.py - Utilities per la gestione delle API finanziarie e il rispetto dei
 import os
 import time
 import json
-import random
+import atexit
 import logging
+import tempfile
+import threading
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timedelta
 from pathlib import Path
 from dotenv import load_dotenv
@@ -30,6 +33,16 @@ API_CONFIG_PATH = CONFIG_DIR / 'api_config.json'
 # Crea la directory di configurazione se non esiste
 CONFIG_DIR.mkdir(exist_ok=True, parents=True)
 
+# Sessioni HTTP: connessioni mantenute per host e timeout (connessione, lettura) in secondi
+HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '10'))
+HTTP_TIMEOUT = (
+    float(os.getenv('HTTP_CONNECT_TIMEOUT', '5')),
+    float(os.getenv('HTTP_READ_TIMEOUT', '30')),
+)
+
+# Ogni quanti secondi lo stato del rate limiter viene salvato su file
+RATE_LIMIT_PERSIST_INTERVAL = float(os.getenv('RATE_LIMIT_PERSIST_INTERVAL', '60'))
+
 # Configurazione predefinita API
 DEFAULT_API_CONFIG = {
     "alpha_vantage": {
@@ -113,17 +126,221 @@ def load_api_config():
         return DEFAULT_API_CONFIG
 
 def save_api_config(config):
-    """Salva la configurazione delle API."""
+    """Salva la configurazione delle API in modo atomico (file temporaneo + rename)."""
     try:
-        with open(API_CONFIG_PATH, 'w') as f:
-            json.dump(config, f, indent=4)
+        fd, tmp_path = tempfile.mkstemp(dir=CONFIG_DIR, prefix='.api_config.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(config, f, indent=4)
+            os.replace(tmp_path, API_CONFIG_PATH)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
         logger.debug("✅ Configurazione API aggiornata")
     except Exception as e:
         logger.error(f"❌ Errore salvataggio configurazione API: {str(e)}")
 
+class RateLimiter:
+    """
+    Rate limiter in memoria per le API configurate, condivisibile tra thread.
+    
+    Il limite al minuto è un token bucket con capacità di un solo token e ricarica
+    continua: le richieste vengono distanziate di 60/requests_per_minute secondi,
+    così in nessuna finestra di 60 secondi ne passano più di requests_per_minute
+    (un bucket pieno con capacità requests_per_minute consentirebbe una raffica
+    iniziale più la ricarica, quasi il doppio).
+    
+    Il limite giornaliero è un contatore azzerato a mezzanotte che conta le
+    richieste HTTP inviate, compresi i tentativi ripetuti: anche questi consumano
+    la quota del fornitore. Lo stato viene salvato su api_config.json al più ogni
+    persist_interval secondi e allo shutdown, invece che dopo ogni richiesta.
+    """
+    
+    def __init__(self, config=None, persist_interval=RATE_LIMIT_PERSIST_INTERVAL):
+        self._lock = threading.Lock()
+        self.config = config if config is not None else load_api_config()
+        self.persist_interval = persist_interval
+        self._tokens = {}
+        self._last_refill = {}
+        self._dirty = False
+        self._last_persist = time.monotonic()
+    
+    def _reset_daily_if_needed(self, rate_limit, now):
+        if not rate_limit.get('daily_reset') or datetime.fromisoformat(rate_limit['daily_reset']) < now:
+            rate_limit['daily_count'] = 0
+            rate_limit['daily_reset'] = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0).isoformat()
+            self._dirty = True
+    
+    def _refill(self, api_name, rate_limit):
+        """Ricarica il bucket al minuto (capacità 1) e restituisce i token disponibili."""
+        rate = rate_limit['requests_per_minute'] / 60
+        now = time.monotonic()
+        tokens = self._tokens.get(api_name, 1.0)
+        elapsed = now - self._last_refill.get(api_name, now)
+        tokens = min(1.0, tokens + elapsed * rate)
+        self._tokens[api_name] = tokens
+        self._last_refill[api_name] = now
+        return tokens
+    
+    def acquire(self, api_name, block=True):
+        """
+        Riserva una richiesta verso l'API, attendendo se il limite al minuto è esaurito.
+        Va chiamato prima di ogni invio, tentativi ripetuti compresi: ogni chiamata
+        riuscita incrementa daily_count.
+        
+        Args:
+            api_name (str): Nome dell'API
+            block (bool): Se False, non attende e restituisce False se serve aspettare
+        
+        Returns:
+            bool: True se la richiesta può essere effettuata, False altrimenti
+        """
+        while True:
+            with self._lock:
+                if api_name not in self.config:
+                    logger.error(f"❌ API {api_name} non configurata")
+                    return False
+                
+                rate_limit = self.config[api_name]['rate_limit']
+                self._reset_daily_if_needed(rate_limit, datetime.now())
+                
+                # Verifica limite giornaliero
+                if rate_limit['daily_count'] >= rate_limit['requests_per_day']:
+                    logger.warning(f"⚠️ Limite giornaliero superato per {api_name}")
+                    return False
+                
+                # Verifica limite al minuto
+                wait_time = 0.0
+                if 'requests_per_minute' in rate_limit:
+                    tokens = self._refill(api_name, rate_limit)
+                    if tokens >= 1:
+                        self._tokens[api_name] = tokens - 1
+                    else:
+                        wait_time = (1 - tokens) * 60 / rate_limit['requests_per_minute']
+                
+                if wait_time == 0.0:
+                    rate_limit['daily_count'] += 1
+                    self._dirty = True
+                    return True
+            
+            if not block:
+                return False
+            logger.info(f"⏳ Attesa {wait_time:.2f} secondi per rispettare il rate limit di {api_name}")
+            time.sleep(wait_time)
+    
+    def reserve_daily(self, api_name):
+        """
+        Riserva una richiesta sul solo limite giornaliero, per i client che gestiscono
+        il limite al minuto da sé (es. AsyncRateLimiter in async_collector.py).
+
+        Returns:
+            bool: False se la quota giornaliera è esaurita; True se la richiesta può
+                  essere effettuata o se l'API non ha una quota configurata
+        """
+        with self._lock:
+            rate_limit = self.config.get(api_name, {}).get('rate_limit')
+            if not rate_limit or 'requests_per_day' not in rate_limit:
+                return True
+            self._reset_daily_if_needed(rate_limit, datetime.now())
+            if rate_limit['daily_count'] >= rate_limit['requests_per_day']:
+                logger.warning(f"⚠️ Limite giornaliero superato per {api_name}")
+                return False
+            rate_limit['daily_count'] += 1
+            self._dirty = True
+            return True
+
+    def record_request(self, api_name):
+        """Registra l'orario dell'ultima richiesta e salva lo stato se è trascorso l'intervallo."""
+        with self._lock:
+            if api_name in self.config:
+                self.config[api_name]['rate_limit']['last_request'] = datetime.now().isoformat()
+                self._dirty = True
+            persist = time.monotonic() - self._last_persist >= self.persist_interval
+        if persist:
+            self.flush()
+    
+    def flush(self):
+        """Salva su file lo stato corrente, se modificato."""
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = json.loads(json.dumps(self.config))
+            self._dirty = False
+            self._last_persist = time.monotonic()
+        save_api_config(snapshot)
+    
+    def update_config(self, api_name, **settings):
+        """Aggiorna le impostazioni di un'API e salva subito la configurazione."""
+        with self._lock:
+            rate_limit = settings.pop('rate_limit', {})
+            self.config[api_name].update(settings)
+            self.config[api_name]['rate_limit'].update(rate_limit)
+            # Il bucket viene ricreato con il nuovo limite
+            self._tokens.pop(api_name, None)
+            self._dirty = True
+        self.flush()
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+def get_rate_limiter():
+    """Restituisce il rate limiter condiviso dal processo, creandolo al primo utilizzo."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = RateLimiter()
+                atexit.register(_rate_limiter.flush)
+    return _rate_limiter
+
+def get_api_config():
+    """Restituisce la configurazione API in memoria (letta da file una sola volta)."""
+    return get_rate_limiter().config
+
+_http_sessions = {}
+_http_sessions_lock = threading.Lock()
+
+def get_http_session(name, pool_maxsize=None):
+    """
+    Restituisce la sessione HTTP condivisa per un'API o una fonte dati.
+    
+    Ogni sessione mantiene un pool di connessioni keep-alive, così le richieste
+    successive allo stesso host riutilizzano la connessione TLS già aperta.
+    
+    Args:
+        name (str): Nome dell'API o della fonte (es. "alpha_vantage", "binance")
+        pool_maxsize (int, optional): Connessioni per host. Default: HTTP_POOL_MAXSIZE
+    
+    Returns:
+        requests.Session: Sessione condivisa tra i thread del processo
+    """
+    session = _http_sessions.get(name)
+    if session is not None:
+        return session
+    
+    with _http_sessions_lock:
+        session = _http_sessions.get(name)
+        if session is None:
+            pool_maxsize = pool_maxsize or HTTP_POOL_MAXSIZE
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _http_sessions[name] = session
+    return session
+
+def close_http_sessions():
+    """Chiude tutte le sessioni HTTP condivise."""
+    with _http_sessions_lock:
+        for session in _http_sessions.values():
+            session.close()
+        _http_sessions.clear()
+
 def check_rate_limit(api_name):
     """
     Verifica se è possibile fare una chiamata API rispettando i rate limits.
+    Se il limite al minuto è esaurito attende; la richiesta viene conteggiata
+    nel limite giornaliero (make_api_request la chiama a ogni tentativo).
     
     Args:
         api_name (str): Nome dell'API da verificare
@@ -131,40 +348,7 @@ def check_rate_limit(api_name):
     Returns:
         bool: True se è possibile chiamare l'API, False altrimenti
     """
-    config = load_api_config()
-    
-    if api_name not in config:
-        logger.error(f"❌ API {api_name} non configurata")
-        return False
-    
-    api_config = config[api_name]
-    rate_limit = api_config['rate_limit']
-    now = datetime.now()
-    
-    # Inizializza o resetta contatore giornaliero
-    if not rate_limit.get('daily_reset') or datetime.fromisoformat(rate_limit['daily_reset']) < now:
-        rate_limit['daily_count'] = 0
-        rate_limit['daily_reset'] = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0).isoformat()
-    
-    # Verifica limite giornaliero
-    if rate_limit['daily_count'] >= rate_limit['requests_per_day']:
-        logger.warning(f"⚠️ Limite giornaliero superato per {api_name}")
-        return False
-    
-    # Verifica limite al minuto
-    if 'requests_per_minute' in rate_limit:
-        if rate_limit.get('last_request'):
-            last_request_time = datetime.fromisoformat(rate_limit['last_request'])
-            seconds_since_last = (now - last_request_time).total_seconds()
-            
-            # Calcola ritardo necessario
-            seconds_per_request = 60 / rate_limit['requests_per_minute']
-            if seconds_since_last < seconds_per_request:
-                wait_time = seconds_per_request - seconds_since_last
-                logger.info(f"⏳ Attesa {wait_time:.2f} secondi per rispettare il rate limit di {api_name}")
-                time.sleep(wait_time)
-    
-    return True
+    return get_rate_limiter().acquire(api_name)
 
 def update_rate_limit(api_name):
     """
@@ -173,13 +357,7 @@ def update_rate_limit(api_name):
     Args:
         api_name (str): Nome dell'API da aggiornare
     """
-    config = load_api_config()
-    
-    if api_name in config:
-        rate_limit = config[api_name]['rate_limit']
-        rate_limit['last_request'] = datetime.now().isoformat()
-        rate_limit['daily_count'] += 1
-        save_api_config(config)
+    get_rate_limiter().record_request(api_name)
 
 def get_api_key(api_name):
     """
@@ -191,7 +369,7 @@ def get_api_key(api_name):
     Returns:
         str: API key o stringa vuota se non configurata
     """
-    config = load_api_config()
+    config = get_api_config()
     
     if api_name in config:
         return config[api_name]['api_key']
@@ -208,7 +386,7 @@ def get_base_url(api_name):
     Returns:
         str: URL base o None se non configurato
     """
-    config = load_api_config()
+    config = get_api_config()
     
     if api_name in config:
         return config[api_name]['base_url']
@@ -232,7 +410,7 @@ def make_api_request(api_name, endpoint="", params=None, method="GET", retries=3
     Returns:
         dict: Risposta JSON o None in caso di errore
     """
-    config = load_api_config()
+    config = get_api_config()
     
     if api_name not in config:
         logger.error(f"❌ API {api_name} non configurata")
@@ -254,6 +432,7 @@ def make_api_request(api_name, endpoint="", params=None, method="GET", retries=3
         params = {}
     
     # Aggiungi API key ai parametri (se non è già inclusa)
+    headers = None
     if api_name == "alpha_vantage" and 'apikey' not in params:
         params['apikey'] = api_key
     elif api_name == "finnhub":
@@ -281,21 +460,12 @@ def make_api_request(api_name, endpoint="", params=None, method="GET", retries=3
                 time.sleep(retry_wait * 2)  # Attesa doppia se rate limit superato
                 continue
             
-            # Effettua la richiesta
+            # Effettua la richiesta sulla sessione condivisa (connessioni keep-alive)
+            session = get_http_session(api_name)
             if method.upper() == "GET":
-                if api_name == "finnhub":
-                    response = requests.get(url, params=params, headers=headers)
-                elif "headers" in locals():
-                    response = requests.get(url, params=params, headers=headers)
-                else:
-                    response = requests.get(url, params=params)
+                response = session.get(url, params=params, headers=headers, timeout=HTTP_TIMEOUT)
             elif method.upper() == "POST":
-                if api_name == "finnhub":
-                    response = requests.post(url, json=params, headers=headers)
-                elif "headers" in locals():
-                    response = requests.post(url, json=params, headers=headers)
-                else:
-                    response = requests.post(url, json=params)
+                response = session.post(url, json=params, headers=headers, timeout=HTTP_TIMEOUT)
             else:
                 logger.error(f"❌ Metodo {method} non supportato")
                 return None
@@ -360,25 +530,21 @@ def register_api_key(api_name, api_key, premium=False):
     Returns:
         bool: True se registrata con successo, False altrimenti
     """
-    config = load_api_config()
+    limiter = get_rate_limiter()
     
-    if api_name in config:
-        config[api_name]['api_key'] = api_key
-        config[api_name]['premium'] = premium
+    if api_name in limiter.config:
+        settings = {'api_key': api_key, 'premium': premium}
         
         # Aggiorna rate limits in base al piano premium
         if premium:
             if api_name == "alpha_vantage":
-                config[api_name]['rate_limit']['requests_per_minute'] = 75
-                config[api_name]['rate_limit']['requests_per_day'] = 5000
+                settings['rate_limit'] = {'requests_per_minute': 75, 'requests_per_day': 5000}
             elif api_name == "finnhub":
-                config[api_name]['rate_limit']['requests_per_minute'] = 60
-                config[api_name]['rate_limit']['requests_per_day'] = 800
+                settings['rate_limit'] = {'requests_per_minute': 60, 'requests_per_day': 800}
             elif api_name == "financial_modeling_prep":
-                config[api_name]['rate_limit']['requests_per_minute'] = 30
-                config[api_name]['rate_limit']['requests_per_day'] = 1000
+                settings['rate_limit'] = {'requests_per_minute': 30, 'requests_per_day': 1000}
         
-        save_api_config(config)
+        limiter.update_config(api_name, **settings)
         logger.info(f"✅ API key per {api_name} registrata con successo")
         return True
     else:
@@ -397,3 +563,20 @@ def test_api_key(api_name):
     """
     if api_name == "alpha_vantage":
         # Test Alpha Vantage
+        result = make_api_request(api_name, params={"function": "GLOBAL_QUOTE", "symbol": "IBM"}, retries=1)
+        return result is not None and "Error Message" not in result and "Global Quote" in result
+    elif api_name == "finnhub":
+        # Test Finnhub
+        result = make_api_request(api_name, endpoint="quote", params={"symbol": "AAPL"}, retries=1)
+        return result is not None and "c" in result
+    elif api_name == "financial_modeling_prep":
+        # Test Financial Modeling Prep
+        result = make_api_request(api_name, endpoint="quote/AAPL", retries=1)
+        return isinstance(result, list) and len(result) > 0
+    elif api_name == "news_api":
+        # Test NewsAPI
+        result = make_api_request(api_name, endpoint="top-headlines", params={"country": "us", "pageSize": 1}, retries=1)
+        return result is not None and result.get("status") == "ok"
+    
+    logger.error(f"❌ Test non disponibile per l'API {api_name}")
+    return False
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+async_collector.py - Motore di raccolta dati asincrono basato su asyncio e aiohttp.
+
+Le versioni asincrone dei fetcher (news, FRED, Binance, Alpha Vantage) condividono
+una ClientSession e un rate limiter asincrono per fornitore: centinaia di simboli
+possono essere in volo contemporaneamente rispettando comunque la quota di
+ciascuna API. Gli URL base sono configurabili, così il motore può essere
+puntato su un server HTTP locale di prova.
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import logging
+import argparse
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+import aiohttp
+import pandas as pd
+from dotenv import load_dotenv
+
+# Aggiunge il percorso principale del progetto
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.api_utils import get_api_config, get_rate_limiter
+from data.extract_market_data import parse_crypto_data, parse_stock_data
+
+# Configurazione logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('async_collector')
+
+# Carica variabili d'ambiente
+load_dotenv()
+SYMBOLS = os.getenv('SYMBOLS', 'SPY,QQQ,AAPL,MSFT,GOOGL').split(',')
+FRED_API_KEY = os.getenv('FRED_API_KEY', '')
+ALPHA_VANTAGE_API_KEY = os.getenv('ALPHA_VANTAGE_API_KEY') or os.getenv('ALPHAVANTAGE_API_KEY', '')
+
+# Fornitori: URL base, richieste al minuto e richieste simultanee
+DEFAULT_PROVIDERS = {
+    "alpha_vantage": {"base_url": "https://www.alphavantage.co", "requests_per_minute": 5, "max_concurrency": 2},
+    "binance": {"base_url": "https://api.binance.com", "requests_per_minute": 1200, "max_concurrency": 10},
+    "fred": {"base_url": "https://api.stlouisfed.org", "requests_per_minute": 120, "max_concurrency": 4},
+    "yahoo_scraping": {"base_url": "https://finance.yahoo.com", "requests_per_minute": 30, "max_concurrency": 2},
+}
+
+# Indicatori FRED raccolti da get_macroeconomic_data
+FRED_INDICATORS = {
+    'GDP': 'Gross Domestic Product',
+    'UNRATE': 'Unemployment Rate',
+    'CPIAUCSL': 'Consumer Price Index',
+    'FEDFUNDS': 'Federal Funds Rate',
+    'T10Y2Y': 'Treasury Yield Spread',
+    'DEXUSEU': 'USD/EUR Exchange Rate',
+    'VIXCLS': 'VIX Volatility Index',
+    'SP500': 'S&P 500 Index'
+}
+
+USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Safari/605.1.15',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.107 Safari/537.36'
+]
+
+def load_provider_settings():
+    """
+    Restituisce le impostazioni dei fornitori, con i limiti al minuto di Alpha Vantage
+    letti da api_config.json (piano gratuito o premium).
+    """
+    providers = {name: dict(settings) for name, settings in DEFAULT_PROVIDERS.items()}
+    try:
+        rate_limit = get_api_config()["alpha_vantage"]["rate_limit"]
+        providers["alpha_vantage"]["requests_per_minute"] = rate_limit.get(
+            "requests_per_minute", providers["alpha_vantage"]["requests_per_minute"]
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ Configurazione API non disponibile, uso limiti predefiniti: {str(e)}")
+    return providers
+
+class AsyncRateLimiter:
+    """
+    Rate limiter asincrono per un fornitore: token bucket al minuto più un limite
+    di richieste simultanee. Come RateLimiter in api_utils il bucket ha capacità di
+    un solo token, così in nessuna finestra di 60 secondi passano più di
+    requests_per_minute richieste.
+    """
+
+    def __init__(self, requests_per_minute, max_concurrency):
+        self.capacity = 1.0
+        self.rate = max(1.0, float(requests_per_minute)) / 60
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def _take_token(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+                self._last_refill = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    @asynccontextmanager
+    async def slot(self):
+        async with self._semaphore:
+            await self._take_token()
+            yield
+
+class AsyncCollector:
+    """
+    Raccoglie dati da più fornitori in modo concorrente.
+
+    Uso:
+        async with AsyncCollector() as collector:
+            df = await collector.get_stock_data("AAPL")
+
+    Il limite giornaliero dei fornitori configurati in api_config.json (es. Alpha
+    Vantage) viene rispettato tramite i contatori condivisi del RateLimiter di
+    api_utils, gli stessi usati e salvati dalla raccolta sincrona.
+    """
+
+    def __init__(self, providers=None, timeout=30, retries=3, retry_wait=1.0, rate_limiter=None):
+        self.providers = providers or load_provider_settings()
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_wait = retry_wait
+        self.session = None
+        self.limiters = {}
+        self.request_counts = {name: 0 for name in self.providers}
+
+    async def __aenter__(self):
+        # I limiter vanno creati all'interno dell'event loop in uso
+        self.limiters = {
+            name: AsyncRateLimiter(settings["requests_per_minute"], settings["max_concurrency"])
+            for name, settings in self.providers.items()
+        }
+        connector = aiohttp.TCPConnector(
+            limit=sum(settings["max_concurrency"] for settings in self.providers.values())
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.session.close()
+        # Salva i contatori giornalieri senza bloccare il loop
+        await asyncio.to_thread(self.rate_limiter.flush)
+
+    async def _request(self, provider, path, params=None, headers=None, as_json=True):
+        """
+        Esegue una GET verso il fornitore rispettandone il rate limit, con retry
+        e backoff su 429 ed errori 5xx.
+        """
+        url = f"{self.providers[provider]['base_url'].rstrip('/')}/{path.lstrip('/')}"
+
+        for attempt in range(1, self.retries + 1):
+            async with self.limiters[provider].slot():
+                # Ogni tentativo conta sulla quota giornaliera del fornitore
+                if not self.rate_limiter.reserve_daily(provider):
+                    return None
+                self.request_counts[provider] += 1
+                try:
+                    async with self.session.get(url, params=params, headers=headers) as response:
+                        if response.status == 200:
+                            if as_json:
+                                return await response.json(content_type=None)
+                            return await response.text()
+                        status = response.status
+                        body = await response.text()
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    status, body = None, str(e)
+                finally:
+                    # record_request può salvare api_config.json: la scrittura avviene in un thread
+                    await asyncio.to_thread(self.rate_limiter.record_request, provider)
+
+            if status is not None and status != 429 and status < 500:
+                logger.error(f"❌ Errore API {provider}: {status} - {body[:200]}")
+                return None
+
+            if attempt < self.retries:
+                wait_time = self.retry_wait * 2 ** (attempt - 1)
+                logger.warning(f"⚠️ Errore {status or body} da {provider}, nuovo tentativo tra {wait_time:.1f}s")
+                await asyncio.sleep(wait_time)
+
+        logger.error(f"❌ Richiesta a {provider} fallita dopo {self.retries} tentativi: {url}")
+        return None
+
+    async def get_crypto_data(self, symbol='BTCUSDT', interval='1h', limit=100):
+        """Versione asincrona di data.extract_market_data.get_crypto_data."""
+        data = await self._request("binance", "api/v3/klines",
+                                   params={'symbol': symbol, 'interval': interval, 'limit': limit})
+        if data is None:
+            return None
+        df = parse_crypto_data(data)
+        df['symbol'] = symbol
+        return df
+
+    async def get_stock_data(self, symbol='AAPL', interval='60min', outputsize='compact'):
+        """Versione asincrona di data.extract_market_data.get_stock_data (intraday Alpha Vantage)."""
+        data = await self._request("alpha_vantage", "query", params={
+            'function': 'TIME_SERIES_INTRADAY',
+            'symbol': symbol,
+            'interval': interval,
+            'apikey': ALPHA_VANTAGE_API_KEY,
+            'outputsize': outputsize
+        })
+        if not data or f'Time Series ({interval})' not in data:
+            logger.warning(f"Nessun dato intraday Alpha Vantage per {symbol}")
+            return None
+        df = parse_stock_data(data, interval)
+        df['symbol'] = symbol
+        return df
+
+    async def get_daily_stock_data(self, symbol, outputsize='compact'):
+        """Versione asincrona dei fetcher giornalieri Alpha Vantage in archive/fetch_data*.py."""
+        data = await self._request("alpha_vantage", "query", params={
+            'function': 'TIME_SERIES_DAILY',
+            'symbol': symbol,
+            'outputsize': outputsize,
+            'apikey': ALPHA_VANTAGE_API_KEY
+        })
+        if not data or "Time Series (Daily)" not in data:
+            logger.warning(f"Nessun dato giornaliero Alpha Vantage per {symbol}")
+            return None
+
+        df = pd.DataFrame.from_dict(data["Time Series (Daily)"], orient="index", dtype=float)
+        df.index = pd.to_datetime(df.index)
+        df = df.sort_index()
+        df.columns = [c.split('. ')[1] if '. ' in c else c for c in df.columns]
+        df['symbol'] = symbol
+        return df
+
+    async def get_macroeconomic_series(self, series_id, name, observation_start):
+        """Scarica una serie FRED tramite l'API REST (equivalente asincrono di fredapi)."""
+        data = await self._request("fred", "fred/series/observations", params={
+            'series_id': series_id,
+            'api_key': FRED_API_KEY,
+            'file_type': 'json',
+            'observation_start': observation_start
+        })
+        if not data or not data.get('observations'):
+            return None
+
+        df = pd.DataFrame(data['observations'])[['date', 'value']]
+        df['date'] = pd.to_datetime(df['date'])
+        # FRED usa "." per i valori mancanti
+        df['value'] = pd.to_numeric(df['value'], errors='coerce')
+        df['indicator'] = series_id
+        df['name'] = name
+        return df
+
+    async def get_macroeconomic_data(self, years=5):
+        """Versione asincrona di get_macroeconomic_data: tutti gli indicatori in parallelo."""
+        if not FRED_API_KEY:
+            logger.warning("⚠️ FRED API KEY non configurata. Dati macroeconomici non disponibili.")
+            return {}
+
+        observation_start = (datetime.now() - timedelta(days=365 * years)).strftime('%Y-%m-%d')
+        results = await asyncio.gather(*[
+            self.get_macroeconomic_series(series_id, name, observation_start)
+            for series_id, name in FRED_INDICATORS.items()
+        ], return_exceptions=True)
+
+        macro_data = {}
+        for series_id, result in zip(FRED_INDICATORS, results):
+            if isinstance(result, Exception):
+                logger.error(f"❌ Errore per indicatore {series_id}: {str(result)}")
+            elif result is not None:
+                macro_data[series_id] = result
+        return macro_data
+
+    async def get_news_sentiment(self, symbol, limit=10):
+        """Versione asincrona di get_news_sentiment (scraping notizie Yahoo Finance)."""
+        html = await self._request("yahoo_scraping", f"quote/{symbol}/news",
+                                   headers={'User-Agent': random.choice(USER_AGENTS)}, as_json=False)
+        if not html:
+            return None
+
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html, 'html.parser')
+        articles = soup.select('div.headline') or soup.select('h3')
+
+        news_items = [
+            {'title': article.get_text().strip(), 'symbol': symbol, 'date': datetime.now().strftime('%Y-%m-%d')}
+            for article in articles[:limit]
+        ]
+        if not news_items:
+            logger.warning(f"Nessuna notizia trovata per {symbol} o format HTML cambiato")
+            return None
+        return pd.DataFrame(news_items)
+
+async def collect_symbols(symbols, collector=None, include_news=True, include_intraday=True, include_macro=True):
+    """
+    Raccoglie in parallelo dati intraday, notizie e dati macroeconomici.
+
+    Args:
+        symbols (list): Simboli azionari
+        collector (AsyncCollector, optional): Collector già aperto; se None ne viene creato uno
+        include_news, include_intraday, include_macro (bool): Tipi di dati da raccogliere
+
+    Returns:
+        dict: {"intraday": {simbolo: df}, "news": {simbolo: df}, "macro": {indicatore: df}}
+    """
+    if collector is None:
+        async with AsyncCollector() as collector:
+            return await collect_symbols(symbols, collector, include_news, include_intraday, include_macro)
+
+    async def gather_by_symbol(fetch):
+        results = await asyncio.gather(*[fetch(symbol) for symbol in symbols], return_exceptions=True)
+        collected = {}
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                logger.error(f"❌ Errore per {symbol}: {str(result)}")
+            elif result is not None and not result.empty:
+                collected[symbol] = result
+        return collected
+
+    async def nothing():
+        return {}
+
+    intraday, news, macro = await asyncio.gather(
+        gather_by_symbol(collector.get_stock_data) if include_intraday else nothing(),
+        gather_by_symbol(collector.get_news_sentiment) if include_news else nothing(),
+        collector.get_macroeconomic_data() if include_macro else nothing(),
+    )
+    return {"intraday": intraday, "news": news, "macro": macro}
+
+async def collect_and_save(symbols):
+    """Raccoglie i dati e li salva nel database; il salvataggio gira in un thread per non bloccare il loop."""
+    from scripts.db_utils import save_dataframe_to_db
+
+    start = time.perf_counter()
+    async with AsyncCollector() as collector:
+        results = await collect_symbols(symbols, collector)
+        counts = dict(collector.request_counts)
+
+    saves = []
+    for symbol, df in results["news"].items():
+        saves.append(asyncio.to_thread(save_dataframe_to_db, df, "news_sentiment"))
+    for indicator, df in results["macro"].items():
+        saves.append(asyncio.to_thread(save_dataframe_to_db, df, "macroeconomic_data"))
+    for symbol, df in results["intraday"].items():
+        df.to_csv(f"data/{symbol}_intraday.csv", index=False)
+    await asyncio.gather(*saves)
+
+    logger.info(f"✅ Raccolta asincrona completata in {time.perf_counter() - start:.1f}s, richieste per fornitore: {counts}")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Raccolta dati asincrona")
+    parser.add_argument("--symbols", default=",".join(SYMBOLS), help="Simboli separati da virgola")
+    args = parser.parse_args()
+
+    os.makedirs("data", exist_ok=True)
+    asyncio.run(collect_and_save([s.strip() for s in args.symbols.split(",") if s.strip()]))
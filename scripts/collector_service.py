@@ -19,8 +19,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger('collector_service')
 
-# Importa modulo fetch_data dalla stessa directory
+# Importa modulo fetch_data dalla stessa directory e i kernel degli indicatori dalla radice del progetto
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from model.indicator_kernels import rsi as wilder_rsi, atr as wilder_atr
 try:
     from fetch_data import fetch_data
 except ImportError:
@@ -84,28 +86,18 @@ def collect_data():
         return jsonify({"status": "running", "service": "collector_service"})
 
 def calculate_rsi(prices, window=14):
-    """Calcola il Relative Strength Index (RSI)."""
-    # Calcolo semplificato, sostituisci con la tua implementazione
-    delta = prices.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
-    
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
+    """Calcola il Relative Strength Index (RSI) con lo smoothing di Wilder."""
+    rsi = pd.Series(wilder_rsi(prices.to_numpy(dtype=float), window), index=prices.index)
     return rsi.fillna(50)  # valore default per i primi valori nan
 
 def calculate_atr(data, window=14):
-    """Calcola l'Average True Range (ATR)."""
-    high = data['high']
-    low = data['low']
+    """Calcola l'Average True Range (ATR) di Wilder, normalizzato sul prezzo di chiusura."""
     close = data['close']
-    
-    tr1 = high - low
-    tr2 = abs(high - close.shift())
-    tr3 = abs(low - close.shift())
-    
-    tr = pd.DataFrame({'tr1': tr1, 'tr2': tr2, 'tr3': tr3}).max(axis=1)
-    atr = tr.rolling(window=window).mean() / close
+    atr = pd.Series(
+        wilder_atr(data['high'].to_numpy(dtype=float), data['low'].to_numpy(dtype=float),
+                   close.to_numpy(dtype=float), window),
+        index=data.index
+    ) / close
     return atr.fillna(0.01)  # valore default
 
 def calculate_vwap(data):
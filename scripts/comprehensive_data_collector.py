@@ -9,8 +9,11 @@ import sys
 import time
 import logging
 import pandas as pd
-import requests
 import random
+import argparse
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
@@ -18,7 +21,8 @@ from dotenv import load_dotenv
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 try:
-    from scripts.db_utils import get_db_engine, save_dataframe_to_db
+    from scripts.db_utils import get_db_engine, get_latest_dates, save_dataframe_to_db
+    from scripts.api_utils import get_http_session, HTTP_TIMEOUT
 except ImportError:
     print("❌ Moduli db_utils non trovati. Assicurati di essere nella directory corretta.")
     sys.exit(1)
@@ -42,6 +46,15 @@ os.makedirs("data", exist_ok=True)
 load_dotenv()
 SYMBOLS = os.getenv('SYMBOLS', 'SPY,QQQ,AAPL,MSFT,GOOGL').split(',')
 FRED_API_KEY = os.getenv('FRED_API_KEY', '')  # Opzionale, registrabile gratuitamente
+YAHOO_BATCH_SIZE = int(os.getenv('YAHOO_BATCH_SIZE', '50'))  # Simboli per chiamata yf.download
+
+# yf.download raccoglie i risultati in dizionari globali del modulo (yfinance.shared):
+# due download simultanei nello stesso processo si mescolerebbero i dati
+_YF_DOWNLOAD_LOCK = threading.Lock()
+
+# Raccolta incrementale: scarica solo i giorni successivi all'ultimo record salvato
+INCREMENTAL_MARKET_DATA = os.getenv('INCREMENTAL_MARKET_DATA', 'true').lower() == 'true'
+MARKET_DATA_OVERLAP_DAYS = int(os.getenv('MARKET_DATA_OVERLAP_DAYS', '5'))  # Sovrapposizione per correzioni tardive
 
 # User agent per scraping
 USER_AGENTS = [
@@ -50,35 +63,6 @@ USER_AGENTS = [
     'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.107 Safari/537.36'
 ]
 
-def get_market_data_from_yahoo(symbol, period="2y", interval="1d"):
-    """Ottiene dati di mercato da Yahoo Finance."""
-    try:
-        logger.info(f"Raccolta dati di mercato Yahoo Finance per {symbol}")
-        
-        # Verifica se yfinance è installato
-        try:
-            import yfinance as yf
-        except ImportError:
-            logger.error("yfinance non installato. Installare con: pip install yfinance")
-            return None
-            
-        data = yf.download(symbol, period=period, interval=interval, progress=False)
-        
-        if data.empty:
-            logger.warning(f"Nessun dato trovato per {symbol}")
-            return None
-            
-        # Aggiungi metadata
-        data['symbol'] = symbol
-        data['source'] = 'yahoo_finance'
-        
-        logger.info(f"✅ Raccolti {len(data)} record per {symbol}")
-        return data
-        
-    except Exception as e:
-        logger.error(f"❌ Errore durante la raccolta dati Yahoo Finance per {symbol}: {str(e)}")
-        return None
-
 def get_fundamental_data(symbol):
     """Ottiene dati fondamentali da Yahoo Finance."""
     try:
@@ -150,7 +134,7 @@ def get_news_sentiment(symbol, limit=10):
         }
         
         url = f"https://finance.yahoo.com/quote/{symbol}/news"
-        response = requests.get(url, headers=headers)
+        response = get_http_session("yahoo_scraping").get(url, headers=headers, timeout=HTTP_TIMEOUT)
         
         # Semplice estrazione di notizie (analisi basilare)
         if response.status_code == 200:
@@ -288,6 +272,110 @@ def get_options_data(symbol):
         logger.error(f"❌ Errore durante la raccolta dati opzioni per {symbol}: {str(e)}")
         return None
 
+def split_multi_ticker_download(data, symbols):
+    """
+    Divide il risultato di yf.download multi-ticker (colonne MultiIndex ticker/campo)
+    in un DataFrame per simbolo, scartando le righe senza dati.
+    """
+    frames = {}
+    if data is None or data.empty:
+        return frames
+    
+    if not isinstance(data.columns, pd.MultiIndex):
+        # Download di un solo ticker senza raggruppamento
+        frames[symbols[0]] = data.dropna(how="all")
+        return frames
+    
+    available = set(data.columns.get_level_values(0))
+    for symbol in symbols:
+        if symbol not in available:
+            continue
+        symbol_data = data[symbol].dropna(how="all")
+        if not symbol_data.empty:
+            symbol_data.columns.name = None
+            frames[symbol] = symbol_data
+    return frames
+
+def get_market_data_batch(symbols, period="2y", interval="1d", chunk_size=None, start=None):
+    """
+    Ottiene dati di mercato da Yahoo Finance per più simboli con download multi-ticker.
+    
+    I simboli vengono scaricati a blocchi di chunk_size in un'unica chiamata
+    yf.download per blocco, invece di una chiamata per simbolo.
+    
+    Args:
+        symbols (list): Simboli da scaricare
+        period (str): Periodo yfinance (es. "2y")
+        interval (str): Intervallo yfinance (es. "1d")
+        chunk_size (int, optional): Simboli per chiamata. Default: YAHOO_BATCH_SIZE (50)
+        start (str/datetime, optional): Data di inizio; se indicata, period viene ignorato
+    
+    Returns:
+        dict: simbolo -> DataFrame con colonne OHLCV, symbol e source
+    """
+    chunk_size = chunk_size or YAHOO_BATCH_SIZE
+    
+    try:
+        import yfinance as yf
+    except ImportError:
+        logger.error("yfinance non installato. Installare con: pip install yfinance")
+        return {}
+    
+    results = {}
+    for offset in range(0, len(symbols), chunk_size):
+        chunk = list(symbols[offset:offset + chunk_size])
+        logger.info(f"Raccolta dati di mercato Yahoo Finance per {len(chunk)} simboli ({chunk[0]}...{chunk[-1]})")
+        try:
+            period_args = {"start": start} if start is not None else {"period": period}
+            with _YF_DOWNLOAD_LOCK:
+                data = yf.download(chunk, interval=interval, group_by="ticker",
+                                   threads=True, progress=False, **period_args)
+        except Exception as e:
+            logger.error(f"❌ Errore durante il download multi-ticker {chunk}: {str(e)}")
+            continue
+        
+        frames = split_multi_ticker_download(data, chunk)
+        for symbol, symbol_data in frames.items():
+            # Aggiungi metadata
+            symbol_data = symbol_data.copy()
+            symbol_data['symbol'] = symbol
+            symbol_data['source'] = 'yahoo_finance'
+            results[symbol] = symbol_data
+        
+        missing = [symbol for symbol in chunk if symbol not in frames]
+        if missing:
+            logger.warning(f"Nessun dato trovato per {', '.join(missing)}")
+    
+    logger.info(f"✅ Raccolti dati di mercato per {len(results)}/{len(symbols)} simboli")
+    return results
+
+def plan_incremental_downloads(symbols, watermarks, overlap_days=None):
+    """
+    Raggruppa i simboli per data di inizio del download incrementale.
+    
+    I simboli con un watermark ripartono da (ultima data - overlap_days) così da
+    recuperare eventuali correzioni; quelli senza dati vengono scaricati per intero.
+    
+    Args:
+        symbols (list): Simboli da scaricare
+        watermarks (dict): simbolo -> ultima data salvata (da get_latest_dates)
+        overlap_days (int, optional): Giorni di sovrapposizione. Default: MARKET_DATA_OVERLAP_DAYS
+    
+    Returns:
+        dict: data di inizio (str YYYY-MM-DD, o None per il backfill completo) -> lista di simboli
+    """
+    overlap_days = MARKET_DATA_OVERLAP_DAYS if overlap_days is None else overlap_days
+    
+    groups = {}
+    for symbol in symbols:
+        last_date = watermarks.get(symbol)
+        if last_date is None:
+            start = None
+        else:
+            start = (pd.Timestamp(last_date) - pd.Timedelta(days=overlap_days)).strftime('%Y-%m-%d')
+        groups.setdefault(start, []).append(symbol)
+    return groups
+
 def get_sector_performance():
     """Ottiene dati sulle performance dei settori per analisi qualitativa."""
     try:
@@ -314,27 +402,38 @@ def get_sector_performance():
             "XLRE": "Real Estate"
         }
         
+        # Tutti gli ETF in un'unica chiamata
+        with _YF_DOWNLOAD_LOCK:
+            data = yf.download(list(sector_etfs), period="1mo", interval="1d", group_by="ticker",
+                               threads=True, progress=False)
+        frames = split_multi_ticker_download(data, list(sector_etfs))
+        
         # Ottieni i dati di performance
         performance_data = []
         for etf, sector in sector_etfs.items():
             try:
-                data = yf.download(etf, period="1mo", interval="1d", progress=False)
-                if not data.empty:
-                    # Calcola la performance
-                    first_close = float(data["Close"].iloc[0])
-                    last_close = float(data["Close"].iloc[-1])
-                    perf_1mo = ((last_close / first_close) - 1) * 100
-                    
-                    # Aggiungi alla lista
-                    performance_data.append({
-                        "sector": sector,
-                        "etf": etf,
-                        "performance_1mo": perf_1mo,
-                        "last_price": last_close,
-                        "date": data.index[-1]
-                    })
-                    
-                    time.sleep(0.5)  # Previeni rate limiting
+                etf_data = frames.get(etf)
+                if etf_data is None:
+                    logger.warning(f"Nessun dato trovato per il settore {sector} ({etf})")
+                    continue
+                
+                closes = etf_data["Close"].dropna()
+                if closes.empty:
+                    continue
+                
+                # Calcola la performance
+                first_close = float(closes.iloc[0])
+                last_close = float(closes.iloc[-1])
+                perf_1mo = ((last_close / first_close) - 1) * 100
+                
+                # Aggiungi alla lista
+                performance_data.append({
+                    "sector": sector,
+                    "etf": etf,
+                    "performance_1mo": perf_1mo,
+                    "last_price": last_close,
+                    "date": closes.index[-1]
+                })
             except Exception as e:
                 logger.error(f"❌ Errore per settore {sector}: {str(e)}")
         
@@ -348,59 +447,197 @@ def get_sector_performance():
     except Exception as e:
         logger.error(f"❌ Errore durante la raccolta dati settoriali: {str(e)}")
         return None
-        
-        # ETF che rappresentano diversi settori
-        sector_etfs = {
-            'XLF': 'Financial',
-            'XLK': 'Technology',
-            'XLE': 'Energy',
-            'XLV': 'Healthcare',
-            'XLI': 'Industrial',
-            'XLP': 'Consumer Staples',
-            'XLY': 'Consumer Discretionary',
-            'XLB': 'Materials',
-            'XLU': 'Utilities',
-            'XLRE': 'Real Estate'
-        }
-        
-        # Ottieni i dati di performance
-        performance_data = []
-        for etf, sector in sector_etfs.items():
+
+# Limiti di concorrenza per fonte: (richieste simultanee, pausa min/max dopo ogni richiesta in secondi).
+# I download multi-ticker (yf.download) non sono thread-safe e vanno uno alla volta;
+# le chiamate per ticker (info, opzioni) possono procedere in parallelo
+SOURCE_LIMITS = {
+    "yahoo_download": (1, (0.5, 1.5)),
+    "yahoo": (int(os.getenv('YAHOO_CONCURRENCY', '4')), (0.5, 1.5)),
+    "yahoo_scraping": (int(os.getenv('NEWS_CONCURRENCY', '2')), (1, 3)),
+    "fred": (1, (0, 0)),
+}
+DEFAULT_WORKERS = int(os.getenv('COLLECTOR_WORKERS', '8'))
+
+class SourceLimiter:
+    """Limita le richieste simultanee verso una fonte e applica una pausa dopo ciascuna."""
+    
+    def __init__(self, max_concurrent, delay_range):
+        self._semaphore = threading.BoundedSemaphore(max(1, max_concurrent))
+        self._delay_range = delay_range
+    
+    @contextmanager
+    def slot(self):
+        with self._semaphore:
             try:
-                data = yf.download(etf, period="1mo", interval="1d", progress=False)
-                if not data.empty:
-                    # Calcola la performance
-                    first_close = data['Close'].iloc[0]
-                    last_close = data['Close'].iloc[-1]
-                    perf_1mo = ((last_close / first_close) - 1) * 100
-                    
-                    # Aggiungi alla lista
-                    performance_data.append({
-                        'sector': sector,
-                        'etf': etf,
-                        'performance_1mo': perf_1mo,
-                        'last_price': last_close,
-                        'date': data.index[-1]
-                    })
-                    
-                    time.sleep(0.5)  # Previeni rate limiting
-            except Exception as e:
-                logger.error(f"❌ Errore per settore {sector}: {str(e)}")
-        
-        if performance_data:
-            performance_df = pd.DataFrame(performance_data)
-            logger.info(f"✅ Raccolti dati performance per {len(performance_df)} settori")
-            return performance_df
-        else:
-            return None
-            
+                yield
+            finally:
+                # La pausa avviene tenendo lo slot, così la fonte non riceve raffiche
+                low, high = self._delay_range
+                if high > 0:
+                    time.sleep(random.uniform(low, high))
+
+class StageTimer:
+    """Raccoglie i tempi di esecuzione dei task per ciascuna fase della raccolta."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+    
+    @contextmanager
+    def track(self, stage):
+        start = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except Exception:
+            failed = True
+            raise
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                entry = self._stages.setdefault(stage, {
+                    "tasks": 0, "errors": 0, "busy": 0.0, "first_start": start, "last_end": end
+                })
+                entry["tasks"] += 1
+                entry["errors"] += int(failed)
+                entry["busy"] += end - start
+                entry["first_start"] = min(entry["first_start"], start)
+                entry["last_end"] = max(entry["last_end"], end)
+    
+    def summary(self):
+        """Restituisce un DataFrame con task, errori, tempo di parete e tempo cumulato per fase."""
+        with self._lock:
+            rows = [
+                {
+                    "stage": stage,
+                    "tasks": entry["tasks"],
+                    "errors": entry["errors"],
+                    "wall_s": round(entry["last_end"] - entry["first_start"], 2),
+                    "busy_s": round(entry["busy"], 2),
+                }
+                for stage, entry in self._stages.items()
+            ]
+        return pd.DataFrame(rows, columns=["stage", "tasks", "errors", "wall_s", "busy_s"])
+
+def merge_with_csv(data, csv_path):
+    """
+    Unisce i nuovi dati a quelli già presenti nel CSV (indice per data): le date
+    sovrapposte vengono sostituite dai valori appena scaricati.
+    """
+    if not os.path.exists(csv_path):
+        return data
+    try:
+        existing = pd.read_csv(csv_path, index_col=0, parse_dates=True)
     except Exception as e:
-        logger.error(f"❌ Errore durante la raccolta dati settoriali: {str(e)}")
-        return None
+        logger.warning(f"⚠️ CSV esistente non leggibile, viene sovrascritto: {csv_path} ({str(e)})")
+        return data
+    merged = pd.concat([existing, data])
+    return merged[~merged.index.duplicated(keep="last")].sort_index()
+
+def save_collected_data(data, table_name, csv_path, engine, db_available, description, merge_csv=False):
+    """
+    Salva un DataFrame raccolto nel database (se disponibile) e su file.
+    Con merge_csv il file esistente viene aggiornato invece che sovrascritto;
+    nel database vengono comunque inseriti solo i dati ricevuti.
+    """
+    if db_available:
+        success = save_dataframe_to_db(data, table_name, engine)
+        if success:
+            logger.info(f"✅ {description} salvati nel database")
+    if merge_csv:
+        data = merge_with_csv(data, csv_path)
+    data.to_csv(csv_path)
+
+def collect_market_data(symbols, engine, db_available):
+    """
+    Fase 1: dati di mercato per un blocco di simboli, scaricati con una sola chiamata.
+    Con INCREMENTAL_MARKET_DATA attivo scarica solo la coda mancante rispetto al database.
+    """
+    watermarks = {}
+    if INCREMENTAL_MARKET_DATA and db_available:
+        watermarks = get_latest_dates("stock_daily_prices", symbols, engine)
+    
+    for start, group in plan_incremental_downloads(symbols, watermarks).items():
+        if start is not None:
+            logger.info(f"Raccolta incrementale da {start} per {len(group)} simboli")
+        for symbol, market_data in get_market_data_batch(group, start=start).items():
+            # In modalità incrementale la coda scaricata viene unita al CSV del simbolo
+            save_collected_data(market_data, "stock_daily_prices", f"data/{symbol}_market_data.csv",
+                                engine, db_available, f"Dati di mercato per {symbol}",
+                                merge_csv=start is not None)
+
+def collect_fundamental_data(symbol, engine, db_available):
+    """Fase 2: dati fondamentali per un simbolo."""
+    fundamental_data = get_fundamental_data(symbol)
+    for data_type, data in fundamental_data.items():
+        if data is not None and not data.empty:
+            save_collected_data(data, f"fundamental_{data_type}", f"data/{symbol}_fundamental_{data_type}.csv",
+                                engine, db_available, f"Dati fondamentali {data_type} per {symbol}")
+
+def collect_macroeconomic_data(engine, db_available):
+    """Fase 3: dati macroeconomici."""
+    macro_data = get_macroeconomic_data()
+    for indicator, data in macro_data.items():
+        if data is not None and not data.empty:
+            save_collected_data(data, "macroeconomic_data", f"data/macro_{indicator}.csv",
+                                engine, db_available, f"Dati macroeconomici {indicator}")
+
+def collect_sector_performance(engine, db_available):
+    """Fase 4: performance settoriale (analisi qualitativa)."""
+    sector_performance = get_sector_performance()
+    if sector_performance is not None:
+        save_collected_data(sector_performance, "sector_performance", "data/sector_performance.csv",
+                            engine, db_available, "Dati di performance settoriale")
+
+def collect_news_data(symbol, engine, db_available):
+    """Fase 5: news e sentiment per un simbolo (analisi qualitativa)."""
+    news_data = get_news_sentiment(symbol)
+    if news_data is not None and not news_data.empty:
+        save_collected_data(news_data, "news_sentiment", f"data/{symbol}_news.csv",
+                            engine, db_available, f"Dati news per {symbol}")
+
+def collect_options_data(symbol, engine, db_available):
+    """Fase 6: dati opzioni per un simbolo."""
+    options_data = get_options_data(symbol)
+    if options_data is not None and not options_data.empty:
+        save_collected_data(options_data, "options_data", f"data/{symbol}_options.csv",
+                            engine, db_available, f"Dati opzioni per {symbol}")
+
+def build_collection_tasks():
+    """
+    Elenca i task della raccolta come tuple (fase, fonte, funzione, argomenti).
+    I task di fasi diverse sono indipendenti e possono essere eseguiti in parallelo.
+    """
+    tasks = []
+    for start in range(0, len(SYMBOLS), YAHOO_BATCH_SIZE):
+        tasks.append(("market", "yahoo_download", collect_market_data, (SYMBOLS[start:start + YAHOO_BATCH_SIZE],)))
+    for symbol in SYMBOLS:
+        tasks.append(("fundamentals", "yahoo", collect_fundamental_data, (symbol,)))
+    tasks.append(("macro", "fred", collect_macroeconomic_data, ()))
+    tasks.append(("sector", "yahoo_download", collect_sector_performance, ()))
+    for symbol in SYMBOLS:
+        tasks.append(("news", "yahoo_scraping", collect_news_data, (symbol,)))
+    for symbol in SYMBOLS[:3]:  # Limita ai primi 3 per risparmiare risorse
+        tasks.append(("options", "yahoo", collect_options_data, (symbol,)))
+    return tasks
 
-def process_all_data():
-    """Elabora tutti i tipi di dati per tutti i simboli."""
-    logger.info(f"Inizio raccolta comprensiva di dati per {len(SYMBOLS)} simboli")
+def process_all_data(workers=None):
+    """
+    Elabora tutti i tipi di dati per tutti i simboli.
+    
+    Le fasi vengono eseguite in parallelo su un pool di thread limitato; ogni
+    fonte (Yahoo, scraping news, FRED) ha un proprio limite di richieste simultanee
+    definito in SOURCE_LIMITS, così fonti indipendenti si sovrappongono.
+    
+    Args:
+        workers (int, optional): Numero di thread. Default: COLLECTOR_WORKERS (8).
+    
+    Returns:
+        pandas.DataFrame: Riepilogo dei tempi per fase
+    """
+    workers = workers or DEFAULT_WORKERS
+    logger.info(f"Inizio raccolta comprensiva di dati per {len(SYMBOLS)} simboli con {workers} worker")
     
     # Connessione database
     try:
@@ -413,93 +650,41 @@ def process_all_data():
         db_available = False
         engine = None
     
-    # 1. Dati di mercato
-    for symbol in SYMBOLS:
-        market_data = get_market_data_from_yahoo(symbol)
-        if market_data is not None:
-            # Salva nel database
-            if db_available:
-                success = save_dataframe_to_db(market_data, "stock_daily_prices", engine)
-                if success:
-                    logger.info(f"✅ Dati di mercato per {symbol} salvati nel database")
-            
-            # Salva su file
-            market_data.to_csv(f"data/{symbol}_market_data.csv")
-            time.sleep(random.uniform(1, 3))  # Previeni rate limiting
+    limiters = {source: SourceLimiter(*limits) for source, limits in SOURCE_LIMITS.items()}
+    timer = StageTimer()
     
-    # 2. Dati fondamentali
-    for symbol in SYMBOLS:
-        fundamental_data = get_fundamental_data(symbol)
-        for data_type, data in fundamental_data.items():
-            if data is not None and not data.empty:
-                # Salva nel database
-                if db_available:
-                    table_name = f"fundamental_{data_type}"
-                    success = save_dataframe_to_db(data, table_name, engine)
-                    if success:
-                        logger.info(f"✅ Dati fondamentali {data_type} per {symbol} salvati nel database")
-                
-                # Salva su file
-                data.to_csv(f"data/{symbol}_fundamental_{data_type}.csv")
-        
-        time.sleep(random.uniform(2, 5))  # Previeni rate limiting
+    def run_task(stage, source, func, args):
+        with limiters[source].slot(), timer.track(stage):
+            func(*args, engine, db_available)
     
-    # 3. Dati macroeconomici
-    macro_data = get_macroeconomic_data()
-    for indicator, data in macro_data.items():
-        if data is not None and not data.empty:
-            # Salva nel database
-            if db_available:
-                success = save_dataframe_to_db(data, "macroeconomic_data", engine)
-                if success:
-                    logger.info(f"✅ Dati macroeconomici {indicator} salvati nel database")
-            
-            # Salva su file
-            data.to_csv(f"data/macro_{indicator}.csv")
-    
-    # 4. Performance settoriale (analisi qualitativa)
-    sector_performance = get_sector_performance()
-    if sector_performance is not None:
-        # Salva nel database
-        if db_available:
-            success = save_dataframe_to_db(sector_performance, "sector_performance", engine)
-            if success:
-                logger.info("✅ Dati di performance settoriale salvati nel database")
-        
-        # Salva su file
-        sector_performance.to_csv("data/sector_performance.csv")
-    
-    # 5. News e sentiment (analisi qualitativa)
-    for symbol in SYMBOLS:
-        news_data = get_news_sentiment(symbol)
-        if news_data is not None and not news_data.empty:
-            # Salva nel database
-            if db_available:
-                success = save_dataframe_to_db(news_data, "news_sentiment", engine)
-                if success:
-                    logger.info(f"✅ Dati news per {symbol} salvati nel database")
-            
-            # Salva su file
-            news_data.to_csv(f"data/{symbol}_news.csv")
-            
-        time.sleep(random.uniform(2, 5))  # Previeni rate limiting
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="collector") as executor:
+        futures = {
+            executor.submit(run_task, stage, source, func, args): (stage, args)
+            for stage, source, func, args in build_collection_tasks()
+        }
+        for future in as_completed(futures):
+            stage, args = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"❌ Errore nella fase {stage} {args}: {str(e)}")
     
-    # 6. Dati opzioni (solo per simboli principali)
-    for symbol in SYMBOLS[:3]:  # Limita ai primi 3 per risparmiare risorse
-        options_data = get_options_data(symbol)
-        if options_data is not None and not options_data.empty:
-            # Salva nel database
-            if db_available:
-                success = save_dataframe_to_db(options_data, "options_data", engine)
-                if success:
-                    logger.info(f"✅ Dati opzioni per {symbol} salvati nel database")
-            
-            # Salva su file
-            options_data.to_csv(f"data/{symbol}_options.csv")
-            
-        time.sleep(random.uniform(2, 5))  # Previeni rate limiting
+    summary = timer.summary()
+    logger.info(f"⏱️ Tempi per fase (totale {time.perf_counter() - start:.1f}s):\n{summary.to_string(index=False)}")
+    return summary
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Raccolta dati finanziari completi")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="Numero di thread per la raccolta parallela (default: %(default)s)")
+    parser.add_argument("--full-refresh", action="store_true",
+                        help="Disattiva la raccolta incrementale e riscarica l'intero periodo")
+    args = parser.parse_args()
+    
+    if args.full_refresh:
+        INCREMENTAL_MARKET_DATA = False
+    
     logger.info("🚀 Avvio raccolta dati comprensiva")
     
     # Installa dipendenze mancanti, se necessario
@@ -516,6 +701,6 @@ if __name__ == "__main__":
         logger.info("✅ Dipendenze installate")
     
     # Esegui la raccolta dati
-    process_all_data()
+    process_all_data(workers=args.workers)
     
     logger.info("✅ Raccolta dati comprensiva completata")
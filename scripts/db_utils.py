@@ -2,12 +2,19 @@
 Utility per la connessione e gestione del database PostgreSQL.
 """
 
+import io
 import os
+import time
+import uuid
 import logging
+import threading
 import pandas as pd
 import numpy as np
 from sqlalchemy import create_engine, Table, Column, Integer, Float, String, DateTime, MetaData, text
-from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+from sqlalchemy import table as sql_table, column as sql_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 from contextlib import contextmanager
@@ -22,9 +29,90 @@ logger = logging.getLogger('db_utils')
 # Carica variabili d'ambiente
 load_dotenv()
 
+# Parametri del connection pool condiviso
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
+
+# Numero di righe per ciascun INSERT multi-VALUES nella modalità bulk
+BULK_INSERT_BATCH_SIZE = int(os.getenv('DB_BULK_INSERT_BATCH_SIZE', '1000'))
+
+# Backend di scrittura disponibili per le tabelle gestite con to_sql
+INGESTION_METHODS = ("to_sql", "copy")
+
+# Tabelle per cui usare COPY FROM STDIN (es. "sector_performance,options_data" oppure "*")
+COPY_TABLES = [t.strip() for t in os.getenv('DB_COPY_TABLES', '').split(',') if t.strip()]
+
+# Colonna temporale usata come watermark per la raccolta incrementale
+WATERMARK_COLUMNS = {
+    "stock_daily_prices": "date",
+    "intraday_data": "datetime",
+}
+
+# Colonne della tabella stock_daily_prices scritte dal collector
+MARKET_DATA_COLUMNS = ["date", "open", "high", "low", "close", "volume", "symbol", "source", "created_at"]
+
+class PoolStats:
+    """Statistiche di attesa per il checkout delle connessioni da un pool."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+    
+    def record(self, wait, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+    
+    def snapshot(self):
+        with self._lock:
+            avg_wait = self.total_wait / self.checkouts if self.checkouts else 0.0
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": avg_wait * 1000,
+                "max_wait_ms": self.max_wait * 1000,
+            }
+
+def _make_timed_pool_class(stats):
+    """
+    Crea una sottoclasse di QueuePool che misura il tempo di attesa del checkout.
+    La classe è legata alle statistiche così sopravvive a dispose()/recreate().
+    """
+    class TimedQueuePool(QueuePool):
+        wait_stats = stats
+        
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except PoolTimeoutError:
+                stats.record(time.perf_counter() - start, timed_out=True)
+                raise
+            stats.record(time.perf_counter() - start)
+            return connection
+    
+    return TimedQueuePool
+
+# Registro degli engine condivisi, uno per stringa di connessione
+_engines = {}
+_engines_lock = threading.Lock()
+
 def get_db_engine():
     """
-    Crea e restituisce un engine SQLAlchemy per la connessione al database PostgreSQL.
+    Restituisce l'engine SQLAlchemy condiviso per il database PostgreSQL.
+    L'engine viene creato alla prima chiamata e riutilizzato dal processo,
+    con pool configurabile tramite DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE e DB_POOL_PRE_PING.
     Se le credenziali non sono configurate, restituisce None.
     """
     db_user = os.getenv('DB_USER')
@@ -38,16 +126,72 @@ def get_db_engine():
         logger.warning("⚠️ Configurazione database incompleta. Modalità file locale attivata.")
         return None
 
-    # Se tutte le credenziali sono presenti, crea la connessione
     connection_string = f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
-    logger.info(f"Creazione engine per database {db_name} su {db_host}")
     
-    try:
-        engine = create_engine(connection_string)
+    engine = _engines.get(connection_string)
+    if engine is not None:
+        return engine
+    
+    with _engines_lock:
+        engine = _engines.get(connection_string)
+        if engine is not None:
+            return engine
+        
+        # Se tutte le credenziali sono presenti, crea la connessione
+        logger.info(f"Creazione engine per database {db_name} su {db_host} "
+                    f"(pool_size={DB_POOL_SIZE}, max_overflow={DB_MAX_OVERFLOW})")
+        try:
+            engine = create_engine(
+                connection_string,
+                poolclass=_make_timed_pool_class(PoolStats()),
+                pool_size=DB_POOL_SIZE,
+                max_overflow=DB_MAX_OVERFLOW,
+                pool_timeout=DB_POOL_TIMEOUT,
+                pool_recycle=DB_POOL_RECYCLE,
+                pool_pre_ping=DB_POOL_PRE_PING,
+            )
+        except Exception as e:
+            logger.error(f"Errore nella creazione dell'engine: {str(e)}")
+            return None
+        
+        _engines[connection_string] = engine
         return engine
-    except Exception as e:
-        logger.error(f"Errore nella creazione dell'engine: {str(e)}")
-        return None
+
+def get_pool_status(engine=None):
+    """
+    Restituisce lo stato del pool di connessioni dell'engine condiviso.
+    
+    Args:
+        engine (sqlalchemy.engine.Engine, optional): Engine da ispezionare.
+            Se None, viene usato quello restituito da get_db_engine().
+    
+    Returns:
+        dict: Dimensione del pool, connessioni in uso, overflow e tempi di attesa,
+            oppure None se il database non è configurato
+    """
+    if engine is None:
+        engine = get_db_engine()
+        if engine is None:
+            return None
+    
+    pool = engine.pool
+    status = {
+        "pool_size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+    }
+    stats = getattr(pool, "wait_stats", None)
+    if stats is not None:
+        status.update(stats.snapshot())
+    return status
+
+def dispose_db_engines():
+    """Chiude tutte le connessioni degli engine condivisi (es. allo shutdown)."""
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
 
 @contextmanager
 def get_db_connection():
@@ -231,8 +375,256 @@ def clean_sector_performance_data(df):
     
     return result_df
 
-def handle_table_specific_data(df_copy, table_name, engine):
-    """Gestisce le operazioni specifiche per ciascuna tabella."""
+def insert_market_data_per_record(connection, table_name, prepared_df):
+    """
+    Inserisce i dati di mercato un record alla volta, ignorando i duplicati.
+    
+    Args:
+        connection: Connessione SQLAlchemy con transazione aperta
+        table_name (str): Nome della tabella di destinazione
+        prepared_df (pandas.DataFrame): Dati preparati con prepare_market_data_for_db
+    
+    Returns:
+        tuple: (righe inserite, righe ignorate)
+    """
+    # Costruisci una query che ignora i duplicati
+    insert_stmt = f"""
+    INSERT INTO {table_name} (date, open, high, low, close, volume, symbol, source, created_at)
+    VALUES (:date, :open, :high, :low, :close, :volume, :symbol, :source, :created_at)
+    ON CONFLICT (date, symbol) DO NOTHING
+    """
+    
+    # Converti DataFrame in lista di dict per l'inserimento (NaN -> None, come NULL)
+    records = prepared_df.astype(object).where(prepared_df.notna(), None).to_dict('records')
+    
+    # Inserisci un record alla volta per gestire meglio gli errori. Ogni record ha il
+    # proprio savepoint: in PostgreSQL un errore annullerebbe altrimenti l'intera
+    # transazione, compresi i record e i batch già inseriti
+    inserted = 0
+    skipped = 0
+    for record in records:
+        savepoint = connection.begin_nested()
+        try:
+            result = connection.execute(text(insert_stmt), record)
+            savepoint.commit()
+            if result.rowcount:
+                inserted += 1
+            else:
+                skipped += 1
+        except Exception as e:
+            savepoint.rollback()
+            # Logga l'errore ma continua con gli altri record
+            skipped += 1
+            logger.warning(f"Non è stato possibile inserire il record {record['date']}, {record['symbol']}: {str(e)}")
+    
+    return inserted, skipped
+
+def insert_market_data_bulk(connection, table_name, prepared_df, batch_size=None):
+    """
+    Inserisce i dati di mercato in batch con INSERT multi-VALUES e ON CONFLICT DO NOTHING.
+    
+    Ogni batch viene eseguito in un savepoint: se fallisce, le sue righe vengono
+    reinserite una alla volta così un record non valido non scarta l'intero batch.
+    
+    Args:
+        connection: Connessione SQLAlchemy con transazione aperta
+        table_name (str): Nome della tabella di destinazione
+        prepared_df (pandas.DataFrame): Dati preparati con prepare_market_data_for_db
+        batch_size (int, optional): Righe per statement. Default: DB_BULK_INSERT_BATCH_SIZE
+    
+    Returns:
+        tuple: (righe inserite, righe ignorate)
+    """
+    batch_size = batch_size or BULK_INSERT_BATCH_SIZE
+    
+    target = sql_table(table_name, *[sql_column(col) for col in MARKET_DATA_COLUMNS])
+    columns = [col for col in MARKET_DATA_COLUMNS if col in prepared_df.columns]
+    
+    # NaN non è accettato da psycopg2 come NULL: convertiamo in None una sola volta
+    records_df = prepared_df[columns].astype(object).where(prepared_df[columns].notna(), None)
+    records = records_df.to_dict('records')
+    
+    inserted = 0
+    skipped = 0
+    for start in range(0, len(records), batch_size):
+        batch = records[start:start + batch_size]
+        stmt = (
+            pg_insert(target)
+            .values(batch)
+            .on_conflict_do_nothing(index_elements=["date", "symbol"])
+            .returning(target.c.symbol)
+        )
+        
+        savepoint = connection.begin_nested()
+        try:
+            batch_inserted = len(connection.execute(stmt).fetchall())
+            savepoint.commit()
+        except Exception as e:
+            savepoint.rollback()
+            logger.warning(f"⚠️ Batch di {len(batch)} righe fallito, inserimento record per record: {str(e)}")
+            batch_inserted, batch_skipped = insert_market_data_per_record(
+                connection, table_name, pd.DataFrame(batch, columns=columns)
+            )
+            inserted += batch_inserted
+            skipped += batch_skipped
+            continue
+        
+        inserted += batch_inserted
+        skipped += len(batch) - batch_inserted
+    
+    return inserted, skipped
+
+def _is_missing(value):
+    """True per None, NaN, NaT e pd.NA; liste e altri contenitori non sono mai nulli."""
+    if value is None:
+        return True
+    if isinstance(value, float):
+        return value != value
+    if isinstance(value, (str, int)):
+        return False
+    missing = pd.isna(value)
+    return isinstance(missing, (bool, np.bool_)) and bool(missing)
+
+def flatten_fundamental_info(df):
+    """
+    Appiattisce i dati di Ticker.info in formato lungo symbol, key, value.
+    
+    Le celle vengono lette in un'unica conversione a liste Python (senza
+    costruire una Series per riga come iterrows); i dizionari (anche sottoclassi)
+    vengono espansi in chiavi "colonna.chiave", le liste convertite in stringa e
+    i valori nulli scartati. Il DataFrame di output viene costruito una sola volta
+    per colonne e created_at è lo stesso per tutte le righe.
+    
+    Args:
+        df (pandas.DataFrame): Una riga per simbolo, una colonna per chiave di info
+    
+    Returns:
+        pandas.DataFrame: Colonne symbol, key, value, created_at
+    """
+    output_columns = ["symbol", "key", "value", "created_at"]
+    value_cols = [col for col in df.columns if col not in ("symbol", "created_at")]
+    if df.empty or not value_cols:
+        return pd.DataFrame(columns=output_columns)
+    
+    symbols = df["symbol"].tolist() if "symbol" in df.columns else ["UNKNOWN"] * len(df)
+    # Intero frame letto una volta (selezionare le colonne copierebbe ogni blocco)
+    positions = [i for i, col in enumerate(df.columns) if col not in ("symbol", "created_at")]
+    rows = []
+    for symbol, cells in zip(symbols, df.to_numpy(dtype=object).tolist()):
+        for col, val in zip(value_cols, [cells[i] for i in positions]):
+            if isinstance(val, dict):
+                rows.extend((symbol, f"{col}.{k}", str(v)) for k, v in val.items() if not _is_missing(v))
+            elif isinstance(val, list) or not _is_missing(val):
+                rows.append((symbol, col, str(val)))
+    
+    if not rows:
+        return pd.DataFrame(columns=output_columns)
+    flat_symbols, keys, values = zip(*rows)
+    return pd.DataFrame({"symbol": flat_symbols, "key": keys, "value": values, "created_at": datetime.now()})
+
+def get_ingestion_method(table_name, ingestion_method=None):
+    """
+    Determina il backend di scrittura per una tabella.
+    
+    Args:
+        table_name (str): Nome della tabella
+        ingestion_method (str, optional): "to_sql" o "copy". Se None, viene usato
+            "copy" per le tabelle elencate in DB_COPY_TABLES e "to_sql" per le altre.
+    
+    Returns:
+        str: Metodo di scrittura da usare
+    """
+    if ingestion_method is None:
+        if "*" in COPY_TABLES or table_name in COPY_TABLES:
+            return "copy"
+        return "to_sql"
+    
+    if ingestion_method not in INGESTION_METHODS:
+        raise ValueError(f"Metodo di scrittura non supportato: {ingestion_method}. Valori ammessi: {INGESTION_METHODS}")
+    return ingestion_method
+
+def copy_dataframe_to_db(df, table_name, engine, conflict_columns=None):
+    """
+    Scrive un DataFrame con COPY FROM STDIN passando da una tabella di staging.
+    
+    Il DataFrame viene serializzato in un buffer CSV in memoria, caricato con COPY
+    in una tabella temporanea con la stessa struttura della destinazione e infine
+    unito alla tabella di destinazione con INSERT ... SELECT ... ON CONFLICT DO NOTHING.
+    
+    Args:
+        df (pandas.DataFrame): Dati da scrivere (le colonne devono esistere nella tabella)
+        table_name (str): Nome della tabella di destinazione
+        engine (sqlalchemy.engine.Engine): Engine SQLAlchemy PostgreSQL
+        conflict_columns (list, optional): Colonne del vincolo UNIQUE da usare per
+            ignorare i duplicati. Se None, viene ignorato qualsiasi conflitto.
+    
+    Returns:
+        tuple: (righe inserite, righe ignorate)
+    """
+    if df.empty:
+        return 0, 0
+    
+    columns = ", ".join(f'"{col}"' for col in df.columns)
+    staging_table = f"staging_{table_name}_{uuid.uuid4().hex[:8]}"
+    conflict_target = f"({', '.join(conflict_columns)}) " if conflict_columns else ""
+    
+    # Buffer CSV in memoria: stringa vuota non quotata = NULL per COPY
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False, header=False, na_rep="")
+    buffer.seek(0)
+    
+    raw_connection = engine.raw_connection()
+    try:
+        cursor = raw_connection.cursor()
+        try:
+            cursor.execute(
+                f'CREATE TEMP TABLE "{staging_table}" (LIKE "{table_name}" INCLUDING DEFAULTS) ON COMMIT DROP'
+            )
+            cursor.copy_expert(
+                f'COPY "{staging_table}" ({columns}) FROM STDIN WITH (FORMAT csv)',
+                buffer
+            )
+            cursor.execute(
+                f'INSERT INTO "{table_name}" ({columns}) '
+                f'SELECT {columns} FROM "{staging_table}" '
+                f'ON CONFLICT {conflict_target}DO NOTHING'
+            )
+            inserted = cursor.rowcount
+        finally:
+            cursor.close()
+        raw_connection.commit()
+    except Exception:
+        raw_connection.rollback()
+        raise
+    finally:
+        raw_connection.close()
+    
+    return inserted, len(df) - inserted
+
+def write_dataframe(df, table_name, engine, ingestion_method="to_sql"):
+    """
+    Scrive un DataFrame in append con il backend richiesto.
+    
+    Returns:
+        int: Numero di righe inserite
+    """
+    if ingestion_method == "copy":
+        inserted, skipped = copy_dataframe_to_db(df, table_name, engine)
+        if skipped:
+            logger.info(f"{skipped} righe duplicate ignorate nella tabella {table_name}")
+        return inserted
+    
+    df.to_sql(table_name, con=engine, if_exists='append', index=False)
+    return len(df)
+
+def handle_table_specific_data(df_copy, table_name, engine, bulk_insert=True, ingestion_method="to_sql"):
+    """
+    Gestisce le operazioni specifiche per ciascuna tabella.
+    
+    Se bulk_insert è True i dati di mercato vengono inseriti in batch,
+    altrimenti un record alla volta. Con ingestion_method="copy" tutte le
+    tabelle, dati di mercato inclusi, vengono scritte con COPY FROM STDIN.
+    """
     
     # Gestione speciale per dati di mercato
     if table_name == 'stock_daily_prices':
@@ -253,34 +645,26 @@ def handle_table_specific_data(df_copy, table_name, engine):
             # Prepara i dati
             prepared_df = prepare_market_data_for_db(df_copy, symbol)
             
+            if ingestion_method == "copy":
+                inserted, skipped = copy_dataframe_to_db(
+                    prepared_df, table_name, engine, conflict_columns=["date", "symbol"]
+                )
+                logger.info(f"✅ {inserted} righe salvate nella tabella {table_name} ({skipped} duplicati ignorati)")
+                return True
+            
             # Salva nel database con gestione dei duplicati
             # Utilizziamo l'approccio "on_conflict_do_nothing" per saltare i record duplicati
             with engine.connect() as connection:
                 # Inserisce i dati ignorando i duplicati
                 transaction = connection.begin()
                 try:
-                    # Costruisci una query che ignora i duplicati
-                    insert_stmt = f"""
-                    INSERT INTO {table_name} (date, open, high, low, close, volume, symbol, source, created_at)
-                    VALUES (:date, :open, :high, :low, :close, :volume, :symbol, :source, :created_at)
-                    ON CONFLICT (date, symbol) DO NOTHING
-                    """
-                    
-                    # Converti DataFrame in lista di dict per l'inserimento
-                    records = prepared_df.to_dict('records')
-                    
-                    # Inserisci un record alla volta per gestire meglio gli errori
-                    inserted = 0
-                    for record in records:
-                        try:
-                            connection.execute(text(insert_stmt), record)
-                            inserted += 1
-                        except Exception as e:
-                            # Logga l'errore ma continua con gli altri record
-                            logger.warning(f"Non è stato possibile inserire il record {record['date']}, {record['symbol']}: {str(e)}")
+                    if bulk_insert:
+                        inserted, skipped = insert_market_data_bulk(connection, table_name, prepared_df)
+                    else:
+                        inserted, skipped = insert_market_data_per_record(connection, table_name, prepared_df)
                     
                     transaction.commit()
-                    logger.info(f"✅ {inserted} righe salvate nella tabella {table_name} (ignorati duplicati)")
+                    logger.info(f"✅ {inserted} righe salvate nella tabella {table_name} ({skipped} duplicati ignorati)")
                     return True
                 except Exception as e:
                     transaction.rollback()
@@ -297,8 +681,8 @@ def handle_table_specific_data(df_copy, table_name, engine):
             cleaned_df = clean_sector_performance_data(df_copy)
             
             # Salva nel database
-            cleaned_df.to_sql(table_name, con=engine, if_exists='append', index=False)
-            logger.info(f"✅ {len(cleaned_df)} righe salvate nella tabella {table_name}")
+            inserted = write_dataframe(cleaned_df, table_name, engine, ingestion_method)
+            logger.info(f"✅ {inserted} righe salvate nella tabella {table_name}")
             return True
         except Exception as e:
             logger.error(f"❌ Errore durante il salvataggio dei dati settoriali: {str(e)}")
@@ -307,58 +691,14 @@ def handle_table_specific_data(df_copy, table_name, engine):
     # Gestione speciale per dati fondamentali info
     elif table_name == 'fundamental_info':
         # Gestisci il caso speciale dei dati fondamentali info
-        rows = []
         try:
-            # Determina il simbolo
-            if "symbol" in df_copy.columns:
-                symbol = df_copy["symbol"].iloc[0]
-            else:
-                symbol = "UNKNOWN"
-            
             # Appiattisci tutti i dati in coppie chiave-valore
-            for _, row in df_copy.iterrows():
-                # Gestisci lista di dizionari o dizionario singolo
-                for col in row.index:
-                    val = row[col]
-                    # Salta symbol e created_at
-                    if col in ["symbol", "created_at"]:
-                        continue
-                        
-                    # Gestisci dizionari e liste annidati
-                    if isinstance(val, dict):
-                        # Appiattisci il dizionario
-                        for k, v in val.items():
-                            if v is not None and not pd.isna(v):
-                                rows.append({
-                                    "symbol": symbol,
-                                    "key": f"{col}.{k}",
-                                    "value": str(v),
-                                    "created_at": datetime.now()
-                                })
-                    elif isinstance(val, list):
-                        # Converti lista in stringa JSON
-                        rows.append({
-                            "symbol": symbol,
-                            "key": col,
-                            "value": str(val),
-                            "created_at": datetime.now()
-                        })
-                    else:
-                        # Valore semplice
-                        if val is not None and not pd.isna(val):
-                            rows.append({
-                                "symbol": symbol,
-                                "key": col,
-                                "value": str(val),
-                                "created_at": datetime.now()
-                            })
+            info_df = flatten_fundamental_info(df_copy)
             
-            if rows:
-                # Crea DataFrame con le righe appiattite
-                info_df = pd.DataFrame(rows)
+            if not info_df.empty:
                 # Salva nel database
-                info_df.to_sql(table_name, con=engine, if_exists="append", index=False)
-                logger.info(f"✅ {len(info_df)} righe salvate nella tabella {table_name}")
+                inserted = write_dataframe(info_df, table_name, engine, ingestion_method)
+                logger.info(f"✅ {inserted} righe salvate nella tabella {table_name}")
                 return True
             else:
                 logger.warning(f"⚠️ Nessun dato valido da salvare nella tabella {table_name}")
@@ -397,32 +737,36 @@ def handle_table_specific_data(df_copy, table_name, engine):
                     melted_df['created_at'] = datetime.now()
                     
                     if not melted_df.empty:
-                        melted_df.to_sql(table_name, con=engine, if_exists='append', index=False)
-                        logger.info(f"✅ {len(melted_df)} righe salvate nella tabella {table_name}")
+                        inserted = write_dataframe(melted_df, table_name, engine, ingestion_method)
+                        logger.info(f"✅ {inserted} righe salvate nella tabella {table_name}")
                         return True
                 except Exception as e:
                     logger.error(f"❌ Errore durante la trasformazione dei dati fondamentali: {str(e)}")
             else:
                 # Già in formato corretto
-                df_copy.to_sql(table_name, con=engine, if_exists='append', index=False)
-                logger.info(f"✅ {len(df_copy)} righe salvate nella tabella {table_name}")
+                inserted = write_dataframe(df_copy, table_name, engine, ingestion_method)
+                logger.info(f"✅ {inserted} righe salvate nella tabella {table_name}")
                 return True
         return False
     
     # Gestione generica per tutte le altre tabelle
     else:
-        df_copy.to_sql(table_name, con=engine, if_exists='append', index=False)
-        logger.info(f"✅ {len(df_copy)} righe salvate nella tabella {table_name}")
+        inserted = write_dataframe(df_copy, table_name, engine, ingestion_method)
+        logger.info(f"✅ {inserted} righe salvate nella tabella {table_name}")
         return True
 
-def save_dataframe_to_db(df, table_name, engine=None):
+def save_dataframe_to_db(df, table_name, engine=None, bulk_insert=True, ingestion_method=None):
     """
     Salva un DataFrame nel database.
     
     Args:
         df (pandas.DataFrame): DataFrame con i dati da salvare
         table_name (str): Nome della tabella nel database
-        engine (sqlalchemy.engine.Engine, optional): Engine SQLAlchemy. Se None, ne viene creato uno nuovo.
+        engine (sqlalchemy.engine.Engine, optional): Engine SQLAlchemy. Se None, viene usato l'engine condiviso.
+        bulk_insert (bool): Se True, i dati di mercato sono inseriti in batch multi-VALUES
+            invece che un record alla volta.
+        ingestion_method (str, optional): Backend di scrittura ("to_sql" o "copy").
+            Se None, viene scelto in base a DB_COPY_TABLES.
     
     Returns:
         bool: True se il salvataggio è avvenuto con successo, False altrimenti
@@ -434,12 +778,10 @@ def save_dataframe_to_db(df, table_name, engine=None):
     # Crea una copia del dataframe per evitare modifiche all'originale
     df_copy = df.copy()
     
-    # Se non viene fornito un engine, ne crea uno nuovo
-    close_engine = False
+    # Se non viene fornito un engine, usa quello condiviso
     if engine is None:
         try:
             engine = get_db_engine()
-            close_engine = True
             if engine is None:
                 logger.info(f"⚠️ Database non disponibile. Salvataggio solo su file.")
                 # Assicurati che la directory data esista
@@ -458,15 +800,53 @@ def save_dataframe_to_db(df, table_name, engine=None):
         normalized_df = normalize_dataframe_for_db(df_copy)
         
         # Gestione specifica della tabella
-        return handle_table_specific_data(normalized_df, table_name, engine)
+        return handle_table_specific_data(
+            normalized_df, table_name, engine,
+            bulk_insert=bulk_insert,
+            ingestion_method=get_ingestion_method(table_name, ingestion_method)
+        )
         
     except Exception as e:
         logger.error(f"❌ Errore durante il salvataggio dei dati: {str(e)}")
         return False
-        
-    finally:
-        if close_engine and engine:
-            engine.dispose()
+
+def get_latest_dates(table_name, symbols, engine=None):
+    """
+    Restituisce l'ultima data presente nel database per ciascun simbolo.
+    
+    Args:
+        table_name (str): Tabella con watermark (stock_daily_prices o intraday_data)
+        symbols (list): Simboli da verificare
+        engine (sqlalchemy.engine.Engine, optional): Engine SQLAlchemy. Se None, viene usato l'engine condiviso.
+    
+    Returns:
+        dict: simbolo -> datetime dell'ultimo record; i simboli senza dati non sono presenti.
+            Dizionario vuoto se il database non è disponibile.
+    """
+    if table_name not in WATERMARK_COLUMNS:
+        raise ValueError(f"Tabella senza watermark configurato: {table_name}")
+    
+    if engine is None:
+        engine = get_db_engine()
+        if engine is None:
+            return {}
+    
+    date_col = WATERMARK_COLUMNS[table_name]
+    query = text(f"""
+        SELECT symbol, MAX({date_col}) AS last_date
+        FROM {table_name}
+        WHERE symbol = ANY(:symbols)
+        GROUP BY symbol
+    """)
+    
+    try:
+        with engine.connect() as connection:
+            rows = connection.execute(query, {"symbols": list(symbols)}).fetchall()
+    except Exception as e:
+        logger.error(f"❌ Errore durante la lettura dei watermark da {table_name}: {str(e)}")
+        return {}
+    
+    return {row.symbol: row.last_date for row in rows if row.last_date is not None}
 
 def check_db_connection():
     """
@@ -499,6 +879,7 @@ if __name__ == "__main__":
     try:
         if check_db_connection():
             print("✅ Connessione al database stabilita con successo!")
+            print(f"Stato pool: {get_pool_status()}")
         else:
             print("❌ Impossibile connettersi al database o database non configurato.")
     except Exception as e:
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+model_registry.py - Registro versionato del modello servito dall'API.
+
+Un thread in background controlla periodicamente MODEL_PATH (o una directory
+locale che fa le veci del bucket), carica il nuovo booster quando il file cambia
+e lo sostituisce in modo atomico. Le previsioni in corso continuano a usare il
+riferimento al modello che avevano letto, quindi non vengono mai bloccate.
+"""
+
+import os
+import sys
+import hashlib
+import logging
+import threading
+from collections import namedtuple
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from model.booster import load_booster_model, native_model_path, NATIVE_MODEL_EXTENSIONS
+
+logger = logging.getLogger('model_registry')
+
+MODEL_EXTENSIONS = NATIVE_MODEL_EXTENSIONS + (".pkl",)
+
+# Versione attiva: modello, identificativo (nome file + hash del contenuto), origine e orario di caricamento
+ModelVersion = namedtuple("ModelVersion", ["model", "version", "source", "loaded_at"])
+
+def file_version(path):
+    """Identificativo di versione di un file di modello: nome e primi 12 caratteri dello SHA-256."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return f"{os.path.basename(path)}@{digest.hexdigest()[:12]}"
+
+def resolve_model_file(watch_path):
+    """
+    Restituisce il file di modello da servire per il percorso osservato.
+
+    - directory: il file .ubj/.json/.pkl modificato più di recente
+    - file: il booster nativo affiancato se presente, altrimenti il file stesso
+    """
+    if os.path.isdir(watch_path):
+        candidates = [
+            os.path.join(watch_path, name)
+            for name in os.listdir(watch_path)
+            if name.endswith(MODEL_EXTENSIONS)
+        ]
+        return max(candidates, key=os.path.getmtime) if candidates else None
+
+    native_path = native_model_path(watch_path)
+    if os.path.exists(native_path):
+        return native_path
+    return watch_path if os.path.exists(watch_path) else None
+
+class ModelRegistry:
+    """
+    Mantiene la versione attiva del modello e la aggiorna a caldo.
+
+    Args:
+        loader (callable): Funzione che carica un modello da un percorso
+        poll_interval (float): Secondi tra due controlli del percorso osservato
+    """
+
+    def __init__(self, loader=load_booster_model, poll_interval=30.0):
+        self.loader = loader
+        self.poll_interval = poll_interval
+        self._active = None
+        self._signature = None
+        self._load_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.watch_path = None
+        self.reloads = 0
+        self.last_error = None
+
+    def get(self):
+        """Versione attiva (ModelVersion) o None se nessun modello è caricato."""
+        return self._active
+
+    def publish(self, model, version=None, source=None):
+        """Rende attivo un modello già caricato. Lo scambio è un singolo assegnamento atomico."""
+        source = source or getattr(model, "source", None)
+        if version is None:
+            version = file_version(source) if source and os.path.exists(source) else "unknown"
+        self._active = ModelVersion(model, version, source, datetime.now().isoformat())
+        logger.info(f"✅ Modello attivo: {version}")
+        return self._active
+
+    @staticmethod
+    def _file_signature(path):
+        stat = os.stat(path)
+        return (path, stat.st_mtime_ns, stat.st_size)
+
+    def check_for_update(self):
+        """
+        Controlla il percorso osservato e carica il modello se il file è cambiato.
+
+        Returns:
+            bool: True se è stata attivata una nuova versione
+        """
+        if self.watch_path is None:
+            return False
+
+        with self._load_lock:
+            try:
+                path = resolve_model_file(self.watch_path)
+                if path is None:
+                    return False
+
+                signature = self._file_signature(path)
+                if signature == self._signature:
+                    return False
+
+                version = file_version(path)
+                active = self._active
+                if active is not None and active.version == version:
+                    self._signature = signature
+                    return False
+
+                # Il caricamento avviene fuori dal percorso delle richieste
+                logger.info(f"Nuovo modello rilevato in {path}, caricamento...")
+                model = self.loader(path)
+                self.publish(model, version=version, source=path)
+                self._signature = signature
+                self.reloads += 1
+                self.last_error = None
+                return True
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"❌ Errore durante il ricaricamento del modello: {str(e)}")
+                return False
+
+    def _watch_loop(self):
+        while not self._stop.wait(self.poll_interval):
+            self.check_for_update()
+
+    def watch(self, path):
+        """Avvia il thread che osserva un file di modello o una directory."""
+        self.watch_path = path
+        active = self._active
+        if active is not None and active.source:
+            resolved = resolve_model_file(path)
+            if resolved == active.source:
+                self._signature = self._file_signature(resolved)
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch_loop, name="model-registry", daemon=True)
+            self._thread.start()
+            logger.info(f"Ricaricamento a caldo attivo su {path} (ogni {self.poll_interval}s)")
+
+    def stop(self):
+        """Ferma il thread di osservazione."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def status(self):
+        """Informazioni sulla versione attiva per /health."""
+        active = self._active
+        return {
+            "model_version": active.version if active else None,
+            "model_source": active.source if active else None,
+            "loaded_at": active.loaded_at if active else None,
+            "reloads": self.reloads,
+            "watch_path": self.watch_path,
+            "last_reload_error": self.last_error,
+        }
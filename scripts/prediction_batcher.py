@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+prediction_batcher.py - Micro-batching delle richieste di previsione.
+
+Le richieste concorrenti che arrivano entro una finestra di attesa (es. 2 ms) o
+fino a un numero massimo di righe vengono unite in un'unica chiamata al modello;
+i risultati vengono poi restituiti a ciascuna richiesta. Ogni richiesta indica il
+modello con cui va servita: un batch contiene solo richieste per lo stesso modello,
+così dopo un hot reload nessuna richiesta riceve previsioni di un modello diverso.
+"""
+
+import time
+import logging
+import threading
+from collections import deque, Counter
+from concurrent.futures import Future
+
+import numpy as np
+
+logger = logging.getLogger('prediction_batcher')
+
+class PredictionBatcher:
+    """
+    Coda di inferenza con batching dinamico.
+
+    Args:
+        predict_fn (callable): Funzione che riceve una matrice (n, k) e il modello della
+            richiesta e restituisce n previsioni
+        max_batch_rows (int): Righe massime per chiamata al modello
+        max_wait_ms (float): Attesa massima, dal primo elemento in coda, prima di eseguire il batch
+    """
+
+    def __init__(self, predict_fn, max_batch_rows=256, max_wait_ms=2.0):
+        self.predict_fn = predict_fn
+        self.max_batch_rows = max(1, int(max_batch_rows))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+
+        # Metriche
+        self._stats_lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._batches = 0
+        self._requests = 0
+        self._rows = 0
+        self._queue_wait = 0.0
+
+        self._worker = threading.Thread(target=self._run, name="prediction-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, features, model=None):
+        """Accoda una matrice di feature per il modello indicato e restituisce un Future con le sue previsioni."""
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("PredictionBatcher chiuso")
+            self._queue.append((features, future, time.perf_counter(), model))
+            self._condition.notify()
+        return future
+
+    def predict(self, features, model=None, timeout=None):
+        """Previsione sincrona passando dalla coda di batching."""
+        return self.submit(features, model).result(timeout=timeout)
+
+    def _next_batch(self):
+        """Attende il primo elemento, poi raccoglie fino a max_batch_rows o fino alla scadenza."""
+        with self._condition:
+            while not self._queue and not self._closed:
+                self._condition.wait()
+            if not self._queue:
+                return None
+
+            deadline = time.perf_counter() + self.max_wait
+            batch = [self._queue.popleft()]
+            rows = len(batch[0][0])
+            model = batch[0][3]
+            while rows < self.max_batch_rows:
+                if self._queue:
+                    # Una richiesta che non entra nel batch corrente, o destinata a un
+                    # altro modello, aspetta il batch successivo
+                    if rows + len(self._queue[0][0]) > self.max_batch_rows or self._queue[0][3] is not model:
+                        break
+                    item = self._queue.popleft()
+                    batch.append(item)
+                    rows += len(item[0])
+                    continue
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0 or self._closed:
+                    break
+                self._condition.wait(remaining)
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+
+            start = time.perf_counter()
+            matrices = [features for features, _, _, _ in batch]
+            try:
+                predictions = np.asarray(self.predict_fn(
+                    matrices[0] if len(matrices) == 1 else np.vstack(matrices), batch[0][3]
+                ))
+            except Exception as e:
+                for _, future, _, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            offset = 0
+            for features, future, _, _ in batch:
+                future.set_result(predictions[offset:offset + len(features)])
+                offset += len(features)
+
+            with self._stats_lock:
+                self._batches += 1
+                self._requests += len(batch)
+                self._rows += offset
+                self._batch_sizes[len(batch)] += 1
+                self._queue_wait += sum(start - enqueued for _, _, enqueued, _ in batch)
+
+    def metrics(self):
+        """
+        Restituisce le metriche del batching: numero di batch, richieste e righe,
+        distribuzione delle richieste per batch (bucket a potenze di 2) e attesa media in coda.
+        """
+        with self._stats_lock:
+            histogram = Counter()
+            for size, count in self._batch_sizes.items():
+                bucket = 1 << (size - 1).bit_length()
+                histogram[f"<={bucket}"] += count
+            return {
+                "batches": self._batches,
+                "requests": self._requests,
+                "rows": self._rows,
+                "avg_requests_per_batch": self._requests / self._batches if self._batches else 0.0,
+                "avg_rows_per_batch": self._rows / self._batches if self._batches else 0.0,
+                "avg_queue_wait_ms": self._queue_wait / self._requests * 1000 if self._requests else 0.0,
+                "batch_size_histogram": dict(sorted(histogram.items(), key=lambda item: int(item[0][2:]))),
+                "max_batch_rows": self.max_batch_rows,
+                "max_wait_ms": self.max_wait * 1000,
+            }
+
+    def close(self):
+        """Ferma il worker dopo aver servito le richieste già in coda."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._worker.join()
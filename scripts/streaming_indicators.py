@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+streaming_indicators.py - Indicatori tecnici incrementali per simbolo.
+
+Ogni nuova barra aggiorna SMA_50/SMA_200 (somme su buffer circolari), RSI e ATR
+di Wilder e VWAP cumulativo in O(1), senza ricalcolare le finestre sull'intera
+storia. Lo stato può essere salvato e ripristinato (snapshot JSON), così un
+servizio può riprendere dall'ultima barra elaborata.
+
+I valori coincidono, entro la tolleranza numerica, con batch_indicators(), che
+calcola gli stessi indicatori con pandas sull'intera serie. Finché non sono
+state elaborate warmup_bars barre alcuni indicatori valgono NaN (ready è False).
+
+Usato da scripts/symbol_features.py per le feature servite da /predict/<symbol>.
+"""
+
+import os
+import sys
+import json
+import math
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger('streaming_indicators')
+
+SMA_WINDOWS = (50, 200)
+RSI_PERIOD = 14
+ATR_PERIOD = 14
+
+INDICATOR_COLUMNS = ["SMA_50", "SMA_200", "RSI", "ATR", "VWAP"]
+
+class RollingMean:
+    """
+    Media mobile su buffer circolare con somma corrente. A ogni giro completo del
+    buffer la somma viene ricalcolata per evitare l'accumulo di errori di
+    arrotondamento (costo ammortizzato O(1) per barra).
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.buffer = [0.0] * window
+        self.index = 0
+        self.count = 0
+        self.total = 0.0
+
+    def update(self, value):
+        self.total += value - self.buffer[self.index]
+        self.buffer[self.index] = value
+        self.index = (self.index + 1) % self.window
+        self.count = min(self.count + 1, self.window)
+        if self.index == 0:
+            self.total = math.fsum(self.buffer)
+        return self.value
+
+    @property
+    def value(self):
+        return self.total / self.window if self.count == self.window else math.nan
+
+    def state(self):
+        return {"buffer": list(self.buffer), "index": self.index, "count": self.count, "total": self.total}
+
+    def load_state(self, state):
+        self.buffer = [float(value) for value in state["buffer"]]
+        self.index = state["index"]
+        self.count = state["count"]
+        self.total = state["total"]
+
+class WilderAverage:
+    """
+    Media di Wilder: avg += (x - avg) / periodo, inizializzata con il primo valore.
+    Equivale a pandas ewm(alpha=1/periodo, adjust=False, min_periods=periodo).
+    """
+
+    def __init__(self, period):
+        self.period = period
+        self.alpha = 1.0 / period
+        self.average = math.nan
+        self.count = 0
+
+    def update(self, value):
+        if self.count == 0:
+            self.average = value
+        else:
+            self.average += self.alpha * (value - self.average)
+        self.count += 1
+        return self.value
+
+    @property
+    def value(self):
+        return self.average if self.count >= self.period else math.nan
+
+    def state(self):
+        return {"average": self.average, "count": self.count}
+
+    def load_state(self, state):
+        self.average = state["average"]
+        self.count = state["count"]
+
+class StreamingIndicators:
+    """
+    Stato degli indicatori di un singolo simbolo, aggiornato una barra alla volta.
+
+    Args:
+        sma_windows (tuple): Finestre delle medie mobili semplici
+        rsi_period (int): Periodo dell'RSI di Wilder
+        atr_period (int): Periodo dell'ATR di Wilder
+    """
+
+    def __init__(self, sma_windows=SMA_WINDOWS, rsi_period=RSI_PERIOD, atr_period=ATR_PERIOD):
+        self.sma = {window: RollingMean(window) for window in sma_windows}
+        self.avg_gain = WilderAverage(rsi_period)
+        self.avg_loss = WilderAverage(rsi_period)
+        self.atr = WilderAverage(atr_period)
+        self.cum_price_volume = 0.0
+        self.cum_volume = 0.0
+        self.prev_close = None
+        self.last_timestamp = None
+        self.bars = 0
+
+    @property
+    def warmup_bars(self):
+        """Barre necessarie perché tutti gli indicatori siano definiti (l'RSI usa le differenze)."""
+        return max(max(self.sma, default=0), self.avg_gain.period + 1, self.atr.period)
+
+    @property
+    def ready(self):
+        return self.bars >= self.warmup_bars
+
+    def update(self, high, low, close, volume, timestamp=None):
+        """
+        Aggiunge una barra e restituisce gli indicatori aggiornati.
+
+        Returns:
+            dict: SMA_<finestra>, RSI, ATR (non normalizzato) e VWAP
+        """
+        for window in self.sma.values():
+            window.update(close)
+
+        if self.prev_close is None:
+            true_range = high - low
+        else:
+            delta = close - self.prev_close
+            self.avg_gain.update(max(delta, 0.0))
+            self.avg_loss.update(max(-delta, 0.0))
+            true_range = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.atr.update(true_range)
+
+        self.cum_price_volume += (high + low + close) / 3 * volume
+        self.cum_volume += volume
+
+        self.prev_close = close
+        self.last_timestamp = timestamp
+        self.bars += 1
+        return self.values()
+
+    def update_bars(self, bars):
+        """
+        Aggiunge più barre (colonne high/low/close/volume, indice temporale) e
+        restituisce la lista degli indicatori di ciascuna barra.
+        """
+        return [
+            self.update(high, low, close, volume, timestamp)
+            for timestamp, high, low, close, volume in zip(
+                bars.index, bars['high'].to_numpy(float), bars['low'].to_numpy(float),
+                bars['close'].to_numpy(float), bars['volume'].to_numpy(float)
+            )
+        ]
+
+    @property
+    def rsi(self):
+        gain, loss = self.avg_gain.value, self.avg_loss.value
+        if math.isnan(gain) or math.isnan(loss):
+            return math.nan
+        if loss == 0:
+            return 100.0 if gain > 0 else math.nan
+        return 100.0 - 100.0 / (1.0 + gain / loss)
+
+    @property
+    def vwap(self):
+        return self.cum_price_volume / self.cum_volume if self.cum_volume > 0 else math.nan
+
+    def values(self):
+        values = {f"SMA_{window}": average.value for window, average in self.sma.items()}
+        values.update({"RSI": self.rsi, "ATR": self.atr.value, "VWAP": self.vwap})
+        return values
+
+    def features(self):
+        """
+        Vettore float32 per il modello, con SMA e ATR normalizzati sull'ultima
+        chiusura come in scripts/collector_service.py.
+        """
+        values = self.values()
+        close = self.prev_close if self.prev_close else math.nan
+        return np.array([
+            values["SMA_50"] / close,
+            values["SMA_200"] / close,
+            values["RSI"],
+            values["ATR"] / close,
+            values["VWAP"],
+        ], dtype=np.float32)
+
+    def snapshot(self):
+        """Stato serializzabile in JSON."""
+        return {
+            "sma": {str(window): average.state() for window, average in self.sma.items()},
+            "avg_gain": self.avg_gain.state(),
+            "avg_loss": self.avg_loss.state(),
+            "atr": self.atr.state(),
+            "periods": {"rsi": self.avg_gain.period, "atr": self.atr.period},
+            "cum_price_volume": self.cum_price_volume,
+            "cum_volume": self.cum_volume,
+            "prev_close": self.prev_close,
+            "last_timestamp": None if self.last_timestamp is None else str(self.last_timestamp),
+            "bars": self.bars,
+        }
+
+    @classmethod
+    def from_snapshot(cls, state):
+        """Ricostruisce gli indicatori da uno snapshot."""
+        indicators = cls(
+            sma_windows=tuple(int(window) for window in state["sma"]),
+            rsi_period=state["periods"]["rsi"],
+            atr_period=state["periods"]["atr"],
+        )
+        for window, average_state in state["sma"].items():
+            indicators.sma[int(window)].load_state(average_state)
+        indicators.avg_gain.load_state(state["avg_gain"])
+        indicators.avg_loss.load_state(state["avg_loss"])
+        indicators.atr.load_state(state["atr"])
+        indicators.cum_price_volume = state["cum_price_volume"]
+        indicators.cum_volume = state["cum_volume"]
+        indicators.prev_close = state["prev_close"]
+        indicators.last_timestamp = state["last_timestamp"]
+        indicators.bars = state["bars"]
+        return indicators
+
+class StreamingIndicatorEngine:
+    """Insieme degli indicatori incrementali per più simboli."""
+
+    def __init__(self, **indicator_kwargs):
+        self.indicator_kwargs = indicator_kwargs
+        self.symbols = {}
+
+    def get(self, symbol):
+        indicators = self.symbols.get(symbol)
+        if indicators is None:
+            indicators = self.symbols[symbol] = StreamingIndicators(**self.indicator_kwargs)
+        return indicators
+
+    def update(self, symbol, high, low, close, volume, timestamp=None):
+        """Aggiorna gli indicatori di un simbolo con una nuova barra."""
+        return self.get(symbol).update(high, low, close, volume, timestamp)
+
+    def update_frame(self, symbol, bars):
+        """
+        Aggiorna un simbolo con più barre (colonne high/low/close/volume) e
+        restituisce un DataFrame con gli indicatori di ciascuna barra.
+        """
+        return pd.DataFrame(self.get(symbol).update_bars(bars), index=bars.index)
+
+    def snapshot(self):
+        return {symbol: indicators.snapshot() for symbol, indicators in self.symbols.items()}
+
+    def restore(self, state):
+        self.symbols = {symbol: StreamingIndicators.from_snapshot(s) for symbol, s in state.items()}
+
+    def save(self, path):
+        """Salva lo snapshot di tutti i simboli in un file JSON (scrittura atomica)."""
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path, **indicator_kwargs):
+        engine = cls(**indicator_kwargs)
+        with open(path) as f:
+            engine.restore(json.load(f))
+        return engine
+
+def batch_indicators(bars, sma_windows=SMA_WINDOWS, rsi_period=RSI_PERIOD, atr_period=ATR_PERIOD):
+    """
+    Calcolo di riferimento con pandas sull'intera serie, con le stesse
+    definizioni degli indicatori incrementali.
+    """
+    high, low, close, volume = bars['high'], bars['low'], bars['close'], bars['volume']
+    result = pd.DataFrame(index=bars.index)
+    for window in sma_windows:
+        result[f"SMA_{window}"] = close.rolling(window).mean()
+
+    delta = close.diff()
+    avg_gain = delta.clip(lower=0).ewm(alpha=1 / rsi_period, adjust=False, min_periods=rsi_period).mean()
+    avg_loss = (-delta.clip(upper=0)).ewm(alpha=1 / rsi_period, adjust=False, min_periods=rsi_period).mean()
+    result["RSI"] = 100 - 100 / (1 + avg_gain / avg_loss)
+
+    previous_close = close.shift()
+    true_range = pd.concat(
+        [high - low, (high - previous_close).abs(), (low - previous_close).abs()], axis=1
+    ).max(axis=1)
+    result["ATR"] = true_range.ewm(alpha=1 / atr_period, adjust=False, min_periods=atr_period).mean()
+
+    typical_price = (high + low + close) / 3
+    result["VWAP"] = (typical_price * volume).cumsum() / volume.cumsum()
+    return result
+
+def compare_with_batch(bars, rtol=1e-9, atol=1e-9):
+    """
+    Confronta gli indicatori incrementali con il calcolo batch, riprendendo a metà
+    serie da uno snapshot per verificare anche il ripristino dello stato.
+
+    Returns:
+        dict: Massimo errore assoluto per indicatore, NaN per gli indicatori
+              ancora in warm-up su tutta la serie (es. SMA_200 con meno di 200 barre)
+    """
+    split = len(bars) // 2
+    engine = StreamingIndicatorEngine()
+    first = engine.update_frame("symbol", bars.iloc[:split])
+    restored = StreamingIndicatorEngine()
+    restored.restore(json.loads(json.dumps(engine.snapshot())))
+    streaming = pd.concat([first, restored.update_frame("symbol", bars.iloc[split:])])
+
+    expected = batch_indicators(bars)
+    errors = {}
+    for column in expected.columns:
+        np.testing.assert_allclose(streaming[column], expected[column], rtol=rtol, atol=atol, err_msg=column)
+        difference = np.abs(streaming[column] - expected[column]).to_numpy()
+        difference = difference[~np.isnan(difference)]
+        errors[column] = float(difference.max()) if difference.size else math.nan
+    return errors
+
+if __name__ == "__main__":
+    # Verifica sui CSV di esempio: python scripts/streaming_indicators.py AAPL_daily.csv
+    paths = sys.argv[1:] or [os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "AAPL_daily.csv")]
+    for path in paths:
+        bars = pd.read_csv(path, index_col=0, parse_dates=True)
+        bars.columns = [str(column).lower() for column in bars.columns]
+        errors = compare_with_batch(bars)
+        print(f"✅ {os.path.basename(path)}: {len(bars)} barre, errore massimo "
+              + ", ".join(f"{name}={error:.2e}" for name, error in errors.items() if not math.isnan(error)))
+        warming_up = [name for name, error in errors.items() if math.isnan(error)]
+        if warming_up:
+            print(f"⚠️ Ancora in warm-up ({len(bars)}/{StreamingIndicators().warmup_bars} barre): {', '.join(warming_up)}")
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+symbol_features.py - Calcolo lato server delle feature di previsione per simbolo.
+
+Le barre vengono lette da stock_daily_prices/intraday_data oppure, senza
+database, da CSV locali come AAPL_daily.csv. Per ogni simbolo la cache mantiene
+lo stato degli indicatori incrementali (scripts/streaming_indicators.py): la
+storia viene letta una sola volta, poi a ogni richiesta vengono lette solo le
+barre successive all'ultima elaborata e ciascuna aggiorna gli indicatori in O(1).
+Il VWAP è quindi cumulato dall'inizio della storia, come in addestramento.
+"""
+
+import os
+import re
+import sys
+import time
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from db_utils import get_db_engine
+from model.indicator_kernels import rsi as wilder_rsi, atr as wilder_atr
+from streaming_indicators import SMA_WINDOWS, StreamingIndicators
+
+logger = logging.getLogger('symbol_features')
+
+# Ordine delle feature atteso dal modello
+FEATURES = ["SMA_50", "SMA_200", "RSI", "ATR", "VWAP"]
+
+# Barre lette al primo caricamento di un simbolo (0 = tutta la storia). Con un
+# limite il VWAP è cumulato solo da quella barra e differisce da quello di addestramento
+FEATURE_HISTORY_BARS = int(os.environ.get('FEATURE_HISTORY_BARS', '0'))
+
+# Barre minime per una previsione: con meno barre SMA_200 non è definita
+MIN_FEATURE_BARS = max(SMA_WINDOWS)
+
+# Secondi durante i quali le feature in cache vengono servite senza interrogare la sorgente
+FEATURE_REFRESH_SECONDS = float(os.environ.get('FEATURE_REFRESH_SECONDS', '30'))
+
+# Directory dei CSV locali (<SIMBOLO>_daily.csv, <SIMBOLO>_<intervallo>.csv)
+LOCAL_BARS_DIR = os.environ.get(
+    'LOCAL_BARS_DIR', os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+BAR_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+# Intervalli supportati e formato dei simboli (usati anche nei nomi dei CSV locali)
+INTERVALS = ("1d", "1h", "30m", "15m", "5m", "1m")
+SYMBOL_PATTERN = re.compile(r"^[A-Z0-9.^=-]{1,20}$")
+
+class SymbolNotFoundError(LookupError):
+    """Nessuna barra disponibile per il simbolo richiesto."""
+
+class InsufficientHistoryError(LookupError):
+    """Barre disponibili insufficienti per calcolare tutte le feature del modello."""
+
+    def __init__(self, symbol, interval, bars, required=MIN_FEATURE_BARS):
+        super().__init__(
+            f"Storico insufficiente per {symbol} ({interval}): {bars} barre, ne servono almeno {required}"
+        )
+        self.bars = bars
+        self.required = required
+
+def compute_features(bars):
+    """
+    Calcola con i kernel batch le feature dell'ultima barra, con le stesse
+    definizioni di scripts/collector_service.py: SMA normalizzate sul prezzo di
+    chiusura, RSI e ATR di Wilder a 14 periodi (ATR normalizzato) e VWAP
+    cumulativo su tutte le barre ricevute. Riferimento per streaming_features.
+
+    Args:
+        bars (pd.DataFrame): Barre ordinate per data con colonne open/high/low/close/volume
+
+    Returns:
+        np.ndarray: Vettore float32 con le feature nell'ordine di FEATURES
+    """
+    close = bars['close']
+    last_close = close.iloc[-1]
+
+    sma_50 = close.iloc[-50:].mean() / last_close if len(close) >= 50 else np.nan
+    sma_200 = close.iloc[-200:].mean() / last_close if len(close) >= 200 else np.nan
+
+    close_values = close.to_numpy(dtype=float)
+    rsi = wilder_rsi(close_values, 14)[-1]
+    rsi = 50.0 if np.isnan(rsi) else rsi
+
+    atr = wilder_atr(bars['high'].to_numpy(dtype=float), bars['low'].to_numpy(dtype=float), close_values, 14)[-1]
+    atr = 0.01 if np.isnan(atr) else atr / last_close
+
+    typical_price = (bars['high'] + bars['low'] + close) / 3
+    volume = bars['volume'].sum()
+    vwap = (typical_price * bars['volume']).sum() / volume if volume > 0 else last_close
+
+    return np.array([sma_50, sma_200, rsi, atr, vwap], dtype=np.float32)
+
+def streaming_features(indicators):
+    """
+    Feature dallo stato degli indicatori incrementali, con gli stessi valori
+    predefiniti di compute_features per RSI e ATR non ancora definiti.
+    """
+    features = indicators.features()
+    if np.isnan(features[2]):
+        features[2] = 50.0
+    if np.isnan(features[3]):
+        features[3] = 0.01
+    return features
+
+def bars_table(interval):
+    """Tabella e colonna temporale delle barre per l'intervallo richiesto."""
+    if interval == "1d":
+        return "stock_daily_prices", "date"
+    return "intraday_data", "datetime"
+
+def load_bars_from_db(engine, symbol, interval="1d", since=None, limit=FEATURE_HISTORY_BARS):
+    """
+    Legge le ultime `limit` barre di un simbolo dal database (tutte se limit è 0
+    o None), opzionalmente solo quelle successive a `since`.
+
+    Returns:
+        pd.DataFrame: Barre ordinate per data, indicizzate sulla data
+    """
+    table_name, date_col = bars_table(interval)
+    conditions = ["symbol = :symbol"]
+    params = {"symbol": symbol}
+    if table_name == "intraday_data":
+        conditions.append("interval = :interval")
+        params["interval"] = interval
+    if since is not None:
+        conditions.append(f"{date_col} > :since")
+        params["since"] = since
+    limit_clause = ""
+    if limit:
+        limit_clause = "LIMIT :limit"
+        params["limit"] = limit
+
+    query = text(f"""
+        SELECT {date_col} AS ts, open, high, low, close, volume
+        FROM {table_name}
+        WHERE {' AND '.join(conditions)}
+        ORDER BY {date_col} DESC
+        {limit_clause}
+    """)
+
+    with engine.connect() as connection:
+        bars = pd.read_sql(query, connection, params=params, parse_dates=["ts"])
+    return bars.set_index("ts").sort_index()[BAR_COLUMNS]
+
+def local_bars_path(symbol, interval="1d"):
+    suffix = "daily" if interval == "1d" else interval
+    return os.path.join(LOCAL_BARS_DIR, f"{symbol}_{suffix}.csv")
+
+def load_bars_from_csv(path, limit=FEATURE_HISTORY_BARS):
+    """Legge le ultime `limit` barre (tutte se limit è 0 o None) da un CSV locale (prima colonna = data)."""
+    bars = pd.read_csv(path, index_col=0, parse_dates=True)
+    bars.columns = [str(column).lower() for column in bars.columns]
+    bars = bars.sort_index()[BAR_COLUMNS]
+    return bars.tail(limit) if limit else bars
+
+class SymbolFeatureCache:
+    """
+    Cache per simbolo degli indicatori incrementali e delle feature calcolate.
+
+    Args:
+        history_bars (int): Barre lette al primo caricamento di un simbolo (0 = tutta la storia)
+        refresh_seconds (float): Intervallo minimo tra due controlli della sorgente per lo stesso simbolo
+        engine (sqlalchemy.engine.Engine, optional): Engine del database; se None viene usato quello condiviso
+    """
+
+    def __init__(self, history_bars=FEATURE_HISTORY_BARS, refresh_seconds=FEATURE_REFRESH_SECONDS, engine=None):
+        self.history_bars = history_bars
+        self.refresh_seconds = refresh_seconds
+        self.engine = engine
+        self._entries = {}
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        self.hits = 0
+        self.refreshes = 0
+        self.recomputes = 0
+
+    def _lock_for(self, key):
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _fetch_new_bars(self, symbol, interval, entry):
+        """
+        Restituisce le barre nuove rispetto alla voce in cache, l'origine dei dati
+        e, per i CSV, la data di modifica del file (riletto solo se è cambiato).
+        """
+        engine = self.engine or get_db_engine()
+        if engine is not None:
+            since = entry["last_timestamp"] if entry else None
+            try:
+                limit = None if entry else self.history_bars
+                return load_bars_from_db(engine, symbol, interval, since=since, limit=limit), "db", None
+            except Exception as e:
+                logger.warning(f"⚠️ Lettura barre di {symbol} dal database non riuscita: {str(e)}")
+
+        path = local_bars_path(symbol, interval)
+        if not os.path.exists(path):
+            raise SymbolNotFoundError(f"Nessun dato disponibile per {symbol} ({interval})")
+
+        mtime = os.path.getmtime(path)
+        if entry and entry.get("mtime") == mtime:
+            return pd.DataFrame(columns=BAR_COLUMNS), "csv", mtime
+        if entry:
+            bars = load_bars_from_csv(path, limit=None)
+            return bars[bars.index > entry["last_timestamp"]], "csv", mtime
+        return load_bars_from_csv(path, limit=self.history_bars), "csv", mtime
+
+    def get(self, symbol, interval="1d"):
+        """
+        Restituisce le feature dell'ultima barra di un simbolo.
+
+        Returns:
+            dict: {"features": np.ndarray float32, "as_of": timestamp ultima barra,
+                   "bars": barre elaborate, "ready": True se tutti gli indicatori sono
+                   definiti, "source": "db" o "csv", "cached": bool}
+        """
+        symbol = symbol.upper()
+        if not SYMBOL_PATTERN.match(symbol):
+            raise ValueError(f"Simbolo non valido: {symbol}")
+        if interval not in INTERVALS:
+            raise ValueError(f"Intervallo non supportato: {interval}")
+        key = (symbol, interval)
+        with self._lock_for(key):
+            entry = self._entries.get(key)
+            now = time.monotonic()
+            if entry and now - entry["checked_at"] < self.refresh_seconds:
+                self.hits += 1
+                return {**entry["result"], "cached": True}
+
+            new_bars, source, mtime = self._fetch_new_bars(symbol, interval, entry)
+            self.refreshes += 1
+            new_bars = new_bars[~new_bars.index.duplicated(keep="last")]
+
+            if entry and new_bars.empty:
+                # Nessuna barra nuova: le feature in cache restano valide
+                entry["checked_at"] = now
+                entry["mtime"] = mtime
+                self.hits += 1
+                return {**entry["result"], "cached": True}
+
+            if new_bars.empty:
+                raise SymbolNotFoundError(f"Nessun dato disponibile per {symbol} ({interval})")
+
+            # Solo le barre nuove aggiornano lo stato, una alla volta
+            indicators = entry["indicators"] if entry else StreamingIndicators()
+            indicators.update_bars(new_bars)
+            self.recomputes += 1
+            result = {
+                "features": streaming_features(indicators),
+                "as_of": new_bars.index[-1],
+                "bars": indicators.bars,
+                "ready": indicators.ready,
+                "source": source,
+            }
+            self._entries[key] = {
+                "indicators": indicators,
+                "last_timestamp": new_bars.index[-1],
+                "result": result,
+                "checked_at": now,
+                "mtime": mtime,
+            }
+            return {**result, "cached": False}
+
+    def invalidate(self, symbol=None):
+        """Rimuove dalla cache un simbolo (tutti gli intervalli) o l'intera cache."""
+        with self._locks_guard:
+            if symbol is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[0] == symbol.upper()]:
+                    del self._entries[key]
+
+    def metrics(self):
+        return {
+            "symbols": len(self._entries),
+            "hits": self.hits,
+            "refreshes": self.refreshes,
+            "recomputes": self.recomputes,
+            "history_bars": self.history_bars,
+            "refresh_seconds": self.refresh_seconds,
+        }
@@ -0,0 +1,9 @@
+"""
+Configurazione pytest: rende importabili i moduli del progetto (model, scripts,
+backtesting) dalla radice del repository.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
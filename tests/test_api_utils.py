@@ -0,0 +1,29 @@
+import time
+
+from scripts.api_utils import RateLimiter
+
+
+def make_limiter(requests_per_minute, requests_per_day):
+    config = {"test_api": {"rate_limit": {
+        "requests_per_minute": requests_per_minute,
+        "requests_per_day": requests_per_day,
+        "daily_count": 0,
+    }}}
+    return RateLimiter(config=config, persist_interval=float("inf"))
+
+
+def test_acquire_spaces_requests_without_initial_burst():
+    limiter = make_limiter(requests_per_minute=600, requests_per_day=100)
+    start = time.monotonic()
+    for _ in range(4):
+        assert limiter.acquire("test_api")
+    # Capacità di un token: dopo il primo, una richiesta ogni 0.1 s
+    assert time.monotonic() - start >= 0.3 - 0.01
+    assert not limiter.acquire("test_api", block=False)
+
+
+def test_every_acquire_counts_towards_daily_limit():
+    limiter = make_limiter(requests_per_minute=60000, requests_per_day=3)
+    assert [limiter.acquire("test_api") for _ in range(4)] == [True, True, True, False]
+    assert limiter.config["test_api"]["rate_limit"]["daily_count"] == 3
+    assert not limiter.reserve_daily("test_api")
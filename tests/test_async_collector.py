@@ -0,0 +1,76 @@
+import os
+import sys
+import asyncio
+import threading
+from collections import defaultdict
+
+from aiohttp import web
+
+from scripts.api_utils import RateLimiter
+from scripts.async_collector import AsyncCollector
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from benchmark_async_collector import build_stub_app, max_requests_in_window
+
+
+class RecordingLimiter(RateLimiter):
+    """Quota giornaliera in memoria che registra il thread di ogni record_request."""
+
+    def __init__(self, requests_per_day):
+        config = {"alpha_vantage": {"rate_limit": {"requests_per_day": requests_per_day, "daily_count": 0}}}
+        super().__init__(config=config, persist_interval=float("inf"))
+        self.record_threads = []
+
+    def record_request(self, api_name):
+        self.record_threads.append(threading.get_ident())
+        super().record_request(api_name)
+
+
+async def collect(symbols, rpm, requests_per_day, limiter_factory=RecordingLimiter):
+    request_log = defaultdict(list)
+    runner = web.AppRunner(build_stub_app(0.01, request_log))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    base_url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+    providers = {
+        name: {"base_url": base_url, "requests_per_minute": rpm, "max_concurrency": 4}
+        for name in ("alpha_vantage", "binance")
+    }
+    limiter = limiter_factory(requests_per_day)
+    try:
+        async with AsyncCollector(providers=providers, rate_limiter=limiter, retries=1) as collector:
+            loop_thread = threading.get_ident()
+            stocks = await asyncio.gather(*[collector.get_stock_data(symbol) for symbol in symbols])
+            cryptos = await asyncio.gather(*[collector.get_crypto_data(symbol) for symbol in symbols])
+    finally:
+        await runner.cleanup()
+    return stocks, cryptos, request_log, limiter, loop_thread
+
+
+def test_concurrent_collection_respects_daily_quota():
+    symbols = [f"SYM{i}" for i in range(8)]
+    stocks, cryptos, request_log, limiter, _ = asyncio.run(collect(symbols, rpm=6000, requests_per_day=5))
+
+    assert sum(df is not None for df in stocks) == 5
+    assert len(request_log["alpha_vantage"]) == 5
+    assert all(df is not None and len(df) == 100 for df in cryptos)
+    assert limiter.config["alpha_vantage"]["rate_limit"]["daily_count"] == 5
+
+
+def test_requests_are_spaced_by_rate_limit():
+    symbols = [f"SYM{i}" for i in range(4)]
+    _, cryptos, request_log, _, _ = asyncio.run(collect(symbols, rpm=600, requests_per_day=100))
+
+    assert all(df is not None for df in cryptos)
+    timestamps = sorted(request_log["binance"])
+    # 600 richieste/minuto: una ogni 0.1 s, senza raffica iniziale
+    assert timestamps[-1] - timestamps[0] >= 0.3 - 0.02
+    assert max_requests_in_window(timestamps, window=60.0) <= 600
+
+
+def test_record_request_runs_off_the_event_loop():
+    _, _, _, limiter, loop_thread = asyncio.run(collect(["SYM0", "SYM1"], rpm=6000, requests_per_day=100))
+
+    assert len(limiter.record_threads) == 4
+    assert loop_thread not in limiter.record_threads
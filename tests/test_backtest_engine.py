@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from backtesting.engine import (
+    BUY_THRESHOLD, SELL_THRESHOLD, backtest_predictions, run_backtest, signals_to_positions, summarize
+)
+
+FEE_BPS, SLIPPAGE_BPS = 1.0, 2.0
+
+
+def reference_backtest(predictions, returns, fee_bps=FEE_BPS, slippage_bps=SLIPPAGE_BPS):
+    """Simulazione barra per barra: HOLD mantiene la posizione, un buco la chiude."""
+    n_bars, n_symbols = returns.shape
+    portfolio = np.zeros(n_bars)
+    for j in range(n_symbols):
+        position = 0.0
+        for t in range(n_bars):
+            if np.isnan(returns[t, j]):
+                target = 0.0
+            elif predictions[t, j] > BUY_THRESHOLD:
+                target = 1.0
+            elif predictions[t, j] < SELL_THRESHOLD:
+                target = -1.0
+            else:
+                target = position
+            cost = abs(target - position) * (fee_bps + slippage_bps) / 1e4
+            realized = 0.0 if np.isnan(returns[t, j]) else target * returns[t, j]
+            portfolio[t] += (realized - cost) / n_symbols
+            position = target
+    return portfolio
+
+
+@pytest.fixture
+def panel():
+    rng = np.random.default_rng(42)
+    returns = rng.normal(0.0003, 0.02, (500, 12))
+    predictions = 0.6 * returns + rng.normal(0, 0.02, returns.shape)
+    return predictions, returns, rng
+
+
+def test_matches_bar_by_bar_reference(panel):
+    predictions, returns, _ = panel
+    result = backtest_predictions(predictions, returns, fee_bps=FEE_BPS, slippage_bps=SLIPPAGE_BPS)
+    np.testing.assert_allclose(result.portfolio_returns, reference_backtest(predictions, returns),
+                               rtol=1e-10, atol=1e-12)
+    np.testing.assert_allclose(result.equity, np.cumprod(1 + result.portfolio_returns))
+
+
+def test_matches_reference_with_gaps(panel):
+    predictions, returns, rng = panel
+    returns = returns.copy()
+    for j in range(returns.shape[1]):
+        start = rng.integers(0, len(returns) - 20)
+        returns[start:start + rng.integers(1, 20), j] = np.nan
+
+    result = backtest_predictions(predictions, returns, fee_bps=FEE_BPS, slippage_bps=SLIPPAGE_BPS)
+
+    np.testing.assert_allclose(result.portfolio_returns, reference_backtest(predictions, returns),
+                               rtol=1e-10, atol=1e-12)
+    assert (result.positions[np.isnan(returns)] == 0).all()
+
+
+def test_position_stays_flat_after_gap_until_next_signal():
+    signals = np.array([1, 0, 0, 0, 0, -1, 0], dtype=np.int8)[:, None]
+    tradable = np.array([True, True, False, True, True, True, True])[:, None]
+
+    positions = signals_to_positions(signals, tradable=tradable)
+
+    assert positions[:, 0].tolist() == [1, 1, 0, 0, 0, -1, -1]
+    assert signals_to_positions(signals)[:, 0].tolist() == [1, 1, 1, 1, 1, -1, -1]
+
+
+def test_long_only_and_no_hold():
+    signals = np.array([1, 0, -1, 0, 1], dtype=np.int8)[:, None]
+    assert signals_to_positions(signals, allow_short=False)[:, 0].tolist() == [1, 1, 0, 0, 1]
+    assert signals_to_positions(signals, hold=False)[:, 0].tolist() == [1, 0, -1, 0, 1]
+
+
+def test_costs_and_summary():
+    positions = np.array([1.0, 1.0, 0.0, -1.0])
+    returns = np.array([0.01, 0.02, 0.03, -0.01])
+
+    result = run_backtest(positions, returns, fee_bps=5, slippage_bps=5)
+
+    np.testing.assert_allclose(result.costs[:, 0], [0.001, 0.0, 0.001, 0.001])
+    np.testing.assert_allclose(result.portfolio_returns, [0.009, 0.02, -0.001, 0.009])
+    assert result.trades == 3
+    summary = summarize(result)
+    assert summary["Trades"] == 3
+    assert summary["Total Costs"] == pytest.approx(0.003)
+
+
+def test_shape_mismatch_is_rejected():
+    with pytest.raises(ValueError):
+        run_backtest(np.zeros((5, 2)), np.zeros((5, 3)))
@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+import types
+import threading
+import importlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def collector(tmp_path, monkeypatch):
+    """Collector importato in una directory temporanea (scrive log e dati in percorsi relativi)."""
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("logs", exist_ok=True)
+    monkeypatch.delitem(sys.modules, "scripts.comprehensive_data_collector", raising=False)
+    return importlib.import_module("scripts.comprehensive_data_collector")
+
+
+def test_yf_download_calls_are_serialized(collector, monkeypatch):
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def fake_download(tickers, interval="1d", group_by=None, threads=True, progress=False, **kwargs):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+        index = pd.date_range("2026-01-01", periods=5, freq="B")
+        columns = pd.MultiIndex.from_product([list(tickers), ["Open", "High", "Low", "Close", "Volume"]])
+        return pd.DataFrame(np.ones((len(index), len(columns))), index=index, columns=columns)
+
+    monkeypatch.setitem(sys.modules, "yfinance", types.SimpleNamespace(download=fake_download))
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(collector.get_market_data_batch, [[f"SYM{i}", f"SYM{i}B"] for i in range(8)]))
+
+    assert peak[0] == 1
+    assert all(len(result) == 2 for result in results)
+
+
+def test_download_tasks_use_single_slot_source(collector):
+    assert collector.SOURCE_LIMITS["yahoo_download"][0] == 1
+    sources = {stage: source for stage, source, _, _ in collector.build_collection_tasks()}
+    assert sources["market"] == sources["sector"] == "yahoo_download"
+    assert sources["fundamentals"] == sources["options"] == "yahoo"
+
+
+def test_incremental_market_data_is_merged_into_symbol_csv(collector):
+    def frame(start, periods, close):
+        index = pd.date_range(start, periods=periods, freq="D", name="Date")
+        return pd.DataFrame({"Close": float(close), "symbol": "AAPL"}, index=index)
+
+    csv_path = "data/AAPL_market_data.csv"
+    collector.save_collected_data(frame("2026-01-01", 10, 1), "stock_daily_prices", csv_path,
+                                  None, False, "test")
+    collector.save_collected_data(frame("2026-01-08", 5, 2), "stock_daily_prices", csv_path,
+                                  None, False, "test", merge_csv=True)
+
+    saved = pd.read_csv(csv_path, index_col=0, parse_dates=True)
+    assert len(saved) == 12
+    assert saved.index.is_monotonic_increasing
+    assert saved["Close"].tolist() == [1.0] * 7 + [2.0] * 5
+    assert sorted(os.listdir("data")) == ["AAPL_market_data.csv"]
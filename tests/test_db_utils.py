@@ -0,0 +1,42 @@
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from scripts.db_utils import flatten_fundamental_info
+
+
+def test_flatten_fundamental_info_expands_dicts_and_drops_nulls():
+    frame = pd.DataFrame([{
+        "symbol": "AAPL",
+        "sector": "Technology",
+        "beta": 1.2,
+        "missing": None,
+        "officers": [{"name": "A"}],
+        "governance": OrderedDict(auditRisk=3, boardRisk=None),
+    }, {
+        "symbol": "MSFT",
+        "sector": None,
+        "beta": np.nan,
+        "missing": None,
+        "officers": [],
+        "governance": {"auditRisk": 1},
+    }])
+
+    flat = flatten_fundamental_info(frame)
+
+    assert list(flat.columns) == ["symbol", "key", "value", "created_at"]
+    assert list(zip(flat["symbol"], flat["key"], flat["value"])) == [
+        ("AAPL", "sector", "Technology"),
+        ("AAPL", "beta", "1.2"),
+        ("AAPL", "officers", "[{'name': 'A'}]"),
+        ("AAPL", "governance.auditRisk", "3"),
+        ("MSFT", "officers", "[]"),
+        ("MSFT", "governance.auditRisk", "1"),
+    ]
+    assert flat["created_at"].nunique() == 1
+
+
+def test_flatten_fundamental_info_empty():
+    flat = flatten_fundamental_info(pd.DataFrame({"symbol": ["AAPL"]}))
+    assert flat.empty and list(flat.columns) == ["symbol", "key", "value", "created_at"]
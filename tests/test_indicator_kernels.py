@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from model.indicator_kernels import atr, ema, ema_span, rsi, wilder
+
+
+def pandas_rsi(close, period=14):
+    delta = close.diff()
+    gain = delta.clip(lower=0).ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+    loss = (-delta.clip(upper=0)).ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+    return 100 - 100 / (1 + gain / loss)
+
+
+def pandas_atr(high, low, close, period=14):
+    previous_close = close.shift()
+    true_range = pd.concat(
+        [high - low, (high - previous_close).abs(), (low - previous_close).abs()], axis=1
+    ).max(axis=1)
+    return true_range.ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+
+
+@pytest.fixture
+def panel():
+    rng = np.random.default_rng(42)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (1500, 6)), axis=0))
+    spread = close * rng.uniform(0.002, 0.03, close.shape)
+    return close + spread, close - spread, close
+
+
+@pytest.mark.parametrize("dtype, rtol", [(np.float64, 1e-9), (np.float32, 1e-4)])
+def test_rsi_and_atr_match_pandas_ewm(panel, dtype, rtol):
+    high, low, close = panel
+    rsi_values, atr_values = rsi(close, dtype=dtype), atr(high, low, close, dtype=dtype)
+    assert rsi_values.dtype == dtype and atr_values.dtype == dtype
+    for j in range(close.shape[1]):
+        c, h, l = pd.Series(close[:, j]), pd.Series(high[:, j]), pd.Series(low[:, j])
+        np.testing.assert_allclose(rsi_values[:, j], pandas_rsi(c), rtol=rtol)
+        np.testing.assert_allclose(atr_values[:, j], pandas_atr(h, l, c), rtol=rtol)
+
+
+def test_ema_skips_missing_values_like_pandas():
+    values = np.array([np.nan, np.nan, 1.0, 2.0, np.nan, 4.0, 3.0, np.nan, 5.0])
+    expected = pd.Series(values).ewm(alpha=0.3, adjust=False, ignore_na=True).mean()
+    np.testing.assert_allclose(ema(values, 0.3), expected, rtol=1e-12)
+
+
+def test_ema_span_matches_pandas():
+    values = np.random.default_rng(0).normal(size=300)
+    expected = pd.Series(values).ewm(span=20, adjust=False, min_periods=20).mean()
+    np.testing.assert_allclose(ema_span(values, 20), expected, rtol=1e-9)
+
+
+def test_empty_input_returns_empty_arrays():
+    assert ema(np.array([]), 0.5).shape == (0,)
+    assert wilder(np.empty((0, 3)), 14).shape == (0, 3)
+    assert rsi(np.array([])).shape == (0,)
+    assert atr(np.array([]), np.array([]), np.array([])).shape == (0,)
+
+
+def test_all_missing_column_stays_nan():
+    values = np.column_stack([np.arange(20, dtype=float), np.full(20, np.nan)])
+    result = wilder(values, 5)
+    assert np.isnan(result[:, 1]).all()
+    assert not np.isnan(result[4:, 0]).any()
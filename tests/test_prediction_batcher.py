@@ -0,0 +1,81 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from scripts.prediction_batcher import PredictionBatcher
+
+
+class LinearModel:
+    def __init__(self, weights):
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.calls = []
+
+    def predict(self, features):
+        self.calls.append(len(features))
+        return features @ self.weights
+
+
+def test_batched_predictions_match_direct_predictions():
+    model = LinearModel([1.0, -2.0, 0.5])
+    batcher = PredictionBatcher(lambda features, model: model.predict(features), max_batch_rows=16, max_wait_ms=20)
+    rng = np.random.default_rng(0)
+    requests = [rng.random((int(rng.integers(1, 4)), 3), dtype=np.float32) for _ in range(64)]
+    try:
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(lambda features: batcher.predict(features, model, timeout=5), requests))
+    finally:
+        batcher.close()
+
+    for features, result in zip(requests, results):
+        np.testing.assert_allclose(result, features @ model.weights, rtol=1e-6)
+    assert max(model.calls) <= 16
+    metrics = batcher.metrics()
+    assert metrics["requests"] == 64
+    assert metrics["rows"] == sum(len(features) for features in requests)
+    assert metrics["batches"] < 64
+
+
+def test_batches_never_mix_models():
+    old, new = LinearModel([1.0]), LinearModel([10.0])
+    seen = []
+    gate = threading.Event()
+
+    def predict_fn(features, model):
+        gate.wait(5)
+        seen.append((model, len(features)))
+        return model.predict(features)
+
+    batcher = PredictionBatcher(predict_fn, max_batch_rows=64, max_wait_ms=50)
+    try:
+        futures = [batcher.submit(np.full((1, 1), i, dtype=np.float32), old if i % 2 else new) for i in range(10)]
+        gate.set()
+        results = [future.result(timeout=5) for future in futures]
+    finally:
+        batcher.close()
+
+    for i, result in enumerate(results):
+        assert result[0] == i * (1.0 if i % 2 else 10.0)
+    assert sum(rows for _, rows in seen) == 10
+
+
+def test_model_errors_reach_every_request_in_the_batch():
+    def failing(features, model):
+        raise ValueError("modello non disponibile")
+
+    batcher = PredictionBatcher(failing, max_wait_ms=20)
+    try:
+        futures = [batcher.submit(np.zeros((1, 2), dtype=np.float32)) for _ in range(3)]
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result(timeout=5)
+    finally:
+        batcher.close()
+
+
+def test_submit_after_close_is_rejected():
+    batcher = PredictionBatcher(lambda features, model: features[:, 0])
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.submit(np.zeros((1, 1), dtype=np.float32))
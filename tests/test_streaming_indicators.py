@@ -0,0 +1,65 @@
+import json
+import math
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.streaming_indicators import (
+    StreamingIndicatorEngine, StreamingIndicators, batch_indicators, compare_with_batch
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def synthetic_bars(n_bars, seed=42):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, n_bars)))
+    spread = close * rng.uniform(0.002, 0.03, n_bars)
+    return pd.DataFrame({
+        "high": close + spread, "low": close - spread, "close": close,
+        "volume": rng.uniform(1e6, 5e7, n_bars),
+    }, index=pd.bdate_range("2000-01-03", periods=n_bars))
+
+
+def test_streaming_matches_batch_after_snapshot_restore():
+    errors = compare_with_batch(synthetic_bars(3000))
+    assert all(error < 1e-6 for error in errors.values())
+
+
+def test_sample_csv_warm_up_has_no_warnings():
+    bars = pd.read_csv(os.path.join(ROOT, "AAPL_daily.csv"), index_col=0, parse_dates=True)
+    bars.columns = [str(column).lower() for column in bars.columns]
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        errors = compare_with_batch(bars)
+
+    assert len(bars) < 200 and math.isnan(errors["SMA_200"])
+    assert all(not math.isnan(errors[name]) for name in ("SMA_50", "RSI", "ATR", "VWAP"))
+
+
+def test_ready_after_warm_up_bars():
+    bars = synthetic_bars(250)
+    indicators = StreamingIndicators()
+    indicators.update_bars(bars.iloc[:indicators.warmup_bars - 1])
+    assert not indicators.ready and np.isnan(indicators.features()[1])
+
+    indicators.update_bars(bars.iloc[indicators.warmup_bars - 1:])
+    assert indicators.ready and not np.isnan(indicators.features()).any()
+
+
+def test_engine_save_and_load(tmp_path):
+    bars = synthetic_bars(300)
+    engine = StreamingIndicatorEngine()
+    engine.update_frame("SYM", bars.iloc[:200])
+    path = tmp_path / "state.json"
+    engine.save(str(path))
+
+    restored = StreamingIndicatorEngine.load(str(path))
+    last = restored.update_frame("SYM", bars.iloc[200:]).iloc[-1]
+    expected = batch_indicators(bars).iloc[-1]
+    np.testing.assert_allclose(last[expected.index], expected, rtol=1e-9)
+    assert json.loads(path.read_text())["SYM"]["bars"] == 200
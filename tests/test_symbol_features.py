@@ -0,0 +1,66 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts import symbol_features
+
+
+def write_bars(path, bars):
+    bars.rename(columns=str.capitalize).to_csv(path)
+
+
+def make_bars(n_bars, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, n_bars)))
+    spread = close * rng.uniform(0.002, 0.03, n_bars)
+    return pd.DataFrame({
+        "open": close, "high": close + spread, "low": close - spread, "close": close,
+        "volume": rng.uniform(1e6, 5e7, n_bars),
+    }, index=pd.bdate_range("2020-01-01", periods=n_bars, name="date"))
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(symbol_features, "LOCAL_BARS_DIR", str(tmp_path))
+    monkeypatch.setattr(symbol_features, "get_db_engine", lambda: None)
+    return symbol_features.SymbolFeatureCache(refresh_seconds=0, engine=None)
+
+
+def test_streaming_features_match_batch_features_on_full_history(cache, tmp_path):
+    bars = make_bars(600)
+    write_bars(tmp_path / "TEST_daily.csv", bars)
+
+    result = cache.get("TEST")
+
+    assert result["ready"] and result["bars"] == 600
+    np.testing.assert_allclose(result["features"], symbol_features.compute_features(bars), rtol=1e-5)
+
+
+def test_new_bars_update_cached_state_incrementally(cache, tmp_path):
+    bars = make_bars(400)
+    path = tmp_path / "TEST_daily.csv"
+    write_bars(path, bars.iloc[:390])
+    cache.get("TEST")
+
+    write_bars(path, bars)
+    os.utime(path, (1, 1))
+    result = cache.get("TEST")
+
+    assert not result["cached"]
+    assert result["bars"] == 400 and result["as_of"] == bars.index[-1]
+    np.testing.assert_allclose(result["features"], symbol_features.compute_features(bars), rtol=1e-5)
+
+    # File invariato: nessun ricalcolo
+    assert cache.get("TEST")["cached"]
+    assert cache.metrics()["recomputes"] == 2
+
+
+def test_warm_up_is_reported(cache, tmp_path):
+    write_bars(tmp_path / "TEST_daily.csv", make_bars(100))
+
+    result = cache.get("TEST")
+
+    assert not result["ready"]
+    assert np.isnan(result["features"][1])
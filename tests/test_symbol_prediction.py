@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+api_service = pytest.importorskip("scripts.api_service")
+symbol_features_module = pytest.importorskip("symbol_features")
+
+
+def write_bars(directory, symbol, n_bars):
+    rng = np.random.default_rng(0)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_bars)))
+    bars = pd.DataFrame({
+        "Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+        "Volume": rng.integers(1_000, 10_000, n_bars),
+    }, index=pd.date_range("2025-01-01", periods=n_bars, freq="B", name="Date"))
+    bars.to_csv(directory / f"{symbol}_daily.csv")
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    if api_service.model_registry.get() is None:
+        pytest.skip("Modello non disponibile")
+    monkeypatch.setattr(symbol_features_module, "LOCAL_BARS_DIR", str(tmp_path))
+    monkeypatch.setattr(api_service, "symbol_features", symbol_features_module.SymbolFeatureCache(
+        refresh_seconds=0, engine=None
+    ))
+    monkeypatch.setattr(symbol_features_module, "get_db_engine", lambda: None)
+    return api_service.app.test_client()
+
+
+def test_short_history_is_rejected(client, tmp_path):
+    write_bars(tmp_path, "SHORT", 100)
+
+    response = client.get("/predict/SHORT")
+
+    assert response.status_code == 422
+    body = response.get_json()
+    assert body["bars"] == 100 and body["required_bars"] == 200
+
+
+def test_full_history_returns_all_features(client, tmp_path):
+    write_bars(tmp_path, "LONG", 260)
+
+    response = client.get("/predict/LONG")
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["bars"] == 260
+    assert all(value is not None for value in body["features"].values())
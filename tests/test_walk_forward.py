@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtesting.walk_forward import InsufficientDataError, make_folds, walk_forward
+
+
+def test_folds_leave_gap_between_training_and_test():
+    periods = np.repeat(np.arange(20), 3)  # 20 date, 3 simboli per data
+
+    folds = make_folds(periods, train_periods=10, test_periods=4, gap=1)
+
+    assert [(f.train_start, f.train_end, f.test_start, f.test_end) for f in folds] == [
+        (0, 30, 33, 45), (12, 42, 45, 57), (24, 54, 57, 60),
+    ]
+    for fold in folds:
+        assert periods[fold.test_start] - periods[fold.train_end - 1] == 2
+
+
+def test_expanding_window_starts_at_zero():
+    folds = make_folds(np.arange(30), train_periods=10, test_periods=10, expanding=True, gap=0)
+    assert [(f.train_start, f.train_end) for f in folds] == [(0, 10), (0, 20)]
+
+
+def test_short_dataset_names_minimum_periods():
+    data = pd.DataFrame(np.ones((3, 6)), columns=["SMA_50", "SMA_200", "RSI", "ATR", "VWAP", "future_return"])
+
+    with pytest.raises(InsufficientDataError, match=r"3 periodi.*almeno 12"):
+        walk_forward(data, train_periods=10, test_periods=5, gap=1)
@@ -5,6 +5,14 @@ import os
 import sys
 import subprocess
 
+# Cache degli artefatti del progetto (model/artifact_cache.py); il pacchetto installato
+# da solo, senza il resto del repository, usa gsutil come in precedenza
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+try:
+    from model.artifact_cache import get_artifact_cache
+except ImportError:
+    get_artifact_cache = None
+
 def train_and_save_model(data_path: str):
     """Carica i dati da data_path (GCS o locale), addestra un modello XGBoost e lo salva in models/"""
 
@@ -15,8 +23,13 @@ def train_and_save_model(data_path: str):
     local_csv = "historical_data.csv"
     if data_path.startswith("gs://"):
         print(f"Scarico da GCS: {data_path}")
-        # Scarica il file da GCS alla VM
-        subprocess.run(["gsutil", "cp", data_path, local_csv], check=True)
+        if get_artifact_cache is not None:
+            # Scarica solo se il file su GCS è cambiato dall'ultima esecuzione
+            source, name = data_path.rsplit("/", 1)
+            get_artifact_cache(source).fetch(name, local_csv)
+        else:
+            # Scarica il file da GCS alla VM
+            subprocess.run(["gsutil", "cp", data_path, local_csv], check=True)
     else:
         local_csv = data_path
 
@@ -48,12 +61,21 @@ def train_and_save_model(data_path: str):
     joblib.dump(model, model_path)
     print(f"Modello addestrato e salvato in {model_path}")
 
-import subprocess
-
-# Carica il modello su GCS
-bucket_uri = "gs://trading-ai-bucket/xgboost_model.pkl"  # Sostituisci con il tuo percorso preferito
-subprocess.run(["gsutil", "cp", model_path, bucket_uri], check=True)
-print(f"Modello caricato su GCS: {bucket_uri}")
+    # Salva anche il booster nativo (UBJSON) usato dal servizio di previsione
+    native_path = "models/xgboost_model.ubj"
+    model.save_model(native_path)
+    print(f"Booster nativo salvato in {native_path}")
+
+    # Carica i modelli su GCS
+    bucket_uri = "gs://trading-ai-bucket"  # Sostituisci con il tuo percorso preferito
+    for path in (model_path, native_path):
+        destination = f"{bucket_uri}/{os.path.basename(path)}"
+        if get_artifact_cache is not None:
+            # Registra il modello anche nella cache locale: chi lo richiede su questa macchina non lo riscarica
+            get_artifact_cache(bucket_uri).put(path, os.path.basename(path))
+        else:
+            subprocess.run(["gsutil", "cp", path, destination], check=True)
+        print(f"Modello caricato su GCS: {destination}")
 
 
 if __name__ == "__main__":